@@ -0,0 +1 @@
+"""Subsistemas de Flowmodoro RPG (persistencia, reglas, utilidades)."""
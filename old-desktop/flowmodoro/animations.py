@@ -0,0 +1,150 @@
+"""
+Gestor central de animaciones de la UI (QPropertyAnimation).
+
+Una sola animación viva por (objeto, propiedad): si se pide otra mientras la
+anterior corre, se re-apunta desde el valor actual en vez de apilar una nueva.
+Al terminar, la animación se libera (deleteLater) y sale del registro, así que
+en un proceso que corre semanas la cantidad viva queda acotada por los widgets.
+
+Modos globales: completo, reducido (duraciones a la mitad, sin efectos
+cosméticos) y apagado (se salta directo al valor final). Con `pressure` (una
+función que devuelve el nivel de carga del FrameScheduler) se degrada solo.
+"""
+
+from PyQt5.QtCore import QObject, QPropertyAnimation, QEasingCurve
+from PyQt5.QtWidgets import QGraphicsOpacityEffect
+
+ANIM_FULL = "full"
+ANIM_REDUCED = "reduced"
+ANIM_OFF = "off"
+ANIM_MODES = (ANIM_FULL, ANIM_REDUCED, ANIM_OFF)
+
+REDUCED_SCALE = 0.5
+PRESSURE_REDUCED = 2    # niveles del FrameScheduler (0 = 30 FPS ... 3 = 10 FPS)
+PRESSURE_OFF = 3
+
+
+class AnimationManager(QObject):
+    def __init__(self, parent=None, mode: str = ANIM_FULL, pressure=None):
+        super().__init__(parent)
+        self.mode = mode
+        self.pressure = pressure
+        self._live = {}        # (id(objeto), propiedad) -> QPropertyAnimation
+        self._on_done = {}     # misma clave -> callback del último pedido
+        self._watched = set()  # claves con `destroyed` ya conectado (una vez por par)
+        self.started = 0
+        self.retargeted = 0
+        self.skipped = 0
+        self.released = 0
+
+    def set_mode(self, mode: str):
+        if mode not in ANIM_MODES:
+            raise ValueError(f"Modo de animación desconocido: {mode!r}")
+        self.mode = mode
+        if mode == ANIM_OFF:
+            self.finish_all()
+
+    def effective_mode(self) -> str:
+        mode = self.mode
+        if mode == ANIM_OFF or self.pressure is None:
+            return mode
+        level = self.pressure()
+        if level >= PRESSURE_OFF:
+            return ANIM_OFF
+        if level >= PRESSURE_REDUCED:
+            return ANIM_REDUCED
+        return mode
+
+    def live_count(self) -> int:
+        return len(self._live)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.effective_mode(),
+            "live": len(self._live),
+            "started": self.started,
+            "retargeted": self.retargeted,
+            "skipped": self.skipped,
+            "released": self.released,
+        }
+
+    # ---------- Pedidos ----------
+    def animate(self, target: QObject, prop: bytes, end, duration: int, start=None,
+                easing=QEasingCurve.InOutCubic, on_finished=None, cosmetic=False):
+        """Anima `target.prop` hasta `end`. `cosmetic`: se omite en modo reducido."""
+        mode = self.effective_mode()
+        key = (id(target), prop)
+        if mode == ANIM_OFF or (cosmetic and mode == ANIM_REDUCED):
+            self.cancel(target, prop)
+            target.setProperty(prop.decode(), end)
+            self.skipped += 1
+            if on_finished is not None:
+                on_finished()
+            return None
+        anim = self._live.get(key)
+        if anim is None:
+            anim = QPropertyAnimation(target, prop, self)
+            anim.finished.connect(lambda k=key: self._release(k))
+            if key not in self._watched:
+                self._watched.add(key)
+                target.destroyed.connect(lambda *_, k=key: self._forget(k))
+            self._live[key] = anim
+        else:
+            anim.stop()  # stop() no emite finished: el callback viejo no corre
+            self.retargeted += 1
+        if start is None:
+            start = target.property(prop.decode())
+        if mode == ANIM_REDUCED:
+            duration = int(duration * REDUCED_SCALE)
+        self._on_done[key] = on_finished
+        anim.setStartValue(start)
+        anim.setEndValue(end)
+        anim.setDuration(max(1, duration))
+        anim.setEasingCurve(easing)
+        anim.start()
+        self.started += 1
+        return anim
+
+    def opacity_effect(self, widget) -> QGraphicsOpacityEffect:
+        """Efecto de opacidad del widget, creado una sola vez."""
+        effect = widget.graphicsEffect()
+        if not isinstance(effect, QGraphicsOpacityEffect):
+            effect = QGraphicsOpacityEffect(widget)
+            widget.setGraphicsEffect(effect)
+        return effect
+
+    def cancel(self, target: QObject, prop: bytes):
+        """Detiene y libera la animación en curso (el valor queda donde esté)."""
+        key = (id(target), prop)
+        anim = self._live.pop(key, None)
+        self._on_done.pop(key, None)
+        if anim is not None:
+            anim.stop()
+            anim.deleteLater()
+            self.released += 1
+
+    def finish_all(self):
+        """Salta todas las animaciones vivas a su valor final."""
+        for key in list(self._live):
+            anim = self._live.get(key)
+            if anim is not None:
+                anim.setCurrentTime(anim.duration())  # emite finished -> _release
+
+    # ---------- Limpieza ----------
+    def _release(self, key):
+        anim = self._live.pop(key, None)
+        cb = self._on_done.pop(key, None)
+        if anim is not None:
+            anim.deleteLater()
+            self.released += 1
+        if cb is not None:
+            cb()
+
+    def _forget(self, key):
+        # El objeto animado se destruyó: su animación se va con él
+        self._watched.discard(key)
+        anim = self._live.pop(key, None)
+        self._on_done.pop(key, None)
+        if anim is not None:
+            anim.deleteLater()
+            self.released += 1
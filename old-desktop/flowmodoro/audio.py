@@ -0,0 +1,118 @@
+"""
+Sonidos sintetizados en memoria: tonos en bloque y un banco de avisos.
+
+La síntesis no llama a `math.sin` por muestra: calcula un período exacto de
+la onda (a 44.1 kHz, `rate / mcd(rate, f)` muestras) y lo repite con la
+multiplicación de `array`, que copia en C. Cada nota se afina a la frecuencia
+entera más cercana (±0.5 %) con el período exacto más corto. Solo los bordes
+(fundido de entrada y salida, para que no haga clic) se tocan en Python.
+
+`SoundBank` deja todos los avisos listos como PCM en QBuffer y los reproduce
+con QAudioOutput: sin archivos, sin decodificar y sin sintetizar al sonar.
+QtMultimedia se importa recién al crear el banco.
+"""
+
+import sys
+import math
+from array import array
+
+SAMPLE_RATE = 44100
+AMP = 0.15
+FADE_IN_SEC = 0.004
+FADE_OUT_SEC = 0.03
+TUNE_TOL = 0.005
+
+# Avisos: secuencias de (frecuencia Hz, duración s)
+CUES = {
+    "notify":   [(600, 0.18)],                                          # bloque registrado
+    "level_up": [(523, 0.08), (659, 0.08), (784, 0.08), (1047, 0.24)],  # do-mi-sol-do
+    "boss":     [(392, 0.12), (392, 0.06), (523, 0.12), (659, 0.12), (784, 0.36)],
+    "mode":     [(880, 0.06), (660, 0.10)],
+    "chest":    [(1319, 0.05), (1568, 0.05), (2093, 0.16)],
+}
+
+
+def _tuned(freq: float, rate: int) -> int:
+    """Frecuencia entera cercana a `freq` cuya onda se repite en menos muestras."""
+    f = max(1, int(round(freq)))
+    tol = int(f * TUNE_TOL)
+    return min(range(max(1, f - tol), f + tol + 1), key=lambda g: (rate // math.gcd(rate, g), abs(g - f)))
+
+
+def tone(freq: float, dur: float, amp: float = AMP, rate: int = SAMPLE_RATE) -> array:
+    """Seno de `dur` segundos como PCM de 16 bits (array "h")."""
+    n = int(rate * dur)
+    if n <= 0:
+        return array("h")
+    f = _tuned(freq, rate)
+    period = min(n, rate // math.gcd(rate, f))   # muestras hasta que la onda se repite exacta
+    k = 2 * math.pi * f / rate
+    a = amp * 32767.0
+    cycle = array("h", [int(a * math.sin(k * i)) for i in range(period)])
+    out = cycle * (n // period + 1)
+    del out[n:]
+    fi = min(n, int(rate * FADE_IN_SEC))
+    fo = min(n - fi, int(rate * FADE_OUT_SEC))
+    if fi:
+        out[:fi] = array("h", [v * i // fi for i, v in enumerate(out[:fi])])
+    if fo:
+        out[n - fo:] = array("h", [v * (fo - i) // fo for i, v in enumerate(out[n - fo:])])
+    return out
+
+
+def render(notes, amp: float = AMP, rate: int = SAMPLE_RATE) -> array:
+    out = array("h")
+    for freq, dur in notes:
+        out.extend(tone(freq, dur, amp, rate))
+    return out
+
+
+def pcm_bytes(samples: array) -> bytes:
+    """PCM little-endian (lo que espera QAudioOutput)."""
+    if sys.byteorder != "little":
+        samples = array("h", samples)
+        samples.byteswap()
+    return samples.tobytes()
+
+
+class SoundBank:
+    """Avisos precargados en memoria; `available` es False si no hay salida de audio."""
+    def __init__(self, parent=None, volume: float = 0.5, cues=CUES, rate: int = SAMPLE_RATE):
+        self.available = False
+        self._buffers = {}
+        self._out = None
+        try:
+            from PyQt5.QtCore import QByteArray, QBuffer, QIODevice
+            from PyQt5.QtMultimedia import QAudio, QAudioDeviceInfo, QAudioFormat, QAudioOutput
+        except Exception:
+            return
+        fmt = QAudioFormat()
+        fmt.setSampleRate(rate)
+        fmt.setChannelCount(1)
+        fmt.setSampleSize(16)
+        fmt.setCodec("audio/pcm")
+        fmt.setByteOrder(QAudioFormat.LittleEndian)
+        fmt.setSampleType(QAudioFormat.SignedInt)
+        dev = QAudioDeviceInfo.defaultOutputDevice()
+        if dev.isNull() or not dev.isFormatSupported(fmt):
+            return
+        for name, notes in cues.items():
+            buf = QBuffer(parent)
+            buf.setData(QByteArray(pcm_bytes(render(notes, rate=rate))))
+            buf.open(QIODevice.ReadOnly)
+            self._buffers[name] = buf
+        self._out = QAudioOutput(dev, fmt, parent)
+        self._out.setVolume(volume)
+        self._stopped = QAudio.StoppedState
+        self.available = True
+
+    def play(self, name: str) -> bool:
+        """Reproduce el aviso `name` (corta el que esté sonando)."""
+        buf = self._buffers.get(name)
+        if buf is None:
+            return False
+        if self._out.state() != self._stopped:
+            self._out.stop()
+        buf.seek(0)
+        self._out.start(buf)
+        return True
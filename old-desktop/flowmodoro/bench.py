@@ -0,0 +1,347 @@
+"""
+Benchmarks de los caminos calientes, sin pantalla (QT_QPA_PLATFORM=offscreen).
+
+    python3 FlowmodoroRPG.py bench [--quick] [--out corrida.json]
+    python3 FlowmodoroRPG.py bench compare base.json nueva.json [--threshold 0.2]
+
+Mide con la ventana real (MainWindow) sobre un directorio de datos temporal
+($FLOWMODORO_DATA_DIR), nunca el estado del usuario:
+
+    tick[backend,n=N]        on_stopwatch_tick completo (sync, guardar, etiquetas)
+    save_state[backend,n=N]  guardar con N bloques (lo que cuesta en el hilo de la GUI)
+    persist[backend,n=N]     guardar y esperar a que el hilo escritor lo deje en disco
+    load_state[backend,n=N]  leer el estado guardado
+    codec.save/load[fmt,n=N] estado con N bloques en memoria (servidor): JSON vs binstate
+                             (load lleva además el tamaño en `bytes`)
+    update_counts_only.*     view model sin cambios / con todo invalidado
+    paint.boss_hp_overlay    paintEvent del overlay con partículas vivas
+    startup.first_paint      arranque en frío por main() hasta el primer paint
+
+Cada resultado lleva mediana, p90, mínimo y cantidad de muestras en ms. El
+modo compare marca como regresión lo que empeora más que `--threshold`
+(relativo) y más que `--min-ms` (absoluto, ruido) y sale con código 1.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+from .common import (
+    DATA_DIR_ENV, STATE_FILENAME, STORY_SNIPPETS, EXP_DEEP, EXP_MINI, BASE_DANO_DEEP, BASE_DANO_MINI,
+    default_state,
+)
+
+BACKENDS = ("journal", "sqlite", "binary", "json")
+SIZES = (10, 100, 1000, 10000, 100000)
+QUICK_SIZES = (10, 1000, 100000)
+BUDGET_SEC = 1.0          # tiempo máximo por medición (además de `n`)
+LAUNCHER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "FlowmodoroRPG.py")
+
+
+class ManualClock:
+    def __init__(self, t: float = 1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _stats(samples) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "median_ms": round(statistics.median(ms), 4),
+        "p90_ms": round(ms[min(len(ms) - 1, int(0.9 * len(ms)))], 4),
+        "min_ms": round(ms[0], 4),
+        "n": len(ms),
+    }
+
+
+def measure(fn, n: int, warmup: int = 3, budget: float = BUDGET_SEC, setup=None) -> dict:
+    """Tiempos de `fn()` (sin contar `setup()`), hasta `n` muestras o `budget` segundos."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    t_end = time.perf_counter() + budget
+    while len(samples) < n and (len(samples) < 3 or time.perf_counter() < t_end):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples)
+
+
+# ---------- Escenarios con la ventana ----------
+def _seed_dir(n_blocks: int) -> str:
+    """Directorio de datos con un JSON viejo de `n_blocks` bloques (se migra al abrir)."""
+    d = tempfile.mkdtemp(prefix="flowmodoro-bench-")
+    with open(os.path.join(d, STATE_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(_seed_state(n_blocks), f)
+    return d
+
+
+def _seed_state(n_blocks: int) -> dict:
+    rng = random.Random(n_blocks)
+    state = default_state()
+    hist = []
+    for _ in range(n_blocks):
+        deep = rng.random() < 0.6
+        hist.append({"exp": EXP_DEEP if deep else EXP_MINI, "dano": BASE_DANO_DEEP if deep else BASE_DANO_MINI,
+                     "tipo": "deep" if deep else "mini"})
+    state["history"] = hist
+    state["exp_total"] = sum(e["exp"] for e in hist)  # > 0: sin consejos de bienvenida
+    state["story"] = ["Bench."]
+    return state
+
+
+def _open_window(storage: str, n_blocks: int):
+    from .gui import MainWindow
+    d = _seed_dir(n_blocks)
+    os.environ[DATA_DIR_ENV] = d
+    w = MainWindow(dark_mode=False, storage=storage)
+    # Sin umbrales ni eventos: los ticks no abren diálogos
+    w.engine.rules.update(AUTO_MINI_SEC=10 ** 9, AUTO_DEEP_SEC=10 ** 9 + 1)
+    return w, d
+
+
+def _close_window(w, d):
+    w.close()
+    w.deleteLater()
+    shutil.rmtree(d, ignore_errors=True)
+
+
+def bench_storage(storage: str, n_blocks: int, n: int, out: dict):
+    w, d = _open_window(storage, n_blocks)
+    tag = f"[{storage},n={n_blocks}]"
+    st = w.state
+
+    def bump():
+        st["total_focus_sec"] += 1
+
+    def save():
+        w.save_state(); w.flush_state()
+    out["save_state" + tag] = measure(save, n, setup=bump)
+
+    def persist():
+        save(); w.writer.flush()
+    out["persist" + tag] = measure(persist, n, setup=bump)
+    w.writer.flush()
+
+    def load():
+        data = w.load_state()
+        if data["history"] is not st["history"]:
+            data["history"].close()
+    out["load_state" + tag] = measure(load, n)
+
+    if n_blocks in (min(SIZES), max(SIZES)):
+        clock = ManualClock()
+        w.engine.clock = clock
+        w.engine.start()
+
+        def step():
+            clock.t += 1.0
+        out["tick" + tag] = measure(w.on_stopwatch_tick, n, setup=step)
+        w.engine.pause()
+    _close_window(w, d)
+
+
+def bench_codec(n_blocks: int, n: int, out: dict):
+    """Guardar/leer un estado completo en memoria: JSON (como antes) vs binstate."""
+    from . import binstate
+    from .engine import GameEngine
+    from .history import json_ready
+    state = GameEngine(_seed_state(n_blocks)).state   # historial en HistoryStore, como en el servidor
+    for lvl in range(2, 42):
+        state["story"].append(f"Nivel {lvl}: {STORY_SNIPPETS[lvl % len(STORY_SNIPPETS)]}")
+    tag = f"n={n_blocks}]"
+    raw_json = json.dumps(json_ready(state), ensure_ascii=False).encode("utf-8")
+    raw_bin = binstate.dumps(state)
+    out["codec.save[json," + tag] = measure(lambda: json.dumps(json_ready(state), ensure_ascii=False).encode("utf-8"), n)
+    out["codec.save[binary," + tag] = measure(lambda: binstate.dumps(state), n)
+    out["codec.load[json," + tag] = dict(measure(lambda: GameEngine(json.loads(raw_json)), n), bytes=len(raw_json))
+    out["codec.load[binary," + tag] = dict(measure(lambda: GameEngine(binstate.loads(raw_bin)), n), bytes=len(raw_bin))
+
+
+def bench_view(n: int, out: dict):
+    w, d = _open_window("journal", 100)
+    out["update_counts_only.steady"] = measure(w.update_counts_only, n)
+    out["update_counts_only.invalidated"] = measure(w.update_counts_only, n, setup=w.view.invalidate)
+    _close_window(w, d)
+
+
+def bench_paint(app, n: int, out: dict):
+    w, d = _open_window("journal", 100)
+    w.resize(760, 480)
+    w.show()
+    app.processEvents()
+    ov = w.hp_overlay
+    ov.setProgress(70, 100)
+    ov.update_geometry()
+    frame = [0]
+
+    def step():
+        frame[0] += 1
+        if frame[0] % 30 == 1:
+            ov.burst()
+        ov._maybe_spawn_particle()
+        ov._step_particles()
+        ov.phase = (ov.phase + 0.02) % 1.0
+    out["paint.boss_hp_overlay"] = measure(ov.repaint, n, setup=step)
+    out["paint.boss_hp_overlay"]["overlay_px"] = [ov.width(), ov.height()]
+    _close_window(w, d)
+
+
+def bench_startup(n: int, out: dict):
+    runs = []
+    for _ in range(n):
+        d = _seed_dir(100)
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen", **{DATA_DIR_ENV: d})
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, LAUNCHER, "--startup-profile", "json", "--quit-after-paint"],
+                              env=env, capture_output=True, text=True, timeout=120)
+        wall = time.perf_counter() - t0
+        shutil.rmtree(d, ignore_errors=True)
+        for line in reversed(proc.stderr.splitlines()):
+            if line.startswith("{"):
+                rep = json.loads(line)
+                rep["wall_sec"] = wall
+                runs.append(rep)
+                break
+    if not runs:
+        out["startup.first_paint"] = {"error": "el lanzador no reportó el primer paint"}
+        return
+    res = _stats([r["total_ms"] / 1000 for r in runs])
+    res["process_wall_ms"] = round(statistics.median(r["wall_sec"] for r in runs) * 1000, 2)
+    res["max_rss_mb"] = max((r["max_rss_mb"] or 0) for r in runs)
+    res["phases_ms"] = {k: round(statistics.median(r["phases"].get(k, 0) for r in runs), 2)
+                        for k in runs[0]["phases"]}
+    out["startup.first_paint"] = res
+
+
+def run(quick: bool = False, backends=BACKENDS, log=sys.stderr) -> dict:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    n = 30 if quick else 200
+    sizes = QUICK_SIZES if quick else SIZES
+    old_dir = os.environ.get(DATA_DIR_ENV)
+    results = {}
+    t0 = time.perf_counter()
+    try:
+        for storage in backends:
+            for size in sizes:
+                print(f"[bench] {storage} n={size}", file=log)
+                bench_storage(storage, size, n, results)
+        print("[bench] codec JSON / binario", file=log)
+        for size in sizes:
+            bench_codec(size, n, results)
+        print("[bench] view model / paint", file=log)
+        bench_view(n * 5, results)
+        bench_paint(app, n, results)
+        print("[bench] arranque", file=log)
+        bench_startup(3 if quick else 7, results)
+    finally:
+        if old_dir is None:
+            os.environ.pop(DATA_DIR_ENV, None)
+        else:
+            os.environ[DATA_DIR_ENV] = old_dir
+    return {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR, "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "quick": quick,
+            "wall_sec": round(time.perf_counter() - t0, 1),
+        },
+        "results": results,
+    }
+
+
+# ---------- Comparación ----------
+def compare(base: dict, new: dict, threshold: float = 0.2, min_ms: float = 0.05) -> dict:
+    """Por nombre: medianas, cambio relativo y veredicto (regresión / mejora / igual)."""
+    rows = {}
+    b, c = base.get("results", {}), new.get("results", {})
+    for name in sorted(set(b) | set(c)):
+        old, cur = b.get(name, {}).get("median_ms"), c.get(name, {}).get("median_ms")
+        if old is None or cur is None:
+            rows[name] = {"base_ms": old, "new_ms": cur, "change": None,
+                          "verdict": "falta en base" if old is None else "falta en nueva"}
+            continue
+        change = (cur - old) / old if old > 0 else 0.0
+        if change > threshold and cur - old > min_ms:
+            verdict = "regresión"
+        elif change < -threshold and old - cur > min_ms:
+            verdict = "mejora"
+        else:
+            verdict = "igual"
+        rows[name] = {"base_ms": old, "new_ms": cur, "change": round(change, 4), "verdict": verdict}
+    return {"threshold": threshold, "min_ms": min_ms, "rows": rows,
+            "regressions": [k for k, r in rows.items() if r["verdict"] == "regresión"]}
+
+
+def print_comparison(cmp: dict, stream=sys.stdout):
+    width = max([len(k) for k in cmp["rows"]] + [10])
+    print(f"{'medición':<{width}} {'base ms':>10} {'nueva ms':>10} {'cambio':>8}  veredicto", file=stream)
+    for name, r in cmp["rows"].items():
+        fmt = lambda v: "—" if v is None else f"{v:.3f}"
+        ch = "—" if r["change"] is None else f"{r['change'] * 100:+.1f}%"
+        print(f"{name:<{width}} {fmt(r['base_ms']):>10} {fmt(r['new_ms']):>10} {ch:>8}  {r['verdict']}", file=stream)
+    n = len(cmp["regressions"])
+    print(f"\n{n} regresión(es) (umbral {cmp['threshold'] * 100:.0f}%, mínimo {cmp['min_ms']} ms)", file=stream)
+
+
+def _load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "compare":
+        ap = argparse.ArgumentParser(prog="FlowmodoroRPG.py bench compare")
+        ap.add_argument("base")
+        ap.add_argument("new")
+        ap.add_argument("--threshold", type=float, default=0.2, help="empeoramiento relativo tolerado (0.2 = 20%%)")
+        ap.add_argument("--min-ms", type=float, default=0.05, help="diferencia absoluta mínima para contar")
+        ap.add_argument("--json", action="store_true", help="salida JSON en vez de tabla")
+        args = ap.parse_args(argv[1:])
+        cmp = compare(_load(args.base), _load(args.new), args.threshold, args.min_ms)
+        if args.json:
+            json.dump(cmp, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        else:
+            print_comparison(cmp)
+        return 1 if cmp["regressions"] else 0
+
+    ap = argparse.ArgumentParser(prog="FlowmodoroRPG.py bench", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--quick", action="store_true", help="menos tamaños y muestras")
+    ap.add_argument("--storage", action="append", choices=BACKENDS, help="solo estos backends (repetible)")
+    ap.add_argument("--out", help="escribir el JSON en este archivo (si no, a stdout)")
+    args = ap.parse_args(argv)
+    result = run(args.quick, tuple(args.storage or BACKENDS))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""
+Estado en binario compacto y versionado (sin Qt).
+
+Mismo contenido que el JSON de siempre, sin texto que parsear:
+
+    HEADER    magic "FRB1", versión, flags
+    SCALARS   máscaras + INT_KEYS en int64 + índices de los enums (campos fijos)
+    STATS     acumulados de stats.py en int64                   (flags & F_STATS)
+    boss_name u32 largo + UTF-8                                 (flags & F_BOSS)
+    history   u64 filas + filas ROW de history.py               (flags & F_HIST)
+    story     tabla de textos + registros (nivel, texto)        (flags & F_STORY)
+    extras    u32 largo + JSON con todo lo que no entra arriba
+
+Lo que no tiene la forma esperada (un int fuera de rango, una entrada rara
+del historial, claves nuevas) va a `extras`, así que JSON -> binario -> JSON
+no pierde nada. `load()` lee de a partes: el historial entra en bloques de
+CHUNK_ROWS filas directo a un HistoryStore, sin armar un dict por bloque.
+Los índices de los enums son parte del formato: si cambian, sube VERSION.
+
+    python3 FlowmodoroRPG.py state to-json estado.bin [-o estado.json]
+    python3 FlowmodoroRPG.py state to-bin estado.json -o estado.bin
+    python3 FlowmodoroRPG.py state check estado.json   # ida y vuelta sin pérdidas
+    python3 FlowmodoroRPG.py state prune --keep-blocks 10000   # base SQLite (sqlstore.py)
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import struct
+import argparse
+
+from .common import DEFAULT_STATE, DIFF_CYCLE, AUTO_FOCUS_VALUES
+from .history import HistoryStore, KINDS as HIST_KINDS, ROW, json_ready
+from .journal import INT_KEYS
+from .stats import new_stats
+from .writer import atomic_write
+
+MAGIC = b"FRB1"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")                              # magic, versión, flags
+SCALARS = struct.Struct("<HH" + "q" * len(INT_KEYS) + "BB")  # presentes, None, ints, enums
+STATS_KEYS = ("focus_n", "focus_sum", "break_n", "break_sum", "streak", "best_streak")
+STATS_HOURS = ("hour_n", "hour_focus")
+STATS = struct.Struct("<" + "q" * (len(STATS_KEYS) + 24 * len(STATS_HOURS)))
+STORY_REC = struct.Struct("<ii")      # nivel, texto (>= 0: "Nivel N: texto"; < 0: texto entero)
+U32 = struct.Struct("<I")
+U64 = struct.Struct("<Q")
+CHUNK_ROWS = 65536
+
+F_STATS = 1
+F_BOSS = 2
+F_HIST = 4
+F_STORY = 8
+
+ENUMS = (("difficulty", tuple(DIFF_CYCLE)), ("auto_registered_focus", AUTO_FOCUS_VALUES))
+NO_ENUM = 0xFF
+KNOWN = set(INT_KEYS) | {k for k, _ in ENUMS} | {"stats", "boss_name", "history", "story"}
+INT64_MIN, INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+INT32_MIN, INT32_MAX = -(2 ** 31), 2 ** 31 - 1
+_KIND_IDX = {k: i for i, k in enumerate(HIST_KINDS)}
+_STORY_RE = re.compile(r"Nivel (-?\d+): (.*)\Z", re.S)
+_ENC = "surrogatepass"   # cualquier str que haya pasado por JSON
+
+
+def _int64(v) -> bool:
+    return type(v) is int and INT64_MIN <= v <= INT64_MAX
+
+
+def _int32(v) -> bool:
+    return type(v) is int and INT32_MIN <= v <= INT32_MAX
+
+
+# ---------- Secciones ----------
+def _pack_stats(st):
+    if not isinstance(st, dict) or st.keys() != new_stats().keys():
+        return None
+    vals = [st[k] for k in STATS_KEYS]
+    for k in STATS_HOURS:
+        if not isinstance(st[k], list) or len(st[k]) != 24:
+            return None
+        vals.extend(st[k])
+    if not all(_int64(v) for v in vals):
+        return None
+    return STATS.pack(*vals)
+
+
+def _unpack_stats(raw) -> dict:
+    vals = STATS.unpack(raw)
+    n = len(STATS_KEYS)
+    st = dict(zip(STATS_KEYS, vals[:n]))
+    for i, k in enumerate(STATS_HOURS):
+        st[k] = list(vals[n + 24 * i:n + 24 * (i + 1)])
+    return st
+
+
+def _pack_history(hist):
+    """Filas ROW, o None si alguna entrada no es un bloque normal."""
+    if isinstance(hist, HistoryStore):
+        return hist.rows_bytes()
+    if not isinstance(hist, list):
+        return None
+    buf = bytearray()
+    for e in hist:
+        if type(e) is not dict or len(e) != 3 or e.get("tipo") not in _KIND_IDX:
+            return None
+        exp, dano = e.get("exp"), e.get("dano")
+        if not (_int32(exp) and _int32(dano)):
+            return None
+        buf += ROW.pack(_KIND_IDX[e["tipo"]], exp, dano)
+    return buf
+
+
+def _pack_story(story):
+    """Tabla de textos distintos + un registro por entrada (los snippets se repiten)."""
+    if not isinstance(story, list):
+        return None
+    texts, idx, recs = [], {}, []
+    for s in story:
+        if type(s) is not str:
+            return None
+        m = _STORY_RE.match(s)
+        level, text, whole = 0, s, True
+        if m is not None and str(int(m.group(1))) == m.group(1) and _int32(int(m.group(1))):
+            level, text, whole = int(m.group(1)), m.group(2), False
+        i = idx.get(text)
+        if i is None:
+            i = idx[text] = len(texts)
+            texts.append(text)
+        recs.append(STORY_REC.pack(level, -(i + 1) if whole else i))
+    parts = [U32.pack(len(texts))]
+    for t in texts:
+        raw = t.encode("utf-8", _ENC)
+        parts.append(U32.pack(len(raw)))
+        parts.append(raw)
+    parts.append(U32.pack(len(recs)))
+    parts.extend(recs)
+    return b"".join(parts)
+
+
+def _read(f, n: int) -> bytes:
+    b = f.read(n)
+    if len(b) != n:
+        raise ValueError("estado binario truncado")
+    return b
+
+
+def _read_str(f) -> str:
+    return _read(f, U32.unpack(_read(f, U32.size))[0]).decode("utf-8", _ENC)
+
+
+# ---------- Escritura ----------
+def dump(state: dict, f):
+    """Escribe `state` en el archivo binario `f` (el historial, tal cual sus filas)."""
+    flags, present, none, ints, extras = 0, 0, 0, [], {}
+    for i, k in enumerate(INT_KEYS):
+        v = state.get(k)
+        if k in state and (v is None or _int64(v)):
+            present |= 1 << i
+            if v is None:
+                none |= 1 << i
+        elif k in state:
+            extras[k] = v
+        ints.append(v if _int64(v) else 0)
+    enums = []
+    for k, values in ENUMS:
+        v = state.get(k)
+        if type(v) is str and v in values:
+            enums.append(values.index(v))
+        else:
+            enums.append(NO_ENUM)
+            if k in state:
+                extras[k] = v
+    sections = []
+    if "stats" in state:
+        raw = _pack_stats(state["stats"])
+        if raw is None:
+            extras["stats"] = state["stats"]
+        else:
+            flags |= F_STATS
+            sections.append(raw)
+    if "boss_name" in state:
+        if type(state["boss_name"]) is str:
+            flags |= F_BOSS
+            raw = state["boss_name"].encode("utf-8", _ENC)
+            sections.append(U32.pack(len(raw)) + raw)
+        else:
+            extras["boss_name"] = state["boss_name"]
+    if "history" in state:
+        raw = _pack_history(state["history"])
+        if raw is None:
+            extras["history"] = state["history"]
+        else:
+            flags |= F_HIST
+            sections.append(U64.pack(len(raw) // ROW.size))
+            sections.append(raw)
+    if "story" in state:
+        raw = _pack_story(state["story"])
+        if raw is None:
+            extras["story"] = state["story"]
+        else:
+            flags |= F_STORY
+            sections.append(raw)
+    for k, v in state.items():
+        if k not in KNOWN:
+            extras[k] = v
+    f.write(HEADER.pack(MAGIC, VERSION, flags))
+    f.write(SCALARS.pack(present, none, *ints, *enums))
+    for raw in sections:
+        f.write(raw)
+    raw = json.dumps(extras, ensure_ascii=False).encode("utf-8", _ENC) if extras else b""
+    f.write(U32.pack(len(raw)))
+    f.write(raw)
+
+
+def dumps(state: dict) -> bytes:
+    buf = io.BytesIO()
+    dump(state, buf)
+    return buf.getvalue()
+
+
+# ---------- Lectura ----------
+def load(f, history: HistoryStore = None) -> dict:
+    """Lee un estado de `f` en orden, sin cargar el archivo entero. El historial
+    se agrega a `history` (si no, a un HistoryStore en memoria)."""
+    magic, version, flags = HEADER.unpack(_read(f, HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("no es un estado binario de Flowmodoro")
+    if version > VERSION:
+        raise ValueError(f"versión de estado {version} no soportada (máximo {VERSION})")
+    data = {}
+    vals = SCALARS.unpack(_read(f, SCALARS.size))
+    present, none = vals[0], vals[1]
+    for i, k in enumerate(INT_KEYS):
+        if present >> i & 1:
+            data[k] = None if none >> i & 1 else vals[2 + i]
+    for (k, values), idx in zip(ENUMS, vals[2 + len(INT_KEYS):]):
+        if idx != NO_ENUM:
+            if idx >= len(values):
+                raise ValueError(f"valor fuera de rango para {k}")
+            data[k] = values[idx]
+    if flags & F_STATS:
+        data["stats"] = _unpack_stats(_read(f, STATS.size))
+    if flags & F_BOSS:
+        data["boss_name"] = _read_str(f)
+    if flags & F_HIST:
+        store = HistoryStore() if history is None else history
+        left = U64.unpack(_read(f, U64.size))[0] * ROW.size
+        while left:
+            chunk = _read(f, min(left, CHUNK_ROWS * ROW.size))
+            store.extend_rows(chunk)
+            left -= len(chunk)
+        data["history"] = store
+    if flags & F_STORY:
+        texts = [_read_str(f) for _ in range(U32.unpack(_read(f, U32.size))[0])]
+        n = U32.unpack(_read(f, U32.size))[0]
+        story = []
+        for level, i in STORY_REC.iter_unpack(_read(f, n * STORY_REC.size)):
+            story.append(texts[-i - 1] if i < 0 else f"Nivel {level}: {texts[i]}")
+        data["story"] = story
+    n = U32.unpack(_read(f, U32.size))[0]
+    if n:
+        data.update(json.loads(_read(f, n).decode("utf-8", _ENC)))
+    # Mismo orden de claves que el JSON (más prolijo al convertir)
+    out = {k: data.pop(k) for k in DEFAULT_STATE if k in data}
+    out.update(data)
+    return out
+
+
+def loads(raw: bytes, history: HistoryStore = None) -> dict:
+    return load(io.BytesIO(raw), history)
+
+
+# ---------- Backend de la ventana ----------
+class BinaryStore:
+    """Backend "binary": load / commit / close como StateJournal y SqliteStore.
+    Cada commit reescribe el archivo entero (chico si el historial tiene archivo
+    propio); con un StateWriter la escritura va al hilo escritor."""
+    def __init__(self, path: str, writer=None):
+        self.path = path
+        self.writer = writer
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            return load(f)
+
+    def commit(self, state):
+        hist = state.get("history")
+        if getattr(hist, "path", None) is not None:
+            state = {k: v for k, v in state.items() if k != "history"}  # ya está en su archivo
+        raw = dumps(state)
+        if self.writer is not None:
+            self.writer.replace(self.path, raw)
+        else:
+            atomic_write(self.path, raw)
+
+    def close(self, state=None):
+        if state is not None:
+            self.commit(state)
+
+
+# ---------- Conversión (depuración) ----------
+def read_file(path: str) -> dict:
+    """Estado de un archivo binario o JSON (según el contenido)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            f.seek(0)
+            return load(f)
+        f.seek(0)
+        return json.loads(f.read().decode("utf-8"))
+
+
+def to_json(state: dict) -> dict:
+    return json_ready(state)
+
+
+def _prune(keep_blocks, keep_story) -> int:
+    import sqlite3
+    from .common import STATE_DB_FILENAME, resource_path
+    from .sqlstore import SqliteStore
+    path = resource_path(STATE_DB_FILENAME)
+    if not os.path.exists(path):
+        print(f"state: no hay base SQLite en {path}", file=sys.stderr)
+        return 2
+    store = SqliteStore(path)
+    try:
+        state = store.load()
+        if state is None:
+            print(f"state: {path} está vacía", file=sys.stderr)
+            return 2
+        blocks, lines = store.prune(state, keep_blocks, keep_story)
+    except sqlite3.Error as e:
+        print(f"state: {e}", file=sys.stderr)
+        return 2
+    finally:
+        store.close()
+    print(f"podados {blocks} bloques y {lines} crónicas de {path}")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="FlowmodoroRPG.py state", description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("to-json", help="binario (o JSON) -> JSON")
+    p.add_argument("src")
+    p.add_argument("-o", "--out", help="archivo de salida (si no, a stdout)")
+    p.add_argument("--indent", type=int, default=2)
+    p = sub.add_parser("to-bin", help="JSON (o binario) -> binario")
+    p.add_argument("src")
+    p.add_argument("-o", "--out", required=True)
+    p = sub.add_parser("check", help="convierte ida y vuelta y compara")
+    p.add_argument("src")
+    p = sub.add_parser("prune", help="borra bloques y crónicas viejos de la base SQLite")
+    p.add_argument("--keep-blocks", type=int, metavar="N", help="conservar los últimos N bloques")
+    p.add_argument("--keep-story", type=int, metavar="N", help="conservar las últimas N crónicas")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+    if args.cmd == "prune":
+        if args.keep_blocks is None and args.keep_story is None:
+            ap.error("prune: indicar --keep-blocks y/o --keep-story")
+        return _prune(args.keep_blocks, args.keep_story)
+
+    try:
+        state = read_file(args.src)
+        if args.cmd == "to-bin":
+            atomic_write(args.out, dumps(state))
+            return 0
+        if args.cmd == "to-json":
+            text = json.dumps(to_json(state), ensure_ascii=False, indent=args.indent)
+            if args.out:
+                atomic_write(args.out, (text + "\n").encode("utf-8", _ENC))
+            else:
+                print(text)
+            return 0
+        ref = to_json(state)
+        raw = dumps(state)
+        back = to_json(loads(raw))
+    except (OSError, ValueError, struct.error) as e:
+        print(f"state: {e}", file=sys.stderr)
+        return 2
+    size_json = len(json.dumps(ref, ensure_ascii=False).encode("utf-8", _ENC))
+    print(f"JSON {size_json} bytes, binario {len(raw)} bytes, ida y vuelta "
+          f"{'sin pérdidas' if back == ref else 'CON DIFERENCIAS'}")
+    return 0 if back == ref else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Navegador de crónicas e historial (modelo/vista, PyQt5).
+
+Los modelos no copian nada: leen del store del estado (HistoryStore mapeado,
+SqlHistory o la lista de crónicas) por páginas de PAGE_ROWS filas, a medida
+que la vista las pide (`canFetchMore`/`fetchMore`), y guardan solo las últimas
+CACHE_PAGES páginas leídas. Las vistas tienen filas de alto fijo, así que Qt
+dibuja solo las visibles: recorrer 100k bloques no sube la memoria.
+
+Lo más nuevo va arriba (fila 0 = último bloque / última crónica). `refresh()`
+compara largo y totales (O(1)) y agrega arriba lo nuevo sin reiniciar la vista.
+"""
+
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTabWidget, QListView, QTableView, QHeaderView,
+    QAbstractItemView, QDialogButtonBox,
+)
+
+PAGE_ROWS = 256
+CACHE_PAGES = 16
+HIST_HEADERS = ("#", "Tipo", "EXP", "Daño")
+KIND_LABEL = {"deep": "Deep", "mini": "Mini"}
+
+
+class _PagedModel:
+    """Filas por páginas (lo más nuevo primero) con caché LRU de páginas."""
+    def _init_pages(self):
+        self._total = 0        # filas en el store
+        self._shown = 0        # filas expuestas a la vista (crece con fetchMore)
+        self._pages = OrderedDict()
+        self.page_loads = 0
+
+    def _item(self, row: int):
+        page = row // PAGE_ROWS
+        rows = self._pages.get(page)
+        if rows is None:
+            # Fila r = elemento total-1-r del store; la página va de `hi` hacia atrás
+            hi = self._total - page * PAGE_ROWS
+            lo = max(0, hi - PAGE_ROWS)
+            rows = self._pages[page] = self._load(lo, hi)[::-1]
+            self.page_loads += 1
+            if len(self._pages) > CACHE_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        off = row - page * PAGE_ROWS
+        return rows[off] if off < len(rows) else None
+
+    def _grow(self, total: int):
+        """El store creció: las filas nuevas entran arriba."""
+        added = total - self._total
+        self._pages.clear()   # las páginas se cuentan desde lo más nuevo
+        self._total = total
+        self.beginInsertRows(QModelIndex(), 0, added - 1)
+        self._shown += added
+        self.endInsertRows()
+
+    def _reset(self, total: int):
+        self.beginResetModel()
+        self._pages.clear()
+        self._total = total
+        self._shown = min(total, PAGE_ROWS)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._shown
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._shown < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        n = min(PAGE_ROWS, self._total - self._shown)
+        if n <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._shown, self._shown + n - 1)
+        self._shown += n
+        self.endInsertRows()
+
+
+class HistoryModel(_PagedModel, QAbstractTableModel):
+    def __init__(self, get_store, parent=None):
+        super().__init__(parent)
+        self.get_store = get_store   # el store puede cambiar (reset, otro backend)
+        self._init_pages()
+        self._sig = None
+        self.refresh()
+
+    def _load(self, lo, hi):
+        store = self.get_store()
+        rows = getattr(store, "rows", None)
+        if rows is not None:
+            # SqlHistory: una consulta por página (los bloques podados faltan)
+            got = dict(rows(lo, hi))
+            return [(i, got.get(i)) for i in range(lo, hi)]
+        return [(i, store[i]) for i in range(lo, hi)]
+
+    def refresh(self) -> bool:
+        store = self.get_store()
+        sig = (id(store), len(store), store.exp_sum, store.dano_sum)
+        if sig == self._sig:
+            return False
+        old, self._sig = self._sig, sig
+        if old is None or old[0] != sig[0] or sig[1] < self._total:
+            self._reset(sig[1])
+            return True
+        if sig[1] > self._total:
+            self._grow(sig[1])
+        # Mismo largo y otros totales: cambió una fila (p. ej. mini -> deep), casi
+        # siempre la última
+        self._pages.pop(0, None)
+        if self._shown:
+            self.dataChanged.emit(self.index(0, 0), self.index(min(self._shown, PAGE_ROWS) - 1, len(HIST_HEADERS) - 1))
+        return True
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HIST_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HIST_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        col = index.column()
+        if role == Qt.TextAlignmentRole:
+            return int((Qt.AlignLeft if col == 1 else Qt.AlignRight) | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+        item = self._item(index.row())
+        if item is None:
+            return None
+        i, e = item
+        if col == 0:
+            return str(i + 1)
+        if e is None:
+            return "—" if col == 1 else ""   # podado (SQLite)
+        if col == 1:
+            return KIND_LABEL.get(e["tipo"], e["tipo"])
+        return str(e["exp"] if col == 2 else e["dano"])
+
+
+class StoryModel(_PagedModel, QAbstractListModel):
+    def __init__(self, get_story, parent=None):
+        super().__init__(parent)
+        self.get_story = get_story
+        self._init_pages()
+        self._sig = None
+        self.refresh()
+
+    def _load(self, lo, hi):
+        return self.get_story()[lo:hi]
+
+    def refresh(self) -> bool:
+        story = self.get_story()
+        sig = (id(story), len(story))
+        if sig == self._sig:
+            return False
+        old, self._sig = self._sig, sig
+        if old is None or old[0] != sig[0] or sig[1] < self._total:
+            self._reset(sig[1])
+        else:
+            self._grow(sig[1])
+        return True
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self._item(index.row())
+
+
+class BrowserDialog(QDialog):
+    """Crónicas e historial completos (ventana no modal)."""
+    def __init__(self, get_state, parent=None, px=lambda v: v):
+        super().__init__(parent)
+        self.setWindowTitle("Crónicas / Historial")
+        self.get_state = get_state
+        self.resize(px(560), px(520))
+        layout = QVBoxLayout(self)
+        self.lbl_totals = QLabel(""); self.lbl_totals.setObjectName("muted")
+        layout.addWidget(self.lbl_totals)
+        tabs = QTabWidget()
+        layout.addWidget(tabs, 1)
+
+        self.story_model = StoryModel(lambda: self.get_state()["story"], self)
+        self.story_view = QListView()
+        self.story_view.setUniformItemSizes(True)   # alto fijo: sin medir cada fila
+        self.story_view.setModel(self.story_model)
+        self.story_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        tabs.addTab(self.story_view, "Crónicas 📖")
+
+        self.history_model = HistoryModel(lambda: self.get_state()["history"], self)
+        self.history_view = QTableView()
+        self.history_view.setModel(self.history_model)
+        self.history_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.history_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.history_view.setAlternatingRowColors(True)
+        vh = self.history_view.verticalHeader()
+        vh.setVisible(False)
+        vh.setSectionResizeMode(QHeaderView.Fixed)   # nunca ResizeToContents: recorrería todo
+        vh.setDefaultSectionSize(px(26))
+        hh = self.history_view.horizontalHeader()
+        hh.setSectionResizeMode(QHeaderView.Stretch)
+        tabs.addTab(self.history_view, "Historial ⚔️")
+
+        btns = QDialogButtonBox(QDialogButtonBox.Close)
+        btns.rejected.connect(self.close)
+        layout.addWidget(btns)
+        self.refresh()
+
+    def refresh(self):
+        """Toma lo nuevo del estado (barato si no cambió nada)."""
+        changed = self.story_model.refresh()
+        changed = self.history_model.refresh() or changed
+        if not changed and self.lbl_totals.text():
+            return
+        t = self.get_state()["history"].totals()
+        self.lbl_totals.setText(
+            f"{t['blocks']} bloques (deep {t['deep']}, mini {t['mini']})  |  "
+            f"EXP {t['exp']}  |  Daño {t['dano']}  |  {len(self.get_state()['story'])} crónicas")
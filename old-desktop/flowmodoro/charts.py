@@ -0,0 +1,366 @@
+"""
+Panel de estadísticas: gráficos dibujados en un hilo aparte (PyQt5).
+
+Cada gráfico (enfoque/descanso por día, daño por jefe, curva de EXP) se
+dibuja con QPainter sobre un QImage en el hilo `chart-render`: QImage se
+puede pintar fuera del hilo de la GUI, QPixmap no. La GUI solo toma una foto
+chica de los datos (o los bytes del historial) y convierte el QImage listo en
+QPixmap, guardado en una caché por (gráfico, versión de datos, tamaño, tema).
+
+Mientras tanto la vista sigue mostrando el último pixmap escalado, así que
+abrir el panel o cambiar el tamaño de la ventana nunca frena el tick del
+cronómetro ni la animación del overlay. Por gráfico solo cuenta el pedido más
+nuevo: un resize largo no encola un dibujo por cuadro.
+"""
+
+import time
+import threading
+from array import array
+from itertools import accumulate
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QObject, QRectF, QPointF, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen, QPixmap, QPolygonF, QFontMetrics
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QWidget, QDialogButtonBox, QSizePolicy
+
+from .history import _NATIVE_LE
+from .sessions import day_of
+from .theme import THEME_COLORS
+
+CHART_DAYS = 14
+CHART_BOSSES = 12
+CACHE_PIXMAPS = 24
+RESIZE_DEBOUNCE_MS = 120
+MARGIN = (44, 26, 12, 24)     # izquierda, arriba, derecha, abajo (px lógicos)
+
+
+# ---------- Dibujo (hilo de render; sin QWidget ni QPixmap) ----------
+def _short(v: float) -> str:
+    """1234 -> 1.23k, 760438 -> 760k (entra en el margen del eje)."""
+    for div, suf in ((1e6, "M"), (1e3, "k")):
+        if abs(v) >= div:
+            return f"{v / div:.3g}{suf}"
+    return f"{v:.0f}"
+
+
+def _frame(p, rect, title, y_max, c):
+    """Título, grilla y escala; devuelve el área del gráfico."""
+    fm = QFontMetrics(p.font())
+    p.setPen(QColor(c["label"]))
+    p.drawText(QRectF(rect.left() + 4, rect.top() + 2, rect.width() - 8, MARGIN[1]), Qt.AlignLeft | Qt.AlignVCenter, title)
+    plot = rect.adjusted(MARGIN[0], MARGIN[1], -MARGIN[2], -MARGIN[3])
+    grid = QPen(QColor(c["group_border"])); grid.setWidth(1)
+    for i in range(4):
+        y = plot.bottom() - plot.height() * i / 3
+        p.setPen(grid)
+        p.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+        p.setPen(QColor(c["muted"]))
+        p.drawText(QRectF(rect.left(), y - fm.height() / 2, MARGIN[0] - 6, fm.height()),
+                   Qt.AlignRight | Qt.AlignVCenter, _short(y_max * i / 3))
+    return plot
+
+
+def _draw_daily(p, rect, data, c):
+    days = data or []
+    y_max = max([max(f, b) for _, f, b in days] + [30 * 60]) / 60.0
+    plot = _frame(p, rect, "Enfoque / descanso por día (min)", y_max, c)
+    if not days:
+        return
+    slot = plot.width() / len(days)
+    bar = max(1.0, slot * 0.38)
+    fm = QFontMetrics(p.font())
+    every = max(1, int((fm.horizontalAdvance("00/00") + 8) // slot) + 1)
+    for i, (label, focus, brk) in enumerate(days):
+        x = plot.left() + i * slot + slot * 0.1
+        for j, (sec, key) in enumerate(((focus, "primary_bg"), (brk, "neg"))):
+            h = plot.height() * (sec / 60.0) / y_max
+            p.fillRect(QRectF(x + j * bar, plot.bottom() - h, bar - 1, h), QColor(c[key]))
+        if i % every == 0 or i == len(days) - 1:
+            p.setPen(QColor(c["muted"]))
+            p.drawText(QRectF(plot.left() + i * slot - 20, plot.bottom() + 2, slot + 40, MARGIN[3] - 2),
+                       Qt.AlignHCenter | Qt.AlignTop, label)
+
+
+def _draw_bosses(p, rect, data, c):
+    bosses = data or []
+    y_max = max([max(hp, dano) for _, hp, dano, _ in bosses] + [1])
+    plot = _frame(p, rect, "Daño por jefe (contorno: HP)", y_max, c)
+    if not bosses:
+        return
+    slot = plot.width() / len(bosses)
+    fm = QFontMetrics(p.font())
+    for i, (name, hp, dano, current) in enumerate(bosses):
+        x = plot.left() + i * slot + slot * 0.15
+        w = slot * 0.7
+        h_hp = plot.height() * hp / y_max
+        h_dano = plot.height() * min(dano, y_max) / y_max
+        fill = QColor(c["hp_chunk"])
+        if current:
+            fill.setAlpha(150)   # el jefe actual, todavía en pie
+        p.fillRect(QRectF(x, plot.bottom() - h_dano, w, h_dano), fill)
+        p.setPen(QPen(QColor(c["muted"]), 1, Qt.DashLine))
+        p.drawRect(QRectF(x, plot.bottom() - h_hp, w, h_hp))
+        p.setPen(QColor(c["muted"]))
+        p.drawText(QRectF(x - slot * 0.15, plot.bottom() + 2, slot, MARGIN[3] - 2), Qt.AlignHCenter | Qt.AlignTop,
+                   fm.elidedText(name, Qt.ElideRight, int(slot) - 2))
+
+
+def exp_curve(rows: bytes, points: int):
+    """EXP acumulada bloque a bloque, muestreada en `points` puntos (índice, EXP)."""
+    cols = array("i")
+    cols.frombytes(rows)
+    if not _NATIVE_LE:
+        cols.byteswap()
+    cum = list(accumulate(cols[1::3]))
+    if not cum:
+        return []
+    step = max(1, len(cum) // max(1, points))
+    out = [(i + 1, cum[i]) for i in range(step - 1, len(cum), step)]
+    if out[-1][0] != len(cum):
+        out.append((len(cum), cum[-1]))
+    return [(0, 0)] + out
+
+
+def _draw_exp(p, rect, data, c):
+    pts = exp_curve(data or b"", int(rect.width()))
+    y_max = max(1, pts[-1][1] if pts else 1)
+    plot = _frame(p, rect, "Curva de EXP (por bloque)", y_max, c)
+    if len(pts) < 2:
+        return
+    x_max = pts[-1][0] or 1
+    poly = QPolygonF([QPointF(plot.left() + plot.width() * n / x_max, plot.bottom() - plot.height() * e / y_max)
+                      for n, e in pts])
+    p.setPen(QPen(QColor(c["bar_chunk"]), 2))
+    p.drawPolyline(poly)
+    p.setPen(QColor(c["muted"]))
+    p.drawText(QRectF(plot.left(), plot.bottom() + 2, plot.width(), MARGIN[3] - 2),
+               Qt.AlignRight | Qt.AlignTop, f"{x_max} bloques")
+
+
+RENDERERS = {"daily": _draw_daily, "bosses": _draw_bosses, "exp": _draw_exp}
+
+
+def render_chart(kind: str, data, width: int, height: int, dpr: float, theme: str) -> QImage:
+    img = QImage(max(1, int(width * dpr)), max(1, int(height * dpr)), QImage.Format_ARGB32_Premultiplied)
+    img.setDevicePixelRatio(dpr)
+    c = THEME_COLORS[theme]
+    img.fill(QColor(c["bg"]))
+    p = QPainter(img)
+    try:
+        p.setRenderHint(QPainter.Antialiasing)
+        font = p.font(); font.setPointSizeF(9); p.setFont(font)
+        RENDERERS[kind](p, QRectF(0, 0, width, height), data, c)
+    finally:
+        p.end()
+    return img
+
+
+# ---------- Hilo de render + caché de pixmaps ----------
+class ChartRenderer(QObject):
+    """Un hilo que dibuja el pedido más nuevo de cada gráfico; caché LRU en la GUI."""
+    ready = pyqtSignal(str)              # gráfico con un pixmap nuevo en la caché
+    failed = pyqtSignal(object)          # clave que no se pudo dibujar
+    _rendered = pyqtSignal(object, QImage)
+    _error = pyqtSignal(object)
+
+    def __init__(self, parent=None, cache_size: int = CACHE_PIXMAPS):
+        super().__init__(parent)
+        self.cache = OrderedDict()       # clave -> QPixmap
+        self.cache_size = cache_size
+        self.renders = 0
+        self._jobs = OrderedDict()       # gráfico -> (clave, datos); solo el último pedido
+        self._inflight = {}              # gráfico -> clave pedida
+        self._cond = threading.Condition()
+        self._closed = False
+        self._rendered.connect(self._on_rendered)   # vuelve al hilo de la GUI (en cola)
+        self._error.connect(self._on_error)
+        self._thread = threading.Thread(target=self._run, name="chart-render", daemon=True)
+        self._thread.start()
+
+    def get(self, key, make_data):
+        """El pixmap de `key` si ya está; si no, pide el dibujo y devuelve None.
+        `make_data()` se llama acá, en la GUI, solo cuando hay que dibujar: lo que
+        devuelve tiene que ser una foto que la GUI no vuelva a tocar. Si devuelve
+        una función, esa se llama en el hilo de render (lecturas largas)."""
+        pix = self.cache.get(key)
+        if pix is not None:
+            self.cache.move_to_end(key)
+            return pix
+        kind = key[0]
+        if self._inflight.get(kind) != key:
+            self._inflight[kind] = key
+            data = make_data()
+            with self._cond:
+                self._jobs[kind] = (key, data)
+                self._cond.notify()
+        return None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._jobs.clear()
+            self._cond.notify()
+        self._thread.join(1.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._jobs or self._closed)
+                if self._closed:
+                    return
+                _, (key, data) = self._jobs.popitem(last=False)
+            kind, _, w, h, dpr, theme = key
+            try:
+                if callable(data):
+                    data = data()
+                img = render_chart(kind, data, w, h, dpr, theme)
+            except Exception:
+                self._error.emit(key)
+                continue
+            self._rendered.emit(key, img)
+
+    def _on_error(self, key):
+        # Sin esto el pedido quedaría "en curso" y la vista no volvería a pedirlo
+        if self._inflight.get(key[0]) == key:
+            del self._inflight[key[0]]
+        self.failed.emit(key)
+
+    def _on_rendered(self, key, img):
+        self.renders += 1
+        if self._inflight.get(key[0]) == key:
+            del self._inflight[key[0]]
+        self.cache[key] = QPixmap.fromImage(img)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        self.ready.emit(key[0])
+
+
+class ChartView(QWidget):
+    """Muestra un gráfico del ChartRenderer; mientras llega el nuevo, el último escalado."""
+    def __init__(self, kind: str, source, renderer: ChartRenderer, theme_name, parent=None, min_height: int = 170):
+        super().__init__(parent)
+        self.kind = kind
+        self.source = source            # () -> (versión, función que arma los datos)
+        self.renderer = renderer
+        self.theme_name = theme_name    # () -> "light" / "dark"
+        self._pix = None
+        self._key = None
+        self._error = False
+        self.setMinimumHeight(min_height)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self._debounce = QTimer(self); self._debounce.setSingleShot(True); self._debounce.setInterval(RESIZE_DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.refresh)
+        renderer.ready.connect(self._on_ready)
+        renderer.failed.connect(self._on_failed)
+
+    def refresh(self):
+        version, make_data = self.source()
+        key = (self.kind, version, self.width(), self.height(), self.devicePixelRatioF(), self.theme_name())
+        if key == self._key:
+            return
+        self._key = key
+        pix = self.renderer.get(key, make_data)
+        if pix is not None:
+            self._pix = pix
+            self.update()
+
+    def _on_ready(self, kind):
+        if kind == self.kind and self._key is not None:
+            pix = self.renderer.cache.get(self._key)
+            if pix is not None and pix is not self._pix:
+                self._pix = pix
+                self._error = False
+                self.update()
+
+    def _on_failed(self, key):
+        if key == self._key:
+            self._key = None   # el próximo refresh() vuelve a pedirlo
+            self._error = True
+            self.update()
+
+    def resizeEvent(self, ev):
+        super().resizeEvent(ev)
+        self._debounce.start()   # mientras tanto, el pixmap anterior estirado
+
+    def paintEvent(self, ev):
+        p = QPainter(self)
+        if self._pix is None:
+            p.setPen(QColor(THEME_COLORS[self.theme_name()]["muted"]))
+            p.drawText(self.rect(), Qt.AlignCenter, "No se pudo dibujar" if self._error else "Dibujando…")
+            return
+        p.drawPixmap(self.rect(), self._pix)
+
+
+class StatsDialog(QDialog):
+    """Panel de estadísticas (no modal)."""
+    def __init__(self, get_state, get_sessions, get_dark, parent=None, px=lambda v: v):
+        super().__init__(parent)
+        self.setWindowTitle("Estadísticas 📊")
+        self.get_state = get_state
+        self.get_sessions = get_sessions
+        self.get_dark = get_dark
+        self.resize(px(640), px(620))
+        self.renderer = ChartRenderer(self)
+        layout = QVBoxLayout(self)
+        theme_name = lambda: "dark" if self.get_dark() else "light"
+        self.views = [
+            ChartView("daily", self._daily_source, self.renderer, theme_name, self, px(170)),
+            ChartView("bosses", self._bosses_source, self.renderer, theme_name, self, px(170)),
+            ChartView("exp", self._exp_source, self.renderer, theme_name, self, px(170)),
+        ]
+        for v in self.views:
+            layout.addWidget(v, 1)
+        btns = QDialogButtonBox(QDialogButtonBox.Close)
+        btns.rejected.connect(self.close)
+        layout.addWidget(btns)
+
+    # Fuentes: (versión barata, make_data). make_data corre en la GUI (dentro de
+    # ChartRenderer.get) y solo si hay que dibujar: las fotos chicas (días,
+    # jefes) se arman ahí y el hilo recibe listas que nadie más toca. Solo el
+    # historial, que puede ser largo, devuelve un lector (reader()) para el hilo.
+    def _daily_source(self):
+        sessions = self.get_sessions()
+        now = time.time()
+        version = (len(sessions) if sessions is not None else 0, day_of(now))
+        return version, lambda: self._daily_rows(sessions, now)
+
+    def _bosses_source(self):
+        st = self.get_state()
+        past = st.get("bosses") or []
+        version = (len(past), st["boss_name"], st["hp_total"], st["dano_total"])
+        return version, lambda: self._boss_rows(st)
+
+    def _exp_source(self):
+        hist = self.get_state()["history"]
+        return (id(hist), len(hist), hist.exp_sum), hist.reader   # las filas se leen en el hilo de render
+
+    @staticmethod
+    def _daily_rows(sessions, now):
+        """Los últimos CHART_DAYS días (en la GUI: SessionLog no es de otros hilos)."""
+        if sessions is None:
+            return []
+        t1 = now + 1
+        out = []
+        for day, focus, brk in sessions.daily(t1 - CHART_DAYS * 86400, t1)[-CHART_DAYS:]:
+            lt = time.gmtime(day * 86400)   # día local contado desde el epoch
+            out.append((f"{lt.tm_mday:02d}/{lt.tm_mon:02d}", focus, brk))
+        return out
+
+    @staticmethod
+    def _boss_rows(st):
+        """Tuplas de los últimos jefes y el actual (en la GUI: copia del estado vivo)."""
+        past = st.get("bosses") or []
+        rows = [(b.get("name", "?"), b.get("hp", 0), b.get("dano", 0), False) for b in past[-(CHART_BOSSES - 1):]]
+        return rows + [(st["boss_name"], st["hp_total"], st["dano_total"], True)]
+
+    def refresh(self):
+        """Pide lo que haya cambiado (versiones O(1); los datos solo si hace falta)."""
+        for v in self.views:
+            v.refresh()
+
+    def showEvent(self, ev):
+        super().showEvent(ev)
+        QTimer.singleShot(0, self.refresh)
+
+    def shutdown(self):
+        self.renderer.close()
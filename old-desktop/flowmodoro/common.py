@@ -0,0 +1,139 @@
+"""Constantes del juego, estado por defecto y utilidades sin dependencias de Qt."""
+
+import os
+import random
+
+APP_NAME = "Flowmodoro RPG - Mini v12.5"
+STATE_FILENAME = "flowmodoro_rpg_mini_v12_state.json"
+HISTORY_FILENAME = "flowmodoro_rpg_mini_v12_history.bin"
+SESSIONS_FILENAME = "flowmodoro_rpg_mini_v12_sessions.bin"
+# Persistencia: "journal" (snapshot JSON + log de cambios), "sqlite" (WAL, tablas
+# separadas), "binary" (formato compacto de binstate.py) o "json" (volcar el JSON
+# completo en cada guardado)
+STATE_BACKEND = "journal"
+STATE_DB_FILENAME = "flowmodoro_rpg_mini_v12_state.sqlite3"
+STATE_BIN_FILENAME = "flowmodoro_rpg_mini_v12_state.bin"
+DATA_DIR_ENV = "FLOWMODORO_DATA_DIR"
+PROFILE_FILENAME = "flowmodoro_profile.json"  # --profile sin ruta
+
+# ----- Parámetros base -----
+BASE_DANO_DEEP = 10
+BASE_DANO_MINI = 4
+EXP_DEEP = 10
+EXP_MINI = 4
+EXP_REWARD_TOKEN = 50
+TOKEN_COST_SMALL = 1
+TOKEN_COST_BIG = 3
+LEVEL_SIZE = 100
+
+LEVEL_BONUS_DEEP = 2
+LEVEL_BONUS_MINI = 1
+
+BOSS_LOG_MAX = 100   # jefes anteriores guardados en state["bosses"] (gráfico de daño)
+
+BASE_HP_MIN = 10
+BASE_HP_MAX = 30
+HP_PER_LEVEL_MIN = 8
+HP_PER_LEVEL_MAX = 12
+
+# Auto-registro en Enfoque: bloque mini a los 10 min, pasa a deep a los 25 min
+AUTO_MINI_SEC = 10 * 60
+AUTO_DEEP_SEC = 25 * 60
+# Con la ventana oculta/minimizada el cronómetro solo despierta para guardar cada
+# este lapso (los umbrales los despierta la rueda de tiempo, ver scheduler.py)
+HIDDEN_TICK_SEC = 60
+# Los guardados se juntan: a disco como mucho uno por este lapso (y siempre al salir)
+SAVE_INTERVAL_MS = 1000
+
+DIFF_CYCLE = ["facil", "normal", "avanzado", "dinamico"]
+AUTO_FOCUS_VALUES = ("none", "brief", "deep")   # state["auto_registered_focus"]
+DIFF_LABEL = {"facil": "Fácil 1:2", "normal": "Normal 1:3", "avanzado": "Avanzado 1:4", "dinamico": "Dinámico"}
+DIFF_RATIO = {"facil": 2, "normal": 3, "avanzado": 4}  # "dinamico": ver stats.SessionStats.dynamic_ratio
+
+BOSS_NAME_PART_A = [
+    "Thala", "Eldra", "Gor", "Varyn", "Isil", "Ner", "Kael", "Mor", "Silva",
+    "Auren", "Luth", "Fjor", "Arkh", "Zar", "Tarn", "Ael", "Grim", "Veld", "Myra",
+    "Orin", "Syla", "Rhel", "Vel", "Nyra", "Cor", "Ilra", "Fen", "Bryn", "Sor"
+]
+BOSS_NAME_PART_B = [
+    "rion", "wyn", "gorn", "eth", "drel", "vash", "hollow", "dor", "wynne",
+    "mist", "thorn", "dûn", "mar", "hael", "thir", "veil", "brand", "wraith",
+    "bane", "shade", "kall", "moor", "spear", "loom", "spire"
+]
+
+STORY_SNIPPETS = [
+    "El maná fluye más fuerte en tu báculo.",
+    "Las runas del aire responden a tu llamado.",
+    "Tu concentración atraviesa el velo de las dudas.",
+    "La luz del taller revela nuevos patrones en el Tejido.",
+    "Sientes el pulso de la materia obedecer un compás secreto.",
+    "El dragón del flujo te observa, complacido, desde lejos.",
+    "Las calles de Aurora susurran tu nombre entre estudiosas.",
+    "Tu sombra aprende a moverse un segundo antes que tú.",
+    "En tus dedos, la Qualia canta con una voz más clara.",
+    "La madera del báculo guarda el calor de tu última hazaña.",
+    "Las constelaciones reorganizan su mapa, apenas perceptible.",
+    "Un soplo de pan caliente te recuerda que lo pequeño sostiene lo grande.",
+    "El río murmura respuestas que ayer no escuchabas.",
+    "Pequeñas chispas azules trenzan tus pensamientos.",
+    "Aparece un foco de calma: allí cabe una idea difícil.",
+    "Tu respiración marca el tempo del conjuro.",
+    "Los torreones de estudio prenden su vigilia para ti.",
+    "Un sello antiguo se ilumina al pasar tus ojos por la página.",
+    "En el filo del error encontrás un atajo honesto.",
+    "Las dudas se sientan contigo; hoy no estorban, observan.",
+    "El mundo se ordena en hexágonos por un instante.",
+    "La noche te presta un silencio de biblioteca.",
+    "Un recuerdo amable hace de escudo.",
+    "Una punzada de curiosidad abre la puerta correcta.",
+    "El tiempo se hace hueco y cabe tu atención entera.",
+    "La ciudad respira; vos también."
+]
+
+def fantasy_boss_name(rng=random):
+    return rng.choice(BOSS_NAME_PART_A) + rng.choice(BOSS_NAME_PART_B)
+
+def resource_path(fname: str) -> str:
+    # Archivos junto al script principal (directorio padre del paquete), o en
+    # $FLOWMODORO_DATA_DIR si está definido (benchmarks)
+    base = os.environ.get(DATA_DIR_ENV) or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, fname)
+
+DEFAULT_STATE = {
+    "exp_total": 0,
+    "dano_total": 0,
+    "history": [],
+    "hp_total": BASE_HP_MAX,
+    "boss_name": "Sombras sin nombre",
+    "last_level": 1,
+    "story": [],
+    "total_focus_sec": 0,
+    "total_break_sec": 0,
+    "session_focus_sec": 0,
+    "session_break_sec": 0,
+    "auto_registered_focus": "none",
+    "auto_last_idx_focus": None,
+    "difficulty": "normal",
+    "tokens_spent": 0,
+    "bosses": [],        # jefes anteriores: {"name", "hp", "dano"}
+}
+
+def default_state() -> dict:
+    """Copia de DEFAULT_STATE (listas nuevas; sin ida y vuelta por JSON)."""
+    return {k: list(v) if isinstance(v, list) else v for k, v in DEFAULT_STATE.items()}
+
+def fmt_hm(total_seconds: int) -> str:
+    h = total_seconds // 3600
+    m = (total_seconds % 3600) // 60
+    return f"{h:02d}:{m:02d}"
+
+def fmt_hms_signed(seconds: int) -> str:
+    sign = "-" if seconds < 0 else ""
+    seconds = abs(int(seconds))
+    h = seconds // 3600
+    m = (seconds % 3600) // 60
+    s = seconds % 60
+    if h > 0:
+        return f"{sign}{h:02d}:{m:02d}:{s:02d}"
+    else:
+        return f"{sign}{m:02d}:{s:02d}"
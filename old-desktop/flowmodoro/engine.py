@@ -0,0 +1,394 @@
+"""
+Motor del juego: reglas de Flowmodoro RPG sobre el dict de estado.
+
+Sin Qt, sin archivos y sin sonido. Las acciones devuelven una lista de
+eventos (tuplas) que la GUI traduce en diálogos, animaciones y sonidos:
+
+    ("block", tipo, exp, daño)     bloque registrado ("deep" / "mini")
+    ("upgrade", idx, exp, daño)    bloque mini auto-registrado pasa a deep
+    ("boss_defeated", nombre)
+    ("level_up", nivel, línea_de_crónica)
+    ("break_overrun", segundos)    el descanso agotó el balance ganado
+
+El reloj es inyectable (`clock`, en segundos) para poder simular meses de uso
+sin esperar: `advance(n)` aplica n segundos en O(1), incluidos los umbrales de
+auto-registro que se crucen en el medio. El tiempo transcurrido sale siempre
+de anclas sobre ese reloj (`sync()`), nunca de contar disparos del timer, así
+que un event loop bloqueado o una suspensión no pierden segundos.
+"""
+
+import time
+import random
+
+from .common import (
+    BASE_DANO_DEEP, BASE_DANO_MINI, EXP_DEEP, EXP_MINI, EXP_REWARD_TOKEN,
+    LEVEL_SIZE, LEVEL_BONUS_DEEP, LEVEL_BONUS_MINI,
+    BASE_HP_MIN, BASE_HP_MAX, HP_PER_LEVEL_MIN, HP_PER_LEVEL_MAX,
+    AUTO_MINI_SEC, AUTO_DEEP_SEC, BOSS_LOG_MAX, DIFF_CYCLE, DIFF_RATIO, STORY_SNIPPETS,
+    default_state, fantasy_boss_name,
+)
+from .history import HistoryStore
+from .stats import SessionStats
+from .sessions import KIND_FOCUS, KIND_BREAK
+
+if hasattr(time, "CLOCK_BOOTTIME"):
+    def stopwatch_clock() -> float:
+        """Reloj monotónico que sigue corriendo durante la suspensión (Linux)."""
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+else:
+    stopwatch_clock = time.monotonic  # macOS/Windows
+
+MODE_FOCUS = "Enfoque"
+MODE_BREAK = "Descanso"
+
+# Constantes de balance; el simulador las puede sobreescribir por instancia
+DEFAULT_RULES = {
+    "BASE_DANO_DEEP": BASE_DANO_DEEP,
+    "BASE_DANO_MINI": BASE_DANO_MINI,
+    "EXP_DEEP": EXP_DEEP,
+    "EXP_MINI": EXP_MINI,
+    "EXP_REWARD_TOKEN": EXP_REWARD_TOKEN,
+    "LEVEL_SIZE": LEVEL_SIZE,
+    "LEVEL_BONUS_DEEP": LEVEL_BONUS_DEEP,
+    "LEVEL_BONUS_MINI": LEVEL_BONUS_MINI,
+    "BASE_HP_MIN": BASE_HP_MIN,
+    "BASE_HP_MAX": BASE_HP_MAX,
+    "HP_PER_LEVEL_MIN": HP_PER_LEVEL_MIN,
+    "HP_PER_LEVEL_MAX": HP_PER_LEVEL_MAX,
+    "AUTO_MINI_SEC": AUTO_MINI_SEC,
+    "AUTO_DEEP_SEC": AUTO_DEEP_SEC,
+}
+
+
+def new_state(rng=random) -> dict:
+    data = default_state()
+    data["hp_total"] = rng.randint(BASE_HP_MIN, BASE_HP_MAX)
+    data["boss_name"] = fantasy_boss_name(rng)
+    return data
+
+
+class GameEngine:
+    def __init__(self, state: dict, clock=stopwatch_clock, rng=random, rules=None, wall=time.time,
+                 sessions=None):
+        self.state = state
+        self._ensure_history()
+        self.stats = SessionStats.attach(state)
+        self.clock = clock
+        self.wall = wall  # hora local para las cubetas por hora y el ratio dinámico
+        self.sessions = sessions  # SessionLog opcional: cada tramo corrido con inicio y fin
+        self._span_from = None
+        self.rng = rng
+        self.rules = dict(DEFAULT_RULES)
+        if rules:
+            unknown = set(rules) - set(DEFAULT_RULES)
+            if unknown:
+                raise KeyError(f"Reglas desconocidas: {', '.join(sorted(unknown))}")
+            self.rules.update(rules)
+        self.mode = MODE_FOCUS
+        self.running = False
+        self._anchor = None
+        self._load_session()
+
+    def _ensure_history(self):
+        # El historial siempre es un HistoryStore (en memoria si vino como lista)
+        hist = self.state.get("history")
+        if not isinstance(hist, HistoryStore):
+            self.state["history"] = HistoryStore.from_entries(hist or ())
+
+    def _load_session(self):
+        if self.mode == MODE_FOCUS:
+            self.elapsed = int(self.state.get("session_focus_sec", 0))
+            self.auto_registered = self.state.get("auto_registered_focus", "none")
+            self.auto_last_idx = self.state.get("auto_last_idx_focus", None)
+        else:
+            self.elapsed = int(self.state.get("session_break_sec", 0))
+        self._interval_from = self.elapsed
+
+    def close_interval(self):
+        """Pasa a las estadísticas lo corrido desde que se entró al modo actual."""
+        n = self.elapsed - self._interval_from
+        if self.mode == MODE_FOCUS:
+            self.stats.record_focus(n, self.hour(), self.rules["AUTO_MINI_SEC"])
+        else:
+            self.stats.record_break(n)
+        self._interval_from = self.elapsed
+
+    # ---------- Cálculos ----------
+    def level(self):
+        return 1 + (self.state["exp_total"] // self.rules["LEVEL_SIZE"])
+
+    def exp_in_level(self):
+        return self.state["exp_total"] % self.rules["LEVEL_SIZE"]
+
+    def hp_restante(self):
+        return max(0, self.state["hp_total"] - self.state["dano_total"])
+
+    def scaled_damage(self, kind: str):
+        r = self.rules
+        lvl = self.level()
+        if kind == "deep":
+            return r["BASE_DANO_DEEP"] + (lvl - 1) * r["LEVEL_BONUS_DEEP"]
+        else:
+            return r["BASE_DANO_MINI"] + (lvl - 1) * r["LEVEL_BONUS_MINI"]
+
+    def tokens_available(self):
+        generated = self.state["exp_total"] // self.rules["EXP_REWARD_TOKEN"]
+        spent = self.state.get("tokens_spent", 0)
+        return max(0, generated - spent)
+
+    def hour(self) -> int:
+        return time.localtime(self.wall()).tm_hour
+
+    def current_ratio(self):
+        diff = self.state.get("difficulty", "normal")
+        if diff == "dinamico":
+            st = self.state
+            return self.stats.dynamic_ratio(st["total_focus_sec"], st["total_break_sec"], self.hour())
+        return DIFF_RATIO.get(diff, 3)
+
+    def balance_seconds(self):
+        ratio = self.current_ratio()
+        allowed = int(self.state["total_focus_sec"] / ratio)
+        remaining = allowed - self.state["total_break_sec"]
+        return remaining
+
+    def history_stats(self):
+        """Bloques, deep/mini, exp y daño acumulados del historial (O(1))."""
+        return self.state["history"].totals()
+
+    # ---------- Acciones ----------
+    def apply_block(self, kind: str):
+        exp = self.rules["EXP_DEEP"] if kind == "deep" else self.rules["EXP_MINI"]
+        dano = self.scaled_damage(kind)
+        self.state["exp_total"] += exp
+        self.state["dano_total"] += dano
+        self.state["history"].add(kind, exp, dano)
+        events = [("block", kind, exp, dano)]
+        if self.hp_restante() == 0:
+            events.append(("boss_defeated", self.state["boss_name"]))
+        return events + self._check_level_up()
+
+    def upgrade_block(self, idx: int):
+        """Convierte el bloque mini `idx` en deep (cruce de los 25 min)."""
+        r = self.rules
+        add_exp = r["EXP_DEEP"] - r["EXP_MINI"]
+        add_dano = self.scaled_damage("deep") - self.scaled_damage("mini")
+        self.state["exp_total"] += add_exp
+        self.state["dano_total"] += add_dano
+        try:
+            self.state["history"][idx] = {"exp": r["EXP_DEEP"], "dano": self.scaled_damage("deep"), "tipo": "deep"}
+        except Exception:
+            pass
+        return [("upgrade", idx, add_exp, add_dano)] + self._check_level_up()
+
+    def import_blocks(self, raw: bytes):
+        """Bloques importados (filas ROW): van al historial y su EXP cuenta para
+        el nivel; el daño fue a jefes pasados, no al actual."""
+        hist = self.state["history"]
+        exp_before = hist.exp_sum
+        hist.extend_rows(raw)
+        self.state["exp_total"] += hist.exp_sum - exp_before
+        return self._check_level_up()
+
+    def _check_level_up(self):
+        prev_lvl = self.state.get("last_level", 1); new_lvl = self.level()
+        if new_lvl <= prev_lvl:
+            return []
+        line = f"Nivel {new_lvl}: {self.rng.choice(STORY_SNIPPETS)}"
+        self.state["story"].append(line)
+        self.state["last_level"] = new_lvl
+        return [("level_up", new_lvl, line)]
+
+    def new_boss_scaled_hp(self):
+        r = self.rules
+        lvl = self.level()
+        min_hp = r["BASE_HP_MIN"] + (lvl - 1) * r["HP_PER_LEVEL_MIN"]
+        max_hp = r["BASE_HP_MAX"] + (lvl - 1) * r["HP_PER_LEVEL_MAX"]
+        if max_hp < min_hp: max_hp = min_hp + 10
+        st = self.state
+        bosses = st.setdefault("bosses", [])
+        bosses.append({"name": st["boss_name"], "hp": st["hp_total"], "dano": st["dano_total"]})
+        del bosses[:-BOSS_LOG_MAX]
+        self.state["hp_total"] = self.rng.randint(min_hp, max_hp)
+        self.state["dano_total"] = 0
+        self.state["boss_name"] = fantasy_boss_name(self.rng)
+
+    def claim_tokens(self, cost: int) -> bool:
+        if self.tokens_available() < cost:
+            return False
+        self.state["tokens_spent"] = self.state.get("tokens_spent", 0) + cost
+        return True
+
+    def cycle_difficulty(self):
+        cur = self.state.get("difficulty", "normal")
+        idx = DIFF_CYCLE.index(cur) if cur in DIFF_CYCLE else 1
+        nxt = DIFF_CYCLE[(idx + 1) % len(DIFF_CYCLE)]
+        self.state["difficulty"] = nxt
+        return nxt
+
+    def forget_times(self):
+        self.close_interval()
+        self._end_span()
+        for k in ("total_focus_sec", "total_break_sec", "session_focus_sec", "session_break_sec"):
+            self.state[k] = 0
+        self.elapsed = 0
+        self._interval_from = 0
+        self.auto_registered = "none"
+        self.state["auto_registered_focus"] = "none"
+        self.auto_last_idx = None
+        self.state["auto_last_idx_focus"] = None
+        if self.running:
+            self._span_from = (self.wall(), 0)
+
+    def reset(self):
+        hist = self.state["history"]
+        hist.clear()  # mismo store (y mismo archivo), vacío
+        self.state = new_state(self.rng)
+        self.state["history"] = hist
+        self.stats = SessionStats.attach(self.state)
+        self.pause()
+        if self.sessions is not None:
+            self.sessions.clear()  # el registro de intervalos también se resetea
+        self.mode = MODE_FOCUS
+        self._load_session()
+        return self.state
+
+    # ---------- Cronómetro ----------
+    def start(self):
+        if not self.running:
+            self.running = True
+            self._anchor = self.clock()
+            self._span_from = (self.wall(), self.elapsed)
+
+    def pause(self):
+        self._end_span()
+        self.running = False
+        self._anchor = None
+
+    def _end_span(self):
+        """Registra el tramo corrido desde start() (inicio real + segundos acreditados)."""
+        span, self._span_from = self._span_from, None
+        if span is None or self.sessions is None:
+            return
+        w0, e0 = span
+        n = self.elapsed - e0
+        if n > 0:
+            self.sessions.record(KIND_FOCUS if self.mode == MODE_FOCUS else KIND_BREAK, w0, w0 + n)
+
+    def toggle_mode(self):
+        """Guarda la sesión actual, cambia de modo y arranca el cronómetro."""
+        self.close_interval()
+        if self.mode == MODE_FOCUS:
+            self.state["session_focus_sec"] = int(self.elapsed)
+            self.state["auto_registered_focus"] = self.auto_registered
+            self.state["auto_last_idx_focus"] = self.auto_last_idx
+        else:
+            self.state["session_break_sec"] = int(self.elapsed)
+        self.pause()
+        self.mode = MODE_BREAK if self.mode == MODE_FOCUS else MODE_FOCUS
+        self._load_session()
+        self.start()
+        return self.mode
+
+    def ms_to_next_second(self) -> int:
+        """Milisegundos hasta que `sync()` vaya a sumar el próximo segundo."""
+        if not self.running:
+            return 1000
+        frac = (self.clock() - self._anchor) % 1.0
+        return max(1, int((1.0 - frac) * 1000) + 1)
+
+    def tick(self):
+        """Un segundo de cronómetro (lo que hace el QTimer de 1000 ms)."""
+        return self.advance(1)
+
+    def sync(self):
+        """Avanza los segundos enteros transcurridos en `clock` desde el último sync."""
+        if not self.running:
+            return []
+        n = int(self.clock() - self._anchor)
+        if n <= 0:
+            return []
+        self._anchor += n
+        return self.advance(n)
+
+    def advance(self, seconds: int):
+        """Suma `seconds` al modo actual en O(1) y dispara los umbrales cruzados."""
+        seconds = int(seconds)
+        if seconds <= 0:
+            return []
+        prev = self.elapsed
+        self.elapsed += seconds
+        st = self.state
+        if self.mode != MODE_FOCUS:
+            before = self.balance_seconds()
+            st["session_break_sec"] = self.elapsed
+            st["total_break_sec"] += seconds
+            after = self.balance_seconds()
+            return [("break_overrun", -after)] if before > 0 >= after else []
+        st["session_focus_sec"] = self.elapsed
+        st["total_focus_sec"] += seconds
+        return self._check_thresholds(prev)
+
+    def seconds_until_auto(self):
+        """Segundos hasta el próximo umbral de auto-registro (None si no queda ninguno)."""
+        if self.mode != MODE_FOCUS:
+            return None
+        mini_at, deep_at = self.rules["AUTO_MINI_SEC"], self.rules["AUTO_DEEP_SEC"]
+        if self.auto_registered == "none" and mini_at < deep_at:
+            return max(1, mini_at - self.elapsed)
+        if self.auto_registered != "deep":
+            return max(1, deep_at - self.elapsed)
+        return None
+
+    def seconds_until_overrun(self):
+        """Segundos de descanso hasta agotar el balance (None si no aplica)."""
+        if self.mode == MODE_FOCUS:
+            return None
+        bal = self.balance_seconds()
+        return bal if bal > 0 else None
+
+    def deadlines(self) -> dict:
+        """Umbrales pendientes del tramo corrido: nombre -> instante del reloj.
+
+        No cambian mientras corre el cronómetro (salvo el ratio dinámico, que
+        puede correr el aviso de descanso), así que alcanza con registrarlos al
+        arrancar, pausar o cambiar de modo y despertar solo en esos instantes.
+        """
+        if not self.running:
+            return {}
+        out = {}
+        if self.mode == MODE_FOCUS:
+            mini_at, deep_at = self.rules["AUTO_MINI_SEC"], self.rules["AUTO_DEEP_SEC"]
+            if self.auto_registered == "none" and mini_at < deep_at:
+                out["auto_mini"] = self._anchor + max(1, mini_at - self.elapsed)
+            if self.auto_registered != "deep":
+                out["auto_deep"] = self._anchor + max(1, deep_at - self.elapsed)
+        else:
+            due = self.seconds_until_overrun()
+            if due is not None:
+                out["break_overrun"] = self._anchor + due
+        return out
+
+    def _check_thresholds(self, prev: int):
+        # Mismo resultado que evaluar segundo a segundo: si el tramo cruza los
+        # 10 min antes de los 25, primero se registra el mini y luego se mejora.
+        mini_at, deep_at = self.rules["AUTO_MINI_SEC"], self.rules["AUTO_DEEP_SEC"]
+        events = []
+        if (self.auto_registered == "none" and self.elapsed >= mini_at
+                and max(prev + 1, mini_at) < deep_at):
+            events += self.apply_block("mini")
+            self.auto_registered = "brief"
+            self.auto_last_idx = len(self.state["history"]) - 1
+            self.state["auto_registered_focus"] = "brief"
+            self.state["auto_last_idx_focus"] = self.auto_last_idx
+        if self.elapsed >= deep_at and self.auto_registered != "deep":
+            if self.auto_registered == "brief" and self.auto_last_idx is not None:
+                events += self.upgrade_block(self.auto_last_idx)
+                self.auto_registered = "deep"
+                self.state["auto_registered_focus"] = "deep"
+            else:
+                events += self.apply_block("deep")
+                self.auto_registered = "deep"
+                self.state["auto_registered_focus"] = "deep"
+                self.state["auto_last_idx_focus"] = None
+        return events
@@ -0,0 +1,330 @@
+"""
+Exportación en streaming de historial, crónicas y tiempos (sin Qt).
+
+    FlowmodoroRPG.py export history -o historial.csv
+    FlowmodoroRPG.py export sessions --since 2026-10-01 --kind focus --format jsonl
+    FlowmodoroRPG.py export daily --format parquet -o dias.parquet
+
+Conjuntos: `history` (bloques), `story` (crónicas), `sessions` (intervalos de
+enfoque/descanso con hora) y `daily` (segundos por día). Formatos: CSV, JSON
+Lines y Parquet (columnar; necesita pyarrow, que es opcional).
+
+Cada conjunto es un generador de tuplas que lee de a CHUNK_ROWS filas, y los
+escritores las van volcando: la memoria no depende del tamaño del historial.
+`snapshot()` es lo único que toca el estado vivo (barato; en la GUI corre en
+su hilo): fija qué filas entran y devuelve una función que arma el generador
+leyendo con archivos o conexiones propios, así que la exportación corre en
+otro hilo mientras el cronómetro sigue.
+
+Los bloques y las crónicas no tienen fecha: --since/--until filtran
+`sessions` y `daily`. --kind filtra deep/mini en `history` y focus/break en
+`sessions`.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import importlib.util
+from contextlib import contextmanager
+
+from .common import (
+    STATE_BACKEND, STATE_FILENAME, STATE_DB_FILENAME, STATE_BIN_FILENAME, HISTORY_FILENAME, SESSIONS_FILENAME,
+    STORY_SNIPPETS, DIFF_CYCLE, AUTO_FOCUS_VALUES, DEFAULT_STATE, resource_path,
+)
+from .engine import new_state
+from .history import HistoryStore, KINDS as HIST_KINDS, ROW, open_history, json_ready
+from .journal import StateJournal
+from .sessions import SessionLog, KINDS as SESSION_KINDS
+from .writer import atomic_write
+
+CHUNK_ROWS = 4096
+FORMATS = ("csv", "jsonl", "parquet")
+FIELDS = {
+    "history": ("block", "tipo", "exp", "dano"),
+    "story": ("n", "line"),
+    "sessions": ("start", "end", "kind", "sec"),
+    "daily": ("date", "focus_sec", "break_sec"),
+}
+DATASETS = tuple(FIELDS)
+KIND_CHOICES = {"history": HIST_KINDS, "sessions": SESSION_KINDS}
+DATED = ("sessions", "daily")
+
+
+class Cancelled(Exception):
+    pass
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def parse_day(text: str) -> float:
+    """'AAAA-MM-DD' -> epoch del comienzo de ese día (hora local)."""
+    t = time.strptime(text, "%Y-%m-%d")
+    return time.mktime((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+def _iso(t: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t))
+
+
+# ---------- Fuentes ----------
+def snapshot(dataset: str, state: dict, sessions=None, since: float = None, until: float = None, kind: str = None):
+    """Fija las filas a exportar y devuelve `rows()` -> generador de tuplas
+    (en el orden de FIELDS[dataset]). Lo que devuelve se puede llamar desde otro
+    hilo. `until` es exclusivo. ValueError si el conjunto no se puede exportar."""
+    if kind is not None and kind not in KIND_CHOICES.get(dataset, ()):
+        raise ValueError(f"--kind {kind} no aplica a {dataset}")
+    if dataset == "history":
+        hist = state.get("history") or []
+        if not isinstance(hist, HistoryStore):
+            hist = HistoryStore.from_entries(hist)
+        return _history_rows(hist.reader(), len(hist), None if kind is None else HIST_KINDS.index(kind))
+    if dataset == "story":
+        return _story_rows(state.get("story") or [])
+    if sessions is None:
+        raise ValueError("no hay registro de intervalos")
+    span = sessions.span()
+    if span is None:
+        return lambda: iter(())
+    t0 = span[0] if since is None else since
+    t1 = span[1] + 1 if until is None else until
+    if dataset == "sessions":
+        return _session_rows(sessions.reader(t0, t1), t0, t1, None if kind is None else SESSION_KINDS.index(kind))
+    if dataset == "daily":
+        days = sessions.daily(t0, t1) if t1 > t0 else []   # una tupla por día: chico
+        # Número de día local contado desde el epoch: gmtime da la fecha local
+        return lambda: ((time.strftime("%Y-%m-%d", time.gmtime(d * 86400)), f, b) for d, f, b in days)
+    raise ValueError(f"conjunto desconocido: {dataset}")
+
+
+def _history_rows(read, count, kind_idx):
+    def rows():
+        for lo in range(0, count, CHUNK_ROWS):
+            hi = min(count, lo + CHUNK_ROWS)
+            raw = read(lo, hi)
+            # SQLite poda los bloques más viejos: las filas que vuelven son las últimas del rango
+            first = hi - len(raw) // ROW.size
+            for i, (k, e, d) in enumerate(ROW.iter_unpack(raw), first + 1):
+                if kind_idx is None or k == kind_idx:
+                    yield i, HIST_KINDS[k], e, d
+    return rows
+
+
+def _story_rows(story):
+    count = len(story)
+
+    def rows():
+        for lo in range(0, count, CHUNK_ROWS):
+            for i, line in enumerate(story[lo:min(count, lo + CHUNK_ROWS)], lo + 1):
+                yield i, line
+    return rows
+
+
+def _session_rows(read, t0, t1, kind_idx):
+    def rows():
+        for start, end, k in read():
+            if end > t0 and start < t1 and (kind_idx is None or k == kind_idx):
+                yield _iso(start), _iso(end), SESSION_KINDS[k], end - start
+    return rows
+
+
+# ---------- Escritura ----------
+def _checked(rows, cancel, progress):
+    n = 0
+    for r in rows:
+        yield r
+        n += 1
+        if n % CHUNK_ROWS == 0:
+            if cancel is not None and cancel.is_set():
+                raise Cancelled()
+            if progress is not None:
+                progress(n)
+
+
+def _write_text(rows, fields, fmt, f) -> int:
+    n = 0
+    if fmt == "csv":
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(fields)
+        for r in rows:
+            w.writerow(r); n += 1
+        return n
+    for r in rows:
+        f.write(json.dumps(dict(zip(fields, r)), ensure_ascii=False) + "\n"); n += 1
+    return n
+
+
+def _write_parquet(rows, fields, path) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    n = 0
+    out = None
+    try:
+        batch = []
+        for r in rows:
+            batch.append(r)
+            if len(batch) == CHUNK_ROWS:
+                out = _parquet_batch(pa, pq, out, path, fields, batch); n += len(batch); batch = []
+        if batch or out is None:
+            out = _parquet_batch(pa, pq, out, path, fields, batch); n += len(batch)
+    finally:
+        if out is not None:
+            out.close()
+    return n
+
+
+def _parquet_batch(pa, pq, out, path, fields, batch):
+    cols = list(zip(*batch)) if batch else [() for _ in fields]
+    table = pa.Table.from_arrays([pa.array(c) for c in cols], names=list(fields))
+    if out is None:
+        out = pq.ParquetWriter(path, table.schema)
+    out.write_table(table.cast(out.schema))
+    return out
+
+
+def export(rows, dataset: str, fmt: str, out: str = None, cancel=None, progress=None) -> int:
+    """Escribe las filas en `out` (temporal + rename; sin `out`, a stdout).
+    Devuelve cuántas filas escribió. `cancel` (threading.Event) y `progress(n)`
+    se miran cada CHUNK_ROWS filas; cancelar levanta Cancelled y no deja archivo."""
+    if fmt not in FORMATS:
+        raise ValueError(f"formato desconocido: {fmt}")
+    if fmt == "parquet" and not parquet_available():
+        raise RuntimeError("el formato parquet necesita pyarrow (pip install pyarrow)")
+    fields = FIELDS[dataset]
+    rows = _checked(rows(), cancel, progress)
+    if out is None:
+        if fmt == "parquet":
+            raise ValueError("parquet necesita un archivo de salida (-o)")
+        return _write_text(rows, fields, fmt, sys.stdout)
+    tmp = out + ".tmp"
+    try:
+        if fmt == "parquet":
+            n = _write_parquet(rows, fields, tmp)
+        else:
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                n = _write_text(rows, fields, fmt, f)
+        os.replace(tmp, out)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return n
+
+
+# ---------- Línea de comandos ----------
+@contextmanager
+def saved_data(storage: str = STATE_BACKEND, save: bool = False):
+    """(estado, SessionLog o None) guardados, leídos sin la GUI. Con save=True,
+    al salir sin error el estado se guarda con el mismo backend (como al cerrar
+    la app). La GUI no tiene que estar abierta sobre los mismos archivos."""
+    closing = []
+    store = None
+    try:
+        data = None
+        if storage == "sqlite":
+            from .sqlstore import SqliteStore
+            store = SqliteStore(resource_path(STATE_DB_FILENAME))
+            data = store.load()
+        elif storage == "binary":
+            from .binstate import BinaryStore
+            store = BinaryStore(resource_path(STATE_BIN_FILENAME))
+            data = store.load()
+        elif storage == "journal":
+            store = _journal()
+        if data is None:
+            data = _read_json(storage, store) or new_state()
+        for k, v in DEFAULT_STATE.items():
+            if k not in data:
+                data[k] = list(v) if isinstance(v, list) else v
+        hist = data.get("history")
+        if not (isinstance(hist, HistoryStore) and hist.path is not None):   # SqlHistory ya tiene ruta
+            path = resource_path(HISTORY_FILENAME)
+            if save:
+                data["history"] = open_history(path, hist)   # como en la GUI: migra la lista
+            elif os.path.exists(path):
+                disk = HistoryStore(path)
+                if len(disk) or not hist:
+                    data["history"] = disk   # el archivo en columnas manda
+            if isinstance(data["history"], HistoryStore):
+                closing.append(data["history"].close)
+        sessions = None
+        if save or os.path.exists(resource_path(SESSIONS_FILENAME)):
+            sessions = SessionLog(resource_path(SESSIONS_FILENAME))
+            closing.append(sessions.close)
+        yield data, sessions
+        if save:
+            if store is not None:
+                store.close(data)
+                store = None
+            else:
+                raw = json.dumps(json_ready(data), ensure_ascii=False, indent=2).encode("utf-8")
+                atomic_write(resource_path(STATE_FILENAME), raw)
+    finally:
+        if store is not None:
+            store.close()
+        for close in reversed(closing):
+            close()
+
+
+def _journal():
+    return StateJournal(resource_path(STATE_FILENAME), story_snippets=STORY_SNIPPETS,
+                        enums={"difficulty": DIFF_CYCLE, "auto_registered_focus": AUTO_FOCUS_VALUES})
+
+
+def _read_json(storage, store=None):
+    """El JSON de estado (con su log si es el journal), o None."""
+    path = resource_path(STATE_FILENAME)
+    if not os.path.exists(path):
+        return None
+    if storage == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    journal = store if storage == "journal" else _journal()
+    try:
+        return journal.load()
+    finally:
+        if journal is not store:
+            journal.close()
+
+
+def _day(text):
+    try:
+        return parse_day(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida (AAAA-MM-DD): {text}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="FlowmodoroRPG.py export", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("dataset", choices=DATASETS)
+    ap.add_argument("--format", choices=FORMATS, default="csv")
+    ap.add_argument("-o", "--out", help="archivo de salida (si no, a stdout; parquet necesita archivo)")
+    ap.add_argument("--since", type=_day, help="desde este día, AAAA-MM-DD (sessions/daily)")
+    ap.add_argument("--until", type=_day, help="hasta este día inclusive, AAAA-MM-DD (sessions/daily)")
+    ap.add_argument("--kind", help="deep/mini (history) o focus/break (sessions)")
+    ap.add_argument("--storage", choices=("journal", "sqlite", "binary", "json"), default=STATE_BACKEND)
+    args = ap.parse_args(argv)
+    if args.dataset not in DATED and (args.since is not None or args.until is not None):
+        ap.error(f"--since/--until no aplican a {args.dataset} (sin fechas)")
+    until = None if args.until is None else parse_day(time.strftime("%Y-%m-%d", time.localtime(args.until + 36 * 3600)))
+
+    with saved_data(args.storage) as (state, sessions):
+        try:
+            rows = snapshot(args.dataset, state, sessions, args.since, until, args.kind)
+            n = export(rows, args.dataset, args.format, args.out)
+        except (ValueError, RuntimeError) as e:
+            print(f"export: {e}", file=sys.stderr)
+            return 2
+    if args.out:
+        print(f"{n} filas -> {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Diálogos de exportación e importación (PyQt5) sobre `export.py` e `importer.py`.
+
+Al pulsar "Exportar…" el hilo de la GUI solo toma la foto del conjunto
+(`export.snapshot`: largo del historial, filas del registro de intervalos del
+rango); el recorrido y la escritura corren en el hilo `export`, que avisa el
+avance por señales en cola. El cronómetro y la animación siguen mientras
+tanto. Una exportación a la vez; cancelar no deja archivo a medias.
+
+La importación lee y deduplica en el hilo `import`; cada tanda de CHUNK_ROWS
+bloques vuelve a la GUI por señal y se aplica ahí (engine + guardado con
+debounce). Hay a lo sumo PENDING_CHUNKS tandas en cola: si la GUI se atrasa,
+el lector espera en vez de llenar la memoria. El registro de intervalos se
+reemplaza al final, también desde la GUI.
+"""
+
+import os
+import time
+import threading
+
+from PyQt5.QtCore import QDate, pyqtSignal
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox, QCheckBox, QDateEdit, QLabel, QPushButton,
+    QFileDialog, QMessageBox, QProgressBar,
+)
+
+from . import export, importer
+
+DATASET_LABELS = (
+    ("history", "Historial de bloques"),
+    ("story", "Crónicas"),
+    ("sessions", "Intervalos (enfoque / descanso)"),
+    ("daily", "Tiempo por día"),
+)
+FORMAT_LABELS = {"csv": "CSV", "jsonl": "JSON Lines", "parquet": "Parquet (columnar)"}
+FILE_FILTERS = {"csv": "CSV (*.csv)", "jsonl": "JSON Lines (*.jsonl)", "parquet": "Parquet (*.parquet)"}
+IMPORT_FILTER = "JSON / JSON Lines (*.json *.jsonl *.ndjson);;Todos (*)"
+PENDING_CHUNKS = 4
+
+
+class ExportDialog(QDialog):
+    """Exportar historial, crónicas o tiempos (ventana no modal)."""
+    _progress = pyqtSignal(int)
+    _finished = pyqtSignal(str, int, str)   # ruta, filas, error ("" si salió bien)
+
+    def __init__(self, get_state, get_sessions, parent=None, px=lambda v: v):
+        super().__init__(parent)
+        self.setWindowTitle("Exportar 📤")
+        self.get_state = get_state
+        self.get_sessions = get_sessions
+        self._thread = None
+        self._cancel = threading.Event()
+        self.resize(px(420), px(0))
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout(); form.setSpacing(px(6))
+        self.cmb_dataset = QComboBox()
+        for key, label in DATASET_LABELS:
+            self.cmb_dataset.addItem(label, key)
+        self.cmb_format = QComboBox()
+        for key in export.FORMATS:
+            if key != "parquet" or export.parquet_available():
+                self.cmb_format.addItem(FORMAT_LABELS[key], key)
+        self.cmb_kind = QComboBox()
+        self.chk_dates = QCheckBox("Solo entre")
+        today = QDate.currentDate()
+        self.date_from = QDateEdit(today.addDays(-30)); self.date_from.setCalendarPopup(True)
+        self.date_to = QDateEdit(today); self.date_to.setCalendarPopup(True)
+        row_dates = QHBoxLayout()
+        row_dates.addWidget(self.chk_dates); row_dates.addWidget(self.date_from)
+        row_dates.addWidget(QLabel("y")); row_dates.addWidget(self.date_to); row_dates.addStretch(1)
+        form.addRow("Datos:", self.cmb_dataset)
+        form.addRow("Formato:", self.cmb_format)
+        form.addRow("Tipo:", self.cmb_kind)
+        form.addRow("Fechas:", row_dates)
+        layout.addLayout(form)
+
+        self.lbl_status = QLabel(""); self.lbl_status.setObjectName("muted"); self.lbl_status.setWordWrap(True)
+        layout.addWidget(self.lbl_status)
+        row_btns = QHBoxLayout()
+        self.btn_export = QPushButton("Exportar…"); self.btn_export.setObjectName("primary")
+        self.btn_cancel = QPushButton("Cancelar"); self.btn_cancel.setEnabled(False)
+        btn_close = QPushButton("Cerrar")
+        row_btns.addStretch(1); row_btns.addWidget(self.btn_cancel); row_btns.addWidget(self.btn_export); row_btns.addWidget(btn_close)
+        layout.addLayout(row_btns)
+
+        self.cmb_dataset.currentIndexChanged.connect(self._on_dataset)
+        self.chk_dates.toggled.connect(self._on_dataset)
+        self.btn_export.clicked.connect(self.start)
+        self.btn_cancel.clicked.connect(self._cancel.set)
+        btn_close.clicked.connect(self.close)
+        self._progress.connect(lambda n: self.lbl_status.setText(f"Exportando… {n} filas"))
+        self._finished.connect(self._on_finished)
+        self._on_dataset()
+
+    def _on_dataset(self, *_):
+        ds = self.cmb_dataset.currentData()
+        kinds = export.KIND_CHOICES.get(ds, ())
+        self.cmb_kind.clear()
+        self.cmb_kind.addItem("Todos", None)
+        for k in kinds:
+            self.cmb_kind.addItem(k, k)
+        self.cmb_kind.setEnabled(bool(kinds))
+        dated = ds in export.DATED
+        self.chk_dates.setEnabled(dated)
+        self.date_from.setEnabled(dated and self.chk_dates.isChecked())
+        self.date_to.setEnabled(dated and self.chk_dates.isChecked())
+
+    def _range(self):
+        if not (self.chk_dates.isEnabled() and self.chk_dates.isChecked()):
+            return None, None
+        d0, d1 = self.date_from.date(), self.date_to.date().addDays(1)   # hasta inclusive
+        since = time.mktime((d0.year(), d0.month(), d0.day(), 0, 0, 0, 0, 0, -1))
+        until = time.mktime((d1.year(), d1.month(), d1.day(), 0, 0, 0, 0, 0, -1))
+        return since, until
+
+    def busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.busy():
+            return
+        ds, fmt = self.cmb_dataset.currentData(), self.cmb_format.currentData()
+        stamp = time.strftime("%Y%m%d")
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar", f"flowmodoro_{ds}_{stamp}.{fmt}", FILE_FILTERS[fmt])
+        if not path:
+            return
+        since, until = self._range()
+        try:
+            rows = export.snapshot(ds, self.get_state(), self.get_sessions(), since, until, self.cmb_kind.currentData())
+        except ValueError as e:
+            QMessageBox.warning(self, "Exportar", str(e))
+            return
+        self._cancel.clear()
+        self.btn_export.setEnabled(False); self.btn_cancel.setEnabled(True)
+        self.lbl_status.setText("Exportando…")
+        self._thread = threading.Thread(target=self._run, args=(rows, ds, fmt, path), name="export", daemon=True)
+        self._thread.start()
+
+    def _run(self, rows, ds, fmt, path):
+        try:
+            n = export.export(rows, ds, fmt, path, cancel=self._cancel, progress=self._progress.emit)
+            self._finished.emit(path, n, "")
+        except export.Cancelled:
+            self._finished.emit(path, -1, "")
+        except Exception as e:
+            self._finished.emit(path, -1, str(e) or type(e).__name__)
+
+    def _on_finished(self, path, n, error):
+        self.btn_export.setEnabled(True); self.btn_cancel.setEnabled(False)
+        if error:
+            self.lbl_status.setText("")
+            QMessageBox.warning(self, "Exportar", f"No se pudo exportar:\n{error}")
+        elif n < 0:
+            self.lbl_status.setText("Exportación cancelada.")
+        else:
+            self.lbl_status.setText(f"{n} filas → {path}")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Cancela la exportación en curso (al cerrar la app)."""
+        self._cancel.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class ImportDialog(QDialog):
+    """Importar estados de la web / escritorio y archivos exportados (no modal).
+    apply_blocks(filas, huella, tomadas) y replace_sessions(ruta, n, web) son los de
+    `Importer.run`; se llaman siempre en el hilo de la GUI. Las preguntas de
+    `confirm` (bloques en duda) se hacen con un diálogo mientras el hilo espera."""
+    _progress = pyqtSignal(int)                # por mil
+    _blocks = pyqtSignal(bytes, str, int)
+    _sessions = pyqtSignal(object, int, object)
+    _ask = pyqtSignal(str, int, str)           # ruta, bloques en duda, motivo
+    _finished = pyqtSignal(object, str)        # informe (None si se canceló), error
+    imported = pyqtSignal()                    # terminó (o se cortó) una importación real
+
+    def __init__(self, get_state, get_sessions, apply_blocks, replace_sessions, parent=None, px=lambda v: v):
+        super().__init__(parent)
+        self.setWindowTitle("Importar 📥")
+        self.get_state = get_state
+        self.get_sessions = get_sessions
+        self.apply_blocks = apply_blocks
+        self.replace_sessions = replace_sessions
+        self._thread = None
+        self._cancel = threading.Event()
+        self._slots = threading.Semaphore(PENDING_CHUNKS)
+        self._answered = threading.Event()
+        self._answer = True
+        self.resize(px(420), px(0))
+
+        layout = QVBoxLayout(self)
+        lbl_help = QLabel("Estado guardado de la web o de otra instalación, o historial / intervalos "
+                          "exportados. Lo que ya está no se duplica.")
+        lbl_help.setWordWrap(True)
+        layout.addWidget(lbl_help)
+        self.chk_dry = QCheckBox("Solo simular (contar sin cambiar nada)")
+        layout.addWidget(self.chk_dry)
+        self.bar = QProgressBar(); self.bar.setRange(0, 1000); self.bar.setTextVisible(False)
+        layout.addWidget(self.bar)
+        self.lbl_status = QLabel(""); self.lbl_status.setObjectName("muted"); self.lbl_status.setWordWrap(True)
+        layout.addWidget(self.lbl_status)
+        row_btns = QHBoxLayout()
+        self.btn_import = QPushButton("Elegir archivos…"); self.btn_import.setObjectName("primary")
+        self.btn_cancel = QPushButton("Cancelar"); self.btn_cancel.setEnabled(False)
+        btn_close = QPushButton("Cerrar")
+        row_btns.addStretch(1); row_btns.addWidget(self.btn_cancel); row_btns.addWidget(self.btn_import); row_btns.addWidget(btn_close)
+        layout.addLayout(row_btns)
+
+        self.btn_import.clicked.connect(self.choose)
+        self.btn_cancel.clicked.connect(self._cancel.set)
+        btn_close.clicked.connect(self.close)
+        self._progress.connect(self.bar.setValue)
+        self._blocks.connect(self._on_blocks)
+        self._sessions.connect(self.replace_sessions)
+        self._ask.connect(self._on_ask)
+        self._finished.connect(self._on_finished)
+
+    def busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def choose(self):
+        if self.busy():
+            return
+        paths, _ = QFileDialog.getOpenFileNames(self, "Importar", "", IMPORT_FILTER)
+        if paths:
+            self.start(paths, self.chk_dry.isChecked())
+
+    def start(self, paths, dry_run=False):
+        if self.busy():
+            return
+        self._cancel.clear()
+        try:
+            job = importer.Importer(paths, self.get_state(), self.get_sessions(), dry_run,
+                                    progress=self._on_progress, cancel=self._cancel, confirm=self._confirm)
+        except OSError as e:
+            QMessageBox.warning(self, "Importar", str(e))
+            return
+        self.btn_import.setEnabled(False); self.btn_cancel.setEnabled(True); self.chk_dry.setEnabled(False)
+        self.bar.setValue(0)
+        self.lbl_status.setText("Simulando…" if dry_run else "Importando…")
+        self._thread = threading.Thread(target=self._run, args=(job,), name="import", daemon=True)
+        self._thread.start()
+
+    # ---------- Hilo "import" ----------
+    def _on_progress(self, done, total):
+        self._progress.emit(done * 1000 // max(1, total))
+
+    def _emit_blocks(self, raw, fp, upto):
+        while not self._slots.acquire(timeout=0.1):
+            if self._cancel.is_set():
+                raise importer.Cancelled()
+        self._blocks.emit(raw, fp, upto)
+
+    def _confirm(self, path, n, why):
+        self._answered.clear()
+        self._ask.emit(path, n, why)
+        while not self._answered.wait(0.1):
+            if self._cancel.is_set():
+                raise importer.Cancelled()
+        return self._answer
+
+    def _run(self, job):
+        try:
+            report = job.run(self._emit_blocks, self._sessions.emit)
+            self._finished.emit(report, "")
+        except importer.Cancelled:
+            self._finished.emit(None, "")
+        except Exception as e:
+            self._finished.emit(None, str(e) or type(e).__name__)
+
+    # ---------- Hilo de la GUI ----------
+    def _on_blocks(self, raw, fp, upto):
+        try:
+            self.apply_blocks(raw, fp, upto)
+        finally:
+            self._slots.release()
+
+    def _on_ask(self, path, n, why):
+        text = importer.QUESTIONS[why].format(n=n, name=os.path.basename(path))
+        ans = QMessageBox.question(self, "Importar", text, QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        self._answer = ans == QMessageBox.Yes
+        self._answered.set()
+
+    def _on_finished(self, report, error):
+        self.btn_import.setEnabled(True); self.btn_cancel.setEnabled(False); self.chk_dry.setEnabled(True)
+        if not self.chk_dry.isChecked():
+            self.imported.emit()
+        if error:
+            self.lbl_status.setText("")
+            QMessageBox.warning(self, "Importar", f"No se pudo importar:\n{error}")
+        elif report is None:
+            self.lbl_status.setText("Importación cancelada (lo ya aplicado queda).")
+        else:
+            self.bar.setValue(1000)
+            dup = f" ({report['blocks_duplicate']} ya estaban)" if report["blocks_duplicate"] else ""
+            skipped = f", {report['skipped']} entradas ignoradas" if report["skipped"] else ""
+            self.lbl_status.setText(
+                f"{'Se agregarían' if self.chk_dry.isChecked() else 'Agregados'}: "
+                f"{report['blocks_added']} de {report['blocks_read']} bloques{dup}, "
+                f"{report['intervals_added']} de {report['intervals_read']} intervalos{skipped}.")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Corta la importación en curso (al cerrar la app); lo aplicado queda."""
+        self._cancel.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,787 @@
+"""Ventana principal y diálogos (PyQt5)."""
+
+import os
+import json
+import threading
+
+from PyQt5.QtCore import Qt, QObject, pyqtSignal, QEasingCurve, QTimer, QEvent
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+    QProgressBar, QPushButton, QMessageBox, QGroupBox, QGraphicsOpacityEffect,
+    QScrollArea, QDialog, QDialogButtonBox
+)
+
+from .common import (
+    APP_NAME, HIDDEN_TICK_SEC, SAVE_INTERVAL_MS, STATE_FILENAME, HISTORY_FILENAME, SESSIONS_FILENAME,
+    STATE_BACKEND, STATE_DB_FILENAME, STATE_BIN_FILENAME, AUTO_FOCUS_VALUES,
+    TOKEN_COST_SMALL, TOKEN_COST_BIG, LEVEL_SIZE, BASE_HP_MAX,
+    DIFF_CYCLE, STORY_SNIPPETS, DEFAULT_STATE,
+    fantasy_boss_name, resource_path,
+)
+from .engine import GameEngine, new_state
+from .history import HistoryStore, open_history, json_ready
+from .sessions import SessionLog
+from .scheduler import TimingWheel
+from .audio import SoundBank
+from .journal import StateJournal
+from .writer import StateWriter
+from .overlay import BossHpOverlay
+from .animations import AnimationManager, ANIM_FULL
+from .viewmodel import ViewModel, derive_view
+from .theme import ThemeEngine, probe_dark_mode, store_cached_theme
+
+class FirstPaintWatcher(QObject):
+    """Llama a `callback` una sola vez, en el primer paint de `widget`."""
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.widget = widget
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, ev):
+        if obj is self.widget and ev.type() == QEvent.Paint and self.callback is not None:
+            cb, self.callback = self.callback, None
+            self.widget.removeEventFilter(self)
+            # Diferir al final del paint actual
+            QTimer.singleShot(0, cb)
+        return False
+
+class ThemeWatcher(QObject):
+    """Re-sondea el tema del escritorio en un hilo y avisa si cambió."""
+    changed = pyqtSignal(bool)
+    _probed = pyqtSignal(bool)
+
+    def __init__(self, dark: bool, parent=None, interval_ms: int = 10 * 60 * 1000):
+        super().__init__(parent)
+        self.dark = dark
+        self._busy = False
+        self._probed.connect(self._on_probed)  # vuelve al hilo de la GUI (conexión en cola)
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.revalidate)
+
+    def start(self, first_delay_ms: int = 1500):
+        QTimer.singleShot(first_delay_ms, self.revalidate)
+        self.timer.start()
+
+    def revalidate(self):
+        if self._busy:
+            return
+        self._busy = True
+        threading.Thread(target=self._worker, name="theme-revalidate", daemon=True).start()
+
+    def _worker(self):
+        dark = probe_dark_mode()
+        store_cached_theme(dark)
+        self._probed.emit(dark)
+
+    def _on_probed(self, dark: bool):
+        self._busy = False
+        if dark != self.dark:
+            self.dark = dark
+            self.changed.emit(dark)
+
+class LevelUpDialog(QDialog):
+    def __init__(self, level, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("¡Subiste de nivel!")
+        self.setModal(True)
+        self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
+        self.setAccessibleName("Nivel alcanzado")
+        self.setMinimumWidth(320)
+        layout = QVBoxLayout(self)
+        lbl = QLabel(f"🎉 ¡Felicidades!\nAlcanzaste el nivel {level}.")
+        lbl.setAlignment(Qt.AlignCenter)
+        lbl.setStyleSheet("font-size: 18pt; font-weight: bold;")
+        layout.addWidget(lbl)
+        btns = QDialogButtonBox(QDialogButtonBox.Ok)
+        btns.accepted.connect(self.accept)
+        layout.addWidget(btns)
+        self.setFocus()
+        self.setAttribute(Qt.WA_ShowWithoutActivating, False)
+
+class MainWindow(QMainWindow):
+    _write_failed = pyqtSignal(str)   # del hilo escritor a la GUI (conexión en cola)
+
+    def __init__(self, dark_mode: bool, ui_scale: float = 1.0, anim_mode: str = ANIM_FULL,
+                 storage: str = STATE_BACKEND, theme: ThemeEngine = None):
+        super().__init__()
+        self.setWindowTitle(APP_NAME)
+        self.ui_scale = ui_scale
+        self.px = lambda v: int(round(v * self.ui_scale))
+        self.setMinimumWidth(self.px(760))
+        self.dark_mode = dark_mode
+        # Hoja + paleta del tema; los colores de estado van por paleta (sin setStyleSheet)
+        self.theme = theme or ThemeEngine(QApplication.instance(), dark_mode)
+
+        self.state_path = resource_path(STATE_FILENAME)
+
+        # La E/S de los guardados va a un hilo; save_state() solo marca el estado
+        # y un timer junta los cambios en una escritura por SAVE_INTERVAL_MS
+        self._write_failed.connect(self._on_write_failed)
+        self._write_error_open = False
+        self.writer = StateWriter(on_error=lambda path, e: self._write_failed.emit(f"{path}: {e}"))
+        self._dirty = False
+        self.save_timer = QTimer(self); self.save_timer.setSingleShot(True); self.save_timer.setInterval(SAVE_INTERVAL_MS)
+        self.save_timer.timeout.connect(self.flush_state)
+
+        # Backend de persistencia: objeto con load / commit / close (None = JSON plano).
+        # SQLite y binario se importan solo si se eligen (sqlite3 cuesta al arrancar)
+        self.storage = storage
+        self.store = None
+        if storage == "journal":
+            self.store = self._journal(self.writer)
+        elif storage == "sqlite":
+            from .sqlstore import SqliteStore
+            # Cada transacción se confirma en el hilo escritor; lo abierto sale a los batch_sec
+            self.store = SqliteStore(resource_path(STATE_DB_FILENAME), writer=self.writer)
+            self.sql_timer = QTimer(self); self.sql_timer.setSingleShot(True)
+            self.sql_timer.setInterval(int(self.store.batch_sec * 1000))
+            self.sql_timer.timeout.connect(self.store.flush)
+            self.store.on_begin = self.sql_timer.start
+        elif storage == "binary":
+            from .binstate import BinaryStore
+            self.store = BinaryStore(resource_path(STATE_BIN_FILENAME), self.writer)
+        # Reglas, cronómetro y auto-registro viven en el motor (sin Qt)
+        try:
+            self.sessions = SessionLog(resource_path(SESSIONS_FILENAME), self.writer)
+        except OSError:
+            self.sessions = None  # sin registro de intervalos; el resto sigue igual
+        self.engine = GameEngine(self.load_state(), sessions=self.sessions)
+        # El tiempo sale del reloj monotónico del motor; el timer solo despierta
+        # para refrescar (cada segundo visible, cada HIDDEN_TICK_SEC si está oculta)
+        self.stop_timer = QTimer(self); self.stop_timer.setSingleShot(True); self.stop_timer.setTimerType(Qt.PreciseTimer)
+        self.stop_timer.timeout.connect(self.on_stopwatch_tick)
+        self._shown_elapsed = None
+        # Umbrales del motor (auto-registro, descanso excedido): se registran al
+        # arrancar o cambiar de modo y un único timer despierta en el próximo
+        self.wheel = TimingWheel(now=self.engine.clock())
+        self._deadlines = {}
+        self.due_timer = QTimer(self); self.due_timer.setSingleShot(True); self.due_timer.setTimerType(Qt.PreciseTimer)
+        self.due_timer.timeout.connect(self.on_deadline)
+
+        # Sonido: banco de avisos en memoria, armado después de mostrar la ventana
+        # (QtMultimedia no entra en el arranque) o en el primer aviso
+        self._sounds = None
+
+        central = QWidget(); self.setCentralWidget(central)
+        root = QVBoxLayout(central); root.setContentsMargins(12,12,12,12); root.setSpacing(8)
+
+        # --- Zen ---
+        self.lbl_time = QLabel("00:00"); self.lbl_time.setObjectName("timeLabel"); self.lbl_time.setAlignment(Qt.AlignCenter)
+        root.addWidget(self.lbl_time)
+
+        # Balance en Zen
+        self.lbl_balance_zen = QLabel("Balance: 00:00"); self.lbl_balance_zen.setObjectName("balance")
+        self.lbl_balance_zen.setAlignment(Qt.AlignCenter)
+        root.addWidget(self.lbl_balance_zen)
+
+        row_controls = QHBoxLayout(); row_controls.setSpacing(8)
+        self.btn_toggle_mode = QPushButton("Modo: Enfoque"); self.btn_toggle_mode.setObjectName("primary"); self.btn_toggle_mode.setFixedHeight(self.px(44))
+        self.btn_start_pause = QPushButton("Iniciar"); self.btn_start_pause.setFixedHeight(self.px(44))
+        self.btn_forget_times = QPushButton("Olvidar"); self.btn_forget_times.setObjectName("danger"); self.btn_forget_times.setFixedHeight(self.px(44))
+        row_controls.addStretch(1)
+        row_controls.addWidget(self.btn_toggle_mode)
+        row_controls.addWidget(self.btn_start_pause)
+        row_controls.addWidget(self.btn_forget_times)
+        row_controls.addStretch(1)
+        root.addLayout(row_controls)
+
+        gb_boss = QGroupBox("Jefe"); lay_boss = QVBoxLayout(gb_boss); lay_boss.setSpacing(6)
+        self.lbl_boss = QLabel("🐉 — …"); self.lbl_boss.setObjectName("bossName")
+        lay_boss.addWidget(self.lbl_boss)
+        row_hp = QHBoxLayout(); row_hp.setSpacing(8)
+        self.bar_hp = QProgressBar(); self.bar_hp.setTextVisible(True); self.bar_hp.setFixedHeight(self.px(24)); self.bar_hp.setObjectName("bossHp")
+        self.lbl_hp_info = QLabel(""); self.lbl_hp_info.setObjectName("muted")
+        row_hp.addWidget(self.bar_hp, 1); row_hp.addWidget(self.lbl_hp_info)
+        lay_boss.addLayout(row_hp)
+        root.addWidget(gb_boss)
+
+        # >>> Overlay animado encima de la barra de HP <<<
+        self.hp_overlay = BossHpOverlay(self.bar_hp, parent=self.bar_hp)
+
+        # Barra inferior: Más…
+        row_more = QHBoxLayout()
+        self.btn_more = QPushButton("Más…"); self.btn_more.setFixedHeight(self.px(38))
+        row_more.addStretch(1); row_more.addWidget(self.btn_more)
+        root.addLayout(row_more)
+
+        # --- Panel "Más…" en scroll ---
+        self.more_panel = QWidget()
+        mp = QVBoxLayout(self.more_panel); mp.setContentsMargins(0,0,0,0); mp.setSpacing(8)
+
+        # Progreso
+        gb_prog = QGroupBox("Progreso ✨"); lay_prog = QVBoxLayout(gb_prog); lay_prog.setSpacing(6)
+        exp_row = QHBoxLayout(); exp_row.setSpacing(8)
+        self.lbl_exp_title = QLabel("Nivel / EXP"); self.lbl_exp_title.setObjectName("subtitle")
+        self.bar_exp = QProgressBar(); self.bar_exp.setTextVisible(True); self.bar_exp.setFixedHeight(self.px(24))
+        self.lbl_exp_info = QLabel(""); self.lbl_exp_info.setObjectName("muted")
+        exp_row.addWidget(self.lbl_exp_title); exp_row.addWidget(self.bar_exp, 1); exp_row.addWidget(self.lbl_exp_info)
+        lay_prog.addLayout(exp_row)
+        mp.addWidget(gb_prog)
+
+        # Recompensas (sin título)
+        gb_tokens = QGroupBox("")
+        lay_tok = QHBoxLayout(gb_tokens); lay_tok.setSpacing(8)
+        self.lbl_tokens = QLabel("Gemas: 0"); self.lbl_tokens.setObjectName("subtitle")
+        self.btn_token_small = QPushButton(f"🧰 Cofre chico (−{TOKEN_COST_SMALL})"); self.btn_token_small.setObjectName("primary"); self.btn_token_small.setFixedHeight(self.px(38))
+        self.btn_token_big = QPushButton(f"🏆 Cofre grande (−{TOKEN_COST_BIG})"); self.btn_token_big.setObjectName("primary"); self.btn_token_big.setFixedHeight(self.px(38))
+        lay_tok.addWidget(self.lbl_tokens); lay_tok.addSpacing(8); lay_tok.addWidget(self.btn_token_small); lay_tok.addWidget(self.btn_token_big); lay_tok.addStretch(1)
+        mp.addWidget(gb_tokens)
+
+        # Acciones (sin título) + dificultad inline
+        gb_more = QGroupBox("")
+        lay_more = QHBoxLayout(gb_more); lay_more.setSpacing(8)
+        self.btn_new_boss = QPushButton("Nuevo jefe 🐲"); self.btn_new_boss.setFixedHeight(self.px(36))
+        self.btn_stats = QPushButton("Estadísticas 📊"); self.btn_stats.setFixedHeight(self.px(36))
+        self.stats = None   # StatsDialog, se arma al abrirlo
+        self.btn_export = QPushButton("Exportar… 📤"); self.btn_export.setFixedHeight(self.px(36))
+        self.exporter = None   # ExportDialog, se arma al abrirlo
+        self.btn_import = QPushButton("Importar… 📥"); self.btn_import.setFixedHeight(self.px(36))
+        self.importer = None   # ImportDialog, se arma al abrirlo
+        lbl_diff_inline = QLabel("   Dificultad:")
+        self.btn_diff = QPushButton(); self.btn_diff.setFixedHeight(self.px(36))
+        self.btn_reset = QPushButton("Reset"); self.btn_reset.setObjectName("danger"); self.btn_reset.setFixedHeight(self.px(36))
+
+        lay_more.addWidget(self.btn_new_boss)
+        lay_more.addWidget(self.btn_stats)
+        lay_more.addWidget(self.btn_export)
+        lay_more.addWidget(self.btn_import)
+        lay_more.addSpacing(12)
+        lay_more.addWidget(lbl_diff_inline)
+        lay_more.addWidget(self.btn_diff)
+        lay_more.addStretch(1)
+        lay_more.addWidget(self.btn_reset)
+        mp.addWidget(gb_more)
+
+        # Crónicas
+        gb_story = QGroupBox("Crónicas del estudio 📖"); lay_story = QVBoxLayout(gb_story); lay_story.setSpacing(4)
+        self.lbl_story = QLabel("Tu historia se escribirá aquí al subir de nivel."); self.lbl_story.setWordWrap(True)
+        lay_story.addWidget(self.lbl_story)
+        self.btn_browser = QPushButton("Ver todo… (crónicas e historial)"); self.btn_browser.setFixedHeight(self.px(36))
+        lay_story.addWidget(self.btn_browser, 0, Qt.AlignLeft)
+        self.browser = None   # BrowserDialog, se arma al abrirlo
+        mp.addWidget(gb_story)
+
+        self.more_area = QScrollArea()
+        self.more_area.setWidget(self.more_panel)
+        self.more_area.setWidgetResizable(True)
+        self.more_area.setMinimumHeight(self.px(140))
+        self.more_area.setVisible(False)
+        self.more_effect = QGraphicsOpacityEffect(self.more_area)
+        self.more_area.setGraphicsEffect(self.more_effect)
+        self.more_effect.setOpacity(0.0)
+
+        root.addWidget(self.more_area)
+
+        # Conexiones
+        self.btn_toggle_mode.clicked.connect(self.toggle_mode)
+        self.btn_start_pause.clicked.connect(self.toggle_start_pause)
+        self.btn_forget_times.clicked.connect(self.forget_times)
+        self.btn_more.clicked.connect(self.toggle_more_panel)
+        self.btn_diff.clicked.connect(self.cycle_difficulty)
+        self.btn_new_boss.clicked.connect(self.new_boss_scaled_hp)
+        self.btn_reset.clicked.connect(self.reset_all)
+        self.btn_browser.clicked.connect(self.show_browser)
+        self.btn_stats.clicked.connect(self.show_stats)
+        self.btn_export.clicked.connect(self.show_exporter)
+        self.btn_import.clicked.connect(self.show_importer)
+        self.btn_token_small.clicked.connect(self.claim_small_token)
+        self.btn_token_big.clicked.connect(self.claim_big_token)
+
+        # Valores fijos; el resto lo actualiza el view model
+        self.bar_exp.setMaximum(LEVEL_SIZE); self.bar_hp.setFormat("HP: %v/%m")
+        self.view = ViewModel()
+        self._bind_view()
+
+        self.anims = AnimationManager(self, mode=anim_mode, pressure=self.hp_overlay.scheduler.pressure)
+        self.update_ui(initial=True)
+
+        # Re-validar el tema (cacheado al arrancar) con la ventana ya visible
+        self.theme_watcher = ThemeWatcher(self.dark_mode, self)
+        self.theme_watcher.changed.connect(self.set_dark_mode)
+        self.theme_watcher.start()
+
+    # ---------- Estado ----------
+    @property
+    def state(self):
+        return self.engine.state
+
+    def _journal(self, writer=None):
+        return StateJournal(
+            self.state_path, story_snippets=STORY_SNIPPETS,
+            enums={"difficulty": DIFF_CYCLE, "auto_registered_focus": AUTO_FOCUS_VALUES},
+            writer=writer,
+        )
+
+    def _read_state(self):
+        """Estado guardado según el backend, o None si no hay nada."""
+        if self.storage == "sqlite":
+            data = self.store.load()
+            if data is None:
+                # Primera vez con SQLite: migrar el JSON (+ log e historial en columnas)
+                legacy = self._read_legacy()
+                if legacy is None:
+                    return None
+                self.store.import_state(legacy)
+                legacy["history"].close()
+                data = self.store.load()
+            return data
+        if self.storage == "binary":
+            # Primera vez en binario: se parte del JSON (+ log); el próximo guardado lo convierte
+            data = self.store.load()
+            return self._read_legacy(self.writer) if data is None else data
+        if not os.path.exists(self.state_path):
+            return None
+        if self.store is not None:
+            return self.store.load()
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _read_legacy(self, writer=None):
+        if not os.path.exists(self.state_path):
+            return None
+        journal = self._journal()
+        try:
+            data = journal.load()
+        finally:
+            journal.close()
+        data["history"] = open_history(resource_path(HISTORY_FILENAME), data.get("history"), writer)
+        return data
+
+    def load_state(self):
+        try:
+            data = self._read_state()
+            if data is not None:
+                for k, v in DEFAULT_STATE.items():
+                    if k not in data:
+                        data[k] = list(v) if isinstance(v, list) else v
+                if not isinstance(data.get("hp_total", None), int) or data["hp_total"] <= 0:
+                    data["hp_total"] = BASE_HP_MAX
+                if "boss_name" not in data or not data["boss_name"]:
+                    data["boss_name"] = fantasy_boss_name()
+                if "last_level" not in data:
+                    data["last_level"] = 1 + (data["exp_total"] // LEVEL_SIZE)
+                return self._attach_history(data)
+        except Exception:
+            pass
+        data = new_state()
+        data["hp_total"] = BASE_HP_MAX
+        return self._attach_history(data)
+
+    def _attach_history(self, data):
+        hist = data.get("history")
+        if isinstance(hist, HistoryStore) and hist.path is not None:
+            return data  # ya viene del backend (SQLite) o con archivo propio
+        if self.storage == "sqlite":
+            return data  # el primer commit lo pasa a la tabla
+        # Historial en columnas (archivo propio); migra la lista del JSON viejo
+        try:
+            data["history"] = open_history(resource_path(HISTORY_FILENAME), data.get("history"), self.writer)
+        except OSError:
+            pass  # sin archivo: el engine lo deja en memoria y va al JSON
+        return data
+
+    def save_state(self):
+        """Marca el estado para guardar; la escritura sale en flush_state()."""
+        self._dirty = True
+        if not self.save_timer.isActive():
+            self.save_timer.start()
+
+    def _flush_logs(self):
+        """Historial y registro de intervalos al hilo escritor: en la cola quedan
+        antes que el estado que los cuenta (SQLite lleva el historial en su transacción)."""
+        if self.storage != "sqlite":
+            self.state["history"].flush()
+        if self.sessions is not None:
+            self.sessions.flush()
+
+    def flush_state(self):
+        """Pasa el estado pendiente al backend (journal/JSON: bytes al hilo escritor)."""
+        self.save_timer.stop()
+        self._flush_logs()
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            if self.store is not None:
+                self.store.commit(self.state)
+                return
+            raw = json.dumps(json_ready(self.state), ensure_ascii=False, indent=2).encode("utf-8")
+            self.writer.replace(self.state_path, raw)
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"No se pudo guardar el estado:\n{e}")
+
+    def _on_write_failed(self, msg: str):
+        if self._write_error_open:
+            return  # un aviso a la vez aunque fallen varias escrituras seguidas
+        self._write_error_open = True
+        try:
+            QMessageBox.warning(self, "Error", f"No se pudo guardar el estado:\n{msg}")
+        finally:
+            self._write_error_open = False
+
+    def closeEvent(self, ev):
+        if self.engine.running:
+            self.engine.sync()
+        self.engine.close_interval()  # el intervalo en curso cuenta para las estadísticas
+        self.engine.pause()           # y su tramo queda en el registro de intervalos
+        # Compactar el journal: el snapshot queda completo al salir
+        self.save_timer.stop()
+        if self.storage == "sqlite":
+            self.sql_timer.stop()
+        try:
+            self._flush_logs()
+            if self.store is not None:
+                self.store.close(self.state)
+            else:
+                self._dirty = True
+                self.flush_state()
+        except Exception:
+            pass
+        if self.stats is not None:
+            self.stats.shutdown()
+        if self.exporter is not None:
+            self.exporter.shutdown()   # antes de cerrar los stores de los que lee
+        if self.importer is not None:
+            self.importer.shutdown()
+        self.writer.close()   # espera a que todo esté en disco
+        self.state["history"].close()
+        if self.sessions is not None:
+            self.sessions.close()
+        super().closeEvent(ev)
+
+    # ---------- Utilidades ----------
+    def _ensure_sound(self):
+        if self._sounds is None:
+            self._sounds = SoundBank(self)
+
+    def play_cue(self, name: str = "notify"):
+        """Aviso sonoro precargado ("notify", "level_up", "boss", "mode", "chest")."""
+        self._ensure_sound()
+        if not self._sounds.play(name):
+            QApplication.beep()
+
+    # ---------- Animación UI ----------
+    def animate_bar(self, bar: QProgressBar, new_value: int, duration=350):
+        self.anims.animate(bar, b"value", new_value, duration)
+
+    def pulse_label(self, label: QLabel):
+        effect = self.anims.opacity_effect(label)
+        self.anims.animate(effect, b"opacity", 1.0, 500, start=0.35,
+                           easing=QEasingCurve.OutCubic, cosmetic=True)
+
+    def fade_more_panel(self, show: bool, duration=220):
+        self.more_effect = self.anims.opacity_effect(self.more_area)
+        if show:
+            self.more_area.setVisible(True)
+            self.btn_more.setText("Menos…")
+            self.anims.animate(self.more_effect, b"opacity", 1.0, duration)
+        else:
+            def _hide():
+                self.more_area.setVisible(False)
+                self.btn_more.setText("Más…")
+            self.anims.animate(self.more_effect, b"opacity", 0.0, duration, on_finished=_hide)
+
+    # ---------- Cronómetro ----------
+    def cycle_difficulty(self):
+        self.engine.cycle_difficulty()
+        self.save_state()
+        self.schedule_deadlines()
+        self.update_counts_only()
+        self.pulse_label(self.lbl_balance_zen)
+
+    def toggle_mode(self):
+        self.play_cue("mode")
+        self.stop_timer.stop()
+        events = self.engine.sync()
+        mode = self.engine.toggle_mode()
+        self.save_state()
+        self.schedule_tick()
+        self.schedule_deadlines()
+        self.btn_start_pause.setText("Pausar")
+        self.btn_toggle_mode.setText(f"Modo: {mode}")
+        self.update_stopwatch_label()
+        self.update_counts_only()
+        self.handle_events(events)
+
+    def toggle_start_pause(self):
+        if self.engine.running:
+            self.on_stopwatch_tick(); self.engine.pause(); self.stop_timer.stop(); self.btn_start_pause.setText("Iniciar")
+            self.play_cue()
+        else:
+            self.engine.start(); self.schedule_tick(); self.btn_start_pause.setText("Pausar")
+            self.play_cue()
+        self.schedule_deadlines()
+
+    def on_stopwatch_tick(self):
+        # Reconciliar todo lo transcurrido desde el último tick (event loop
+        # bloqueado, diálogos modales, suspensión) en un único paso
+        events = self.engine.sync()
+        self.schedule_tick()
+        if not events and self.engine.elapsed == self._shown_elapsed:
+            return
+        self.save_state()
+        self.update_stopwatch_label()
+        self.update_counts_only()
+        self.handle_events(events)
+
+    def schedule_tick(self):
+        if not self.engine.running:
+            self.stop_timer.stop()
+            return
+        ms = self.engine.ms_to_next_second()
+        if not self.isVisible() or self.isMinimized():
+            ms += 1000 * (HIDDEN_TICK_SEC - 1)  # solo para guardar; los umbrales los despierta la rueda
+        self.stop_timer.start(ms)
+
+    def schedule_deadlines(self):
+        """Registra de nuevo en la rueda los umbrales pendientes del motor."""
+        for timer in self._deadlines.values():
+            self.wheel.cancel(timer)
+        self._deadlines = {name: self.wheel.schedule(due, name) for name, due in self.engine.deadlines().items()}
+        self._arm_deadline()
+
+    def _arm_deadline(self):
+        due = self.wheel.next_deadline()
+        if due is None:
+            self.due_timer.stop()
+            return
+        self.due_timer.start(max(0, int((due - self.engine.clock()) * 1000) + 1))
+
+    def on_deadline(self):
+        fired = self.wheel.advance(self.engine.clock())
+        for timer in fired:
+            self._deadlines.pop(timer.payload, None)
+        if fired:
+            self.on_stopwatch_tick()
+            pending = self.engine.deadlines()
+            for timer in fired:
+                if timer.payload in pending:  # el ratio dinámico corrió el aviso
+                    self._deadlines[timer.payload] = self.wheel.schedule(pending[timer.payload], timer.payload)
+        self._arm_deadline()
+
+    def showEvent(self, ev):
+        super().showEvent(ev)
+        if self._sounds is None:
+            QTimer.singleShot(1500, self._ensure_sound)
+        self.on_stopwatch_tick()
+
+    def changeEvent(self, ev):
+        super().changeEvent(ev)
+        if ev.type() == QEvent.WindowStateChange and self.engine.running:
+            self.on_stopwatch_tick()
+
+    def update_stopwatch_label(self):
+        self._shown_elapsed = self.engine.elapsed
+        m = self.engine.elapsed // 60
+        s = self.engine.elapsed % 60
+        self.lbl_time.setText(f"{m:02d}:{s:02d}")
+
+    # ---------- Acciones ----------
+    def handle_events(self, events):
+        """Traduce los eventos del motor en diálogos, animaciones y sonido."""
+        if not events:
+            return
+        # El aviso suena antes de los diálogos modales
+        kinds = {ev[0] for ev in events}
+        if "boss_defeated" in kinds:
+            self.play_cue("boss")
+        elif "level_up" in kinds:
+            self.play_cue("level_up")
+        elif kinds & {"block", "upgrade", "break_overrun"}:
+            self.play_cue("notify")
+        for ev in events:
+            if ev[0] == "boss_defeated":
+                QMessageBox.information(self, "Jefe derrotado", f"¡Derrotaste a {ev[1]}! 🐉")
+        self.animate_bar(self.bar_exp, self.engine.exp_in_level()); self.animate_bar(self.bar_hp, self.engine.hp_restante())
+        if any(ev[0] in ("block", "upgrade") for ev in events):
+            self.hp_overlay.burst()
+        for ev in events:
+            if ev[0] == "level_up":
+                self.show_level_up(ev[1])
+        self.update_counts_only()
+        if "break_overrun" in kinds:
+            self.pulse_label(self.lbl_balance_zen)
+
+    def apply_block(self, kind: str):
+        events = self.engine.apply_block(kind)
+        self.save_state()
+        self.handle_events(events)
+
+    def new_boss_scaled_hp(self):
+        self.engine.new_boss_scaled_hp()
+        self.save_state()
+        self.bar_hp.setMaximum(self.state["hp_total"])
+        self.animate_bar(self.bar_hp, self.engine.hp_restante())
+        self.update_counts_only()
+
+    def reset_all(self):
+        ans = QMessageBox.question(
+            self, "Reset",
+            "¿Seguro que querés resetear EXP, HP, historial, tokens y tiempos (totales y sesiones)?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if ans == QMessageBox.Yes:
+            self.stop_timer.stop()
+            self.engine.reset()
+            self.save_state()
+            self.schedule_deadlines()
+            self.btn_start_pause.setText("Iniciar"); self.btn_toggle_mode.setText(f"Modo: {self.engine.mode}")
+            self.update_stopwatch_label()
+            self.update_ui(initial=True)
+
+    # ---------- Tokens ----------
+    def claim_small_token(self):
+        if not self.engine.claim_tokens(TOKEN_COST_SMALL):
+            QMessageBox.information(self, "Cofre chico", "No tenés tokens suficientes.")
+            return
+        self.save_state()
+        self.update_counts_only()
+        self.play_cue("chest")
+
+    def claim_big_token(self):
+        if not self.engine.claim_tokens(TOKEN_COST_BIG):
+            QMessageBox.information(self, "Cofre grande", "No tenés tokens suficientes.")
+            return
+        self.save_state()
+        self.update_counts_only()
+        self.play_cue("chest")
+
+    # ---------- UI helpers ----------
+    def set_dark_mode(self, dark: bool):
+        self.dark_mode = dark
+        self.theme.apply(dark)   # hoja y paletas ya compiladas; los tonos se reaplican solos
+        if self.stats is not None and self.stats.isVisible():
+            self.stats.refresh()     # otro tema = otra clave de caché
+
+    def toggle_more_panel(self):
+        vis = self.more_area.isVisible()
+        self.fade_more_panel(show=not vis)
+
+    def _bind_view(self):
+        v = self.view
+        v.bind("exp_format", self.bar_exp.setFormat)
+        v.bind("hp_max", self.bar_hp.setMaximum)
+        v.bind("hp_info", self.lbl_hp_info.setText)
+        v.bind("boss", self.lbl_boss.setText)
+        # Importante: sincronizar overlay con el valor actual
+        v.bind("hp_progress", lambda hp: self.hp_overlay.setProgress(*hp))
+        v.bind("tokens", self.lbl_tokens.setText)
+        v.bind("token_small_enabled", self.btn_token_small.setEnabled)
+        v.bind("token_big_enabled", self.btn_token_big.setEnabled)
+        v.bind("balance", self.lbl_balance_zen.setText)
+        v.bind("balance_tone", lambda tone: self.theme.set_tone(self.lbl_balance_zen, tone))
+        v.bind("diff_label", self.btn_diff.setText)
+
+    def update_counts_only(self):
+        # Solo se empujan a Qt las propiedades que cambiaron desde el último cuadro
+        self.view.push(derive_view(self.engine))
+        if self.browser is not None and self.browser.isVisible():
+            self.browser.refresh()
+        if self.stats is not None and self.stats.isVisible():
+            self.stats.refresh()
+
+    def show_browser(self):
+        if self.browser is None:
+            from .browser import BrowserDialog   # diálogos: se importan al abrirlos
+            self.browser = BrowserDialog(lambda: self.state, self, px=self.px)
+        self.browser.refresh()
+        self.browser.show()
+        self.browser.raise_(); self.browser.activateWindow()
+
+    def show_stats(self):
+        if self.stats is None:
+            from .charts import StatsDialog
+            self.stats = StatsDialog(lambda: self.state, lambda: self.sessions, lambda: self.dark_mode, self, px=self.px)
+        self.stats.show()   # pide los gráficos al mostrarse; llegan solos cuando están
+        self.stats.raise_(); self.stats.activateWindow()
+
+    def show_exporter(self):
+        if self.exporter is None:
+            from .exporter import ExportDialog
+            self.exporter = ExportDialog(lambda: self.state, lambda: self.sessions, self, px=self.px)
+        self.exporter.show()
+        self.exporter.raise_(); self.exporter.activateWindow()
+
+    def show_importer(self):
+        if self.importer is None:
+            from .exporter import ImportDialog
+            self.importer = ImportDialog(lambda: self.state, lambda: self.sessions,
+                                         self.import_blocks, self.import_sessions, self, px=self.px)
+            self.importer.imported.connect(self.update_ui)
+        self.importer.show()
+        self.importer.raise_(); self.importer.activateWindow()
+
+    def import_blocks(self, raw: bytes, fp: str, upto: int):
+        """Una tanda del importador: sin popups de nivel, solo la crónica."""
+        from .importer import note_source
+        events = self.engine.import_blocks(raw)
+        if fp:
+            note_source(self.state, fp, upto)
+        if events:
+            self.lbl_story.setText("\n• ".join(["Crónicas:"] + self.state["story"][-6:]))
+        self.save_state()
+        self.update_counts_only()
+
+    def import_sessions(self, path, n: int, web: dict):
+        from .importer import IMPORTS_KEY, WEB_KEY
+        if path is not None and self.sessions is not None:
+            self.sessions.replace_with(path, n)   # mismo objeto: engine y gráficos lo siguen viendo
+        self.state.setdefault(IMPORTS_KEY, {})[WEB_KEY] = web
+        self.save_state()
+
+    def update_ui(self, initial=False):
+        if initial:
+            self.view.invalidate()
+        self.update_counts_only()
+        if initial:
+            self.bar_hp.setValue(self.engine.hp_restante()); self.bar_exp.setValue(self.engine.exp_in_level())
+            if self.state["story"]:
+                self.lbl_story.setText("\n• ".join(["Crónicas:"] + self.state["story"][-6:]))
+            self.btn_toggle_mode.setText(f"Modo: {self.engine.mode}")
+            self.update_stopwatch_label(); self.btn_start_pause.setText("Iniciar")
+            if self.state["exp_total"] == 0 and not self.state["story"]:
+                QTimer.singleShot(400, self.show_onboarding_tips)
+        else:
+            self.animate_bar(self.bar_hp, self.engine.hp_restante()); self.animate_bar(self.bar_exp, self.engine.exp_in_level())
+
+    def show_onboarding_tips(self):
+        tips = (
+            "<b>Bienvenido/a a Flowmodoro RPG ✨</b><br><br>"
+            "Consejos para comenzar:<ul>"
+            "<li><b>Enfoque</b>: Inicia el cronómetro y mantente concentrado.</li>"
+            "<li><b>Descanso</b>: Cambia de modo para tomar pausas saludables.</li>"
+            "<li><b>Jefe</b>: Cada sesión suma daño y experiencia para derrotar al jefe.</li>"
+            "<li><b>Gemas</b>: Gana recompensas al avanzar y úsalas en cofres.</li>"
+            "<li><b>Más…</b>: Explora progreso, dificultad y tu crónica de estudio.</li>"
+            "</ul><br>"
+            "¡Sube de nivel y descubre nuevas crónicas de tu progreso!"
+        )
+        dlg = QMessageBox(self)
+        dlg.setWindowTitle("Consejos iniciales")
+        dlg.setTextFormat(Qt.RichText)
+        dlg.setText(tips)
+        dlg.setStandardButtons(QMessageBox.Ok)
+        dlg.setAccessibleName("Consejos de bienvenida")
+        dlg.setModal(True)
+        dlg.exec_()
+
+    def show_level_up(self, new_lvl):
+        dlg = LevelUpDialog(new_lvl, self)
+        dlg.exec_()
+
+    # ---------- Olvidar tiempos ----------
+    def forget_times(self):
+        ans = QMessageBox.question(
+            self, "Olvidar tiempos",
+            "¿Seguro que querés olvidar los tiempos actuales? Se pondrán en cero.",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if ans != QMessageBox.Yes:
+            return
+        self.engine.forget_times()
+        self.save_state()
+        self.schedule_deadlines()
+        self.update_stopwatch_label()
+        self.update_counts_only()
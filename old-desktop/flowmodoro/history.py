@@ -0,0 +1,384 @@
+"""
+Historial de bloques en columnas tipadas (sin Qt).
+
+Reemplaza la lista de dicts `state["history"]`. En disco es un archivo binario
+de filas fijas (tipo, exp, daño: 3 × int32) con un encabezado que guarda los
+totales acumulados; se lee con mmap, así que un historial de 100k bloques no
+ocupa memoria de Python. Las filas agregadas en la sesión viven en `array`s
+hasta el próximo remapeo. Sin ruta, el store es solo memoria (simulador).
+
+Conserva la interfaz de lista que usa el resto del programa (`len`, índice,
+`append`, asignación por índice, iteración): cada entrada se ve como
+{"exp", "dano", "tipo"}. Los totales se mantienen al escribir, nunca recorren
+las filas.
+
+Con un StateWriter (writer.py) las escrituras no salen al agregar: quedan en
+la cola en memoria y `flush()` las pasa al hilo escritor, que el dueño llama
+justo antes de guardar el estado (filas, después encabezado, después estado).
+Las filas mapeadas que se modifican se ven desde `_changed` hasta el remapeo,
+que espera al escritor.
+"""
+
+import os
+import sys
+import mmap
+import struct
+from array import array
+
+MAGIC = b"FRH1"
+HEADER = struct.Struct("<4sIqqqqq")   # magic, tamaño de fila, filas, exp, daño, #deep, #mini
+ROW = struct.Struct("<iii")           # tipo, exp, daño
+KINDS = ("deep", "mini")
+_KIND_IDX = {k: i for i, k in enumerate(KINDS)}
+REMAP_EVERY = 4096                    # filas en arrays antes de volver a mapear el archivo
+_NATIVE_LE = sys.byteorder == "little"
+
+
+class HistoryStore:
+    def __init__(self, path: str = None, writer=None):
+        self.path = path
+        self.writer = None       # StateWriter opcional (ver abajo): E/S en su hilo, al llamar flush()
+        self._f = None
+        self._mm = None
+        self._rows = None        # memoryview int32 sobre las filas mapeadas
+        self._mapped = 0
+        self._kind = array("b")  # filas fuera del mapeo (cola de la sesión)
+        self._exp = array("i")
+        self._dano = array("i")
+        self.count = 0
+        self.exp_sum = 0
+        self.dano_sum = 0
+        self.by_kind = [0, 0]
+        self._synced = 0         # con writer: filas [0, _synced) ya pasadas al escritor
+        self._changed = {}       # con writer: fila -> (tipo, exp, daño) modificada antes de _synced
+        self._patched = {}       # con writer: lo mismo para filas mapeadas, hasta el remapeo
+        self._cut = False        # con writer: vaciado (clear) sin pasar al escritor
+        self._head_dirty = False
+        if path is not None:
+            self._open()         # abrir y reparar, directo
+            self._synced = self.count
+            self.writer = writer
+
+    @classmethod
+    def from_entries(cls, entries, path: str = None):
+        store = cls(path)
+        store.extend(entries)
+        return store
+
+    # ---------- Archivo ----------
+    def _open(self):
+        exists = os.path.exists(self.path)
+        self._f = open(self.path, "r+b" if exists else "w+b", buffering=0)
+        head = self._f.read(HEADER.size)
+        if len(head) < HEADER.size:
+            self._write_header(truncate=True)
+            return
+        magic, row_size, count, exp_sum, dano_sum, n_deep, n_mini = HEADER.unpack(head)
+        if magic != MAGIC or row_size != ROW.size:
+            self._write_header(truncate=True)
+            return
+        size = self._f.seek(0, os.SEEK_END)
+        rows = (size - HEADER.size) // ROW.size
+        self._f.truncate(HEADER.size + rows * ROW.size)  # fila parcial de una escritura cortada
+        self.count = rows
+        self._map()
+        if count == rows:
+            self.exp_sum, self.dano_sum, self.by_kind = exp_sum, dano_sum, [n_deep, n_mini]
+        else:
+            self._recount()  # encabezado atrasado (caída entre fila y encabezado)
+            self._write_header()
+
+    def _map(self):
+        """Vuelve a mapear todo el archivo y vacía la cola en memoria."""
+        if self.writer is not None:
+            self.flush()
+            self.writer.flush()  # el mapeo tiene que ver todas las filas
+        self._unmap()
+        self._kind, self._exp, self._dano = array("b"), array("i"), array("i")
+        self._patched = {}
+        if not self.count:
+            self._mapped = 0
+            return
+        if not _NATIVE_LE:
+            # Big-endian: sin vista directa; las filas van a los arrays
+            self._f.seek(HEADER.size)
+            for k, e, d in ROW.iter_unpack(self._f.read(self.count * ROW.size)):
+                self._kind.append(k); self._exp.append(e); self._dano.append(d)
+            self._mapped = 0
+            return
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._rows = memoryview(self._mm)[HEADER.size:HEADER.size + self.count * ROW.size].cast("i")
+        self._mapped = self.count
+
+    def _unmap(self):
+        if self._rows is not None:
+            self._rows.release()
+            self._rows = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._mapped = 0
+
+    def _write_header(self, truncate=False):
+        if self.writer is not None:
+            self._head_dirty = True
+            return
+        if truncate:
+            self._f.truncate(0)
+        self._f.seek(0)
+        self._f.write(self._header())
+
+    def _write_row(self, i, k, e, d):
+        if self.writer is not None:
+            if i < self._synced:
+                self._changed[i] = (k, e, d)
+            return   # las filas nuevas salen de la cola en flush()
+        self._f.seek(HEADER.size + i * ROW.size)
+        self._f.write(ROW.pack(k, e, d))
+
+    def _recount(self):
+        self.exp_sum = self.dano_sum = 0
+        self.by_kind = [0, 0]
+        for i in range(self.count):
+            k, e, d = self._row(i)
+            self.exp_sum += e; self.dano_sum += d; self.by_kind[k] += 1
+
+    def flush(self):
+        if self._f is None:
+            return
+        if self.writer is None:
+            self._f.flush()
+            return
+        w = self.writer
+        if self._cut:
+            w.patch(self.path, 0, self._header(), size=HEADER.size)
+            self._cut = False
+        for i in sorted(self._changed):
+            w.patch(self.path, HEADER.size + i * ROW.size, ROW.pack(*self._changed[i]))
+        self._changed.clear()
+        if self._synced < self.count:
+            w.patch(self.path, HEADER.size + self._synced * ROW.size, self._tail_bytes(self._synced - self._mapped))
+            self._synced = self.count
+        if self._head_dirty:
+            w.patch(self.path, 0, self._header())
+            self._head_dirty = False
+
+    def _header(self) -> bytes:
+        return HEADER.pack(MAGIC, ROW.size, self.count, self.exp_sum, self.dano_sum, *self.by_kind)
+
+    def close(self):
+        """Cierra el archivo. El mapeo sigue sirviendo lecturas; lo que se
+        agregue después queda solo en memoria. Con writer, lo pendiente tiene
+        que haber salido antes con flush()."""
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    # ---------- Lectura ----------
+    def _row(self, i):
+        if i < self._mapped:
+            if self._patched and i in self._patched:
+                return self._patched[i]   # todavía no está en el mapeo
+            r = self._rows; j = 3 * i
+            return r[j], r[j + 1], r[j + 2]
+        t = i - self._mapped
+        return self._kind[t], self._exp[t], self._dano[t]
+
+    def _index(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("índice de historial fuera de rango")
+        return i
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        k, e, d = self._row(self._index(i))
+        return {"exp": e, "dano": d, "tipo": KINDS[k]}
+
+    def __iter__(self):
+        for i in range(self.count):
+            k, e, d = self._row(i)
+            yield {"exp": e, "dano": d, "tipo": KINDS[k]}
+
+    def totals(self) -> dict:
+        return {
+            "blocks": self.count,
+            "deep": self.by_kind[0],
+            "mini": self.by_kind[1],
+            "exp": self.exp_sum,
+            "dano": self.dano_sum,
+        }
+
+    # ---------- Escritura ----------
+    def add(self, tipo: str, exp: int, dano: int) -> int:
+        """Agrega un bloque; devuelve su índice."""
+        k = _KIND_IDX[tipo]
+        i = self.count
+        self._kind.append(k); self._exp.append(exp); self._dano.append(dano)
+        self.count += 1
+        self.exp_sum += exp; self.dano_sum += dano; self.by_kind[k] += 1
+        if self._f is not None:
+            self._write_row(i, k, exp, dano)
+            self._write_header()
+            if len(self._kind) >= REMAP_EVERY:
+                self._map()
+        return i
+
+    def _grew(self):
+        """Después de una carga masiva: sin writer se escribió todo y se remapea;
+        con writer se remapea solo si la cola creció (el remapeo espera al disco)."""
+        if self.writer is None or len(self._kind) >= REMAP_EVERY:
+            self._map()
+
+    def append(self, entry: dict):
+        self.add(entry["tipo"], entry["exp"], entry["dano"])
+
+    def extend(self, entries):
+        """Carga masiva (migración): una sola escritura de filas y de encabezado."""
+        start = self.count
+        buf = bytearray()
+        for entry in entries:
+            tipo = entry.get("tipo"); exp = entry.get("exp"); dano = entry.get("dano")
+            if tipo not in _KIND_IDX or not isinstance(exp, int) or not isinstance(dano, int):
+                continue  # entrada corrupta del JSON viejo: se descarta
+            k = _KIND_IDX[tipo]
+            self._kind.append(k); self._exp.append(exp); self._dano.append(dano)
+            self.count += 1
+            self.exp_sum += exp; self.dano_sum += dano; self.by_kind[k] += 1
+            if self._f is not None and self.writer is None:
+                buf += ROW.pack(k, exp, dano)
+        if self._f is not None and self.count > start:
+            if self.writer is None:
+                self._f.seek(HEADER.size + start * ROW.size)
+                self._f.write(buf)
+            self._write_header()
+            self._grew()
+
+    def extend_rows(self, raw: bytes):
+        """Carga masiva de filas ya empaquetadas (ROW, little-endian): sin dicts."""
+        if len(raw) % ROW.size:
+            raise ValueError("filas de historial incompletas")
+        cols = array("i")
+        cols.frombytes(raw)
+        if not _NATIVE_LE:
+            cols.byteswap()
+        kinds, exps, danos = cols[0::3], cols[1::3], cols[2::3]
+        n = len(kinds)
+        if not n:
+            return
+        if min(kinds) < 0 or max(kinds) >= len(KINDS):
+            raise ValueError("tipo de bloque inválido")
+        start = self.count
+        self._kind.extend(array("b", kinds)); self._exp.extend(exps); self._dano.extend(danos)
+        deep = kinds.count(0)
+        self.count += n
+        self.exp_sum += sum(exps); self.dano_sum += sum(danos)
+        self.by_kind[0] += deep; self.by_kind[1] += n - deep
+        if self._f is not None:
+            if self.writer is None:
+                self._f.seek(HEADER.size + start * ROW.size)
+                self._f.write(raw)
+            self._write_header()
+            self._grew()
+
+    def rows_bytes(self) -> bytes:
+        """Todas las filas empaquetadas (ROW, little-endian), como en el archivo."""
+        if self._patched:
+            self._map()   # filas mapeadas modificadas: que el mapeo las vea
+        out = bytearray()
+        if self._mapped:
+            out += self._mm[HEADER.size:HEADER.size + self._mapped * ROW.size]
+        out += self._tail_bytes(0)
+        return bytes(out)
+
+    def _tail_bytes(self, t: int) -> bytes:
+        """Filas de la cola en memoria desde su posición `t`, empaquetadas."""
+        n = len(self._kind) - t
+        if n <= 0:
+            return b""
+        tail = array("i", [0]) * (3 * n)
+        tail[0::3] = array("i", self._kind[t:]); tail[1::3] = self._exp[t:]; tail[2::3] = self._dano[t:]
+        if not _NATIVE_LE:
+            tail.byteswap()
+        return tail.tobytes()
+
+    def reader(self):
+        """Función read(lo=0, hi=None) -> filas empaquetadas de [lo, hi), para
+        llamar desde otro hilo: lee con su propio archivo y solo ve las filas que
+        había al pedir el reader (con writer, espera a que estén en disco)."""
+        if self.writer is not None and self._f is not None:
+            self.flush()
+            self.writer.flush()
+        count = self.count
+        if self.path is None or self._f is None:
+            raw = self.rows_bytes()   # en memoria: una copia ahora
+
+            def read(lo=0, hi=None):
+                hi = count if hi is None else min(hi, count)
+                return raw[lo * ROW.size:max(lo, hi) * ROW.size]
+            return read
+        path = self.path
+
+        def read(lo=0, hi=None):
+            hi = count if hi is None else min(hi, count)
+            with open(path, "rb") as f:
+                f.seek(HEADER.size + lo * ROW.size)
+                return f.read(max(0, hi - lo) * ROW.size)
+        return read
+
+    def __setitem__(self, i, entry: dict):
+        i = self._index(i)
+        k_old, e_old, d_old = self._row(i)
+        k = _KIND_IDX[entry["tipo"]]; exp = entry["exp"]; dano = entry["dano"]
+        self.exp_sum += exp - e_old; self.dano_sum += dano - d_old
+        self.by_kind[k_old] -= 1; self.by_kind[k] += 1
+        if i >= self._mapped:
+            t = i - self._mapped
+            self._kind[t] = k; self._exp[t] = exp; self._dano[t] = dano
+        elif self.writer is not None:
+            self._patched[i] = (k, exp, dano)
+        if self._f is not None:
+            # Las filas mapeadas se ven actualizadas: el mmap comparte el page cache
+            self._write_row(i, k, exp, dano)
+            self._write_header()
+
+    def clear(self):
+        self._unmap()
+        self._kind, self._exp, self._dano = array("b"), array("i"), array("i")
+        self.count = self.exp_sum = self.dano_sum = 0
+        self.by_kind = [0, 0]
+        if self.writer is not None:
+            self._synced = 0
+            self._changed = {}
+            self._cut = True
+        if self._f is not None:
+            self._write_header(truncate=True)
+
+
+def open_history(path: str, legacy=None, writer=None) -> HistoryStore:
+    """Abre el historial en disco; si está vacío, migra la lista del JSON viejo."""
+    store = HistoryStore(path, writer)
+    if legacy and not len(store):
+        if not isinstance(legacy, HistoryStore):
+            store.extend(legacy)
+        elif legacy.path is None:
+            store.extend_rows(legacy.rows_bytes())  # en memoria (p. ej. de binstate)
+    return store
+
+
+def json_ready(state: dict) -> dict:
+    """Copia superficial serializable: el historial en disco no va al JSON."""
+    hist = state.get("history")
+    if not isinstance(hist, HistoryStore):
+        return state
+    data = dict(state)
+    if hist.path is not None:
+        del data["history"]
+    else:
+        data["history"] = list(hist)
+    return data
@@ -0,0 +1,627 @@
+"""
+Importación incremental de archivos grandes (sin Qt).
+
+    FlowmodoroRPG.py import respaldo_web.json
+    FlowmodoroRPG.py import estado_viejo.json intervalos.jsonl --dry-run
+
+Entiende el estado guardado de la app web (`app.js`: `history` y
+`session_history`), los JSON de estado viejos del escritorio y JSON Lines (los
+de `export`, o entradas sueltas de la web). El JSON se recorre con un lector
+incremental: las listas grandes se leen elemento por elemento, de a READ_BYTES,
+y nunca está el archivo entero en memoria.
+
+Bloques: entran al historial de a CHUNK_ROWS (su EXP cuenta para el nivel; el
+daño era de jefes pasados). No tienen fecha ni id, y una fila sale solo del
+tipo y del nivel: dos partidas distintas (p. ej. solo bloques deep) pueden
+empezar con las mismas filas. Así que las filas no alcanzan para descartar
+bloques, solo los dejan en duda:
+
+- `state["imports"]` recuerda, por huella de una fuente, cuántos bloques ya se
+  tomaron de ella (reimportar el mismo archivo, o uno que creció, solo agrega
+  lo nuevo). La huella son sus primeros FP_ROWS bloques más, si el archivo
+  tiene crónicas, un hash de las primeras (hasta STORY_ID_LINES).
+- Si el comienzo de la fuente coincide con el del historial local (al menos
+  MIN_SAME_GAME bloques, o todo el historial si es más corto) puede ser la
+  misma partida (un estado viejo del escritorio, o una copia más larga).
+
+Los bloques en duda no entran en la primera pasada. Al terminar el archivo ya
+se leyeron las crónicas (en el estado van después del historial): una fuente
+con otras crónicas es otra fuente, y las del historial local dicen si es la
+misma partida. Si no hay crónicas para comparar, se pregunta con `confirm`
+(sin `confirm`, se asumen repetidos). Lo que resulte nuevo se toma en una
+segunda pasada; lo repetido se informa aparte, en `blocks_duplicate`.
+
+Intervalos: el registro tiene que seguir ordenado por hora, así que se ordenan
+en tandas de RUN_ROWS en archivos temporales y se mezclan con el registro
+actual en uno nuevo (k-way merge, sin filas repetidas), que al final reemplaza
+al viejo. La web guarda solo fecha y duración, y solo sus últimas 100 sesiones:
+ver `_WebDays` (las de cada día se alinean con las ya importadas, que se
+recuerdan en `state["imports"]["web"]`).
+
+`Importer` toma su foto del estado al crearse y `run()` puede correr en otro
+hilo; lo que modifica el estado pasa por los callbacks `apply_blocks` y
+`replace_sessions`, que el dueño del estado ejecuta (en la GUI, su hilo).
+`confirm` se llama desde el hilo de `run()`.
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import codecs
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime
+
+from .common import STATE_BACKEND
+from .history import KINDS as HIST_KINDS, ROW
+from .sessions import SessionLog, KINDS as SESSION_KINDS, ROW as SESSION_ROW
+
+READ_BYTES = 1 << 20
+MAX_VALUE_CHARS = 16 << 20   # un solo elemento más grande que esto: archivo roto
+CHUNK_ROWS = 4096
+RUN_ROWS = 1 << 16
+FP_ROWS = 256
+MIN_SAME_GAME = 32          # bloques iguales al comienzo para sospechar que es la misma partida
+STORY_ID_LINES = 8          # crónicas del comienzo que identifican una partida
+WEB_DAY_START = 9 * 3600
+WEB_DATE = "%a %b %d %Y"    # Date.toDateString() de la web
+IMPORTS_KEY = "imports"
+WEB_KEY = "web"             # en state["imports"]: día -> duraciones de la web ya importadas
+# confirm(ruta, n, motivo) -> True si los n bloques en duda ya están (no se importan)
+QUESTIONS = {
+    "game": "Los primeros {n} bloques de {name} son iguales al comienzo del historial, "
+            "pero no hay crónicas para comparar. ¿Es la misma partida? (Sí: no se duplican)",
+    "source": "Los primeros {n} bloques de {name} coinciden con un archivo ya importado, "
+              "pero no hay crónicas para comparar. ¿Es el mismo archivo? (Sí: no se duplican)",
+}
+_HIST_IDX = {k: i for i, k in enumerate(HIST_KINDS)}
+_SESSION_IDX = {k: i for i, k in enumerate(SESSION_KINDS)}
+
+
+class Cancelled(Exception):
+    pass
+
+
+# ---------- Lectura incremental ----------
+class _JsonStream:
+    """JSON de a pedazos: valores chicos enteros, listas y objetos elemento por elemento."""
+    def __init__(self, f, on_read=None):
+        self.f = f
+        self.on_read = on_read
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._dec = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        raw = self.f.read(READ_BYTES)
+        if self.on_read is not None:
+            self.on_read(len(raw))
+        self.eof = not raw
+        self.buf = self.buf[self.pos:] + self._utf8.decode(raw, final=self.eof)
+        self.pos = 0
+        return not self.eof
+
+    def peek(self) -> str:
+        while True:
+            buf, p = self.buf, self.pos
+            while p < len(buf) and buf[p] in " \t\r\n":
+                p += 1
+            self.pos = p
+            if p < len(buf):
+                return buf[p]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"JSON inválido: se esperaba {' o '.join(chars)} y vino {c or 'el final'}")
+        self.pos += 1
+        return c
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                v, end = self._dec.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if len(self.buf) - self.pos > MAX_VALUE_CHARS:
+                    raise ValueError("JSON inválido")
+                if self._fill():
+                    continue   # valor cortado por el borde del pedazo
+                raise ValueError("JSON inválido o cortado")
+            if end == len(self.buf) and self._fill():
+                continue       # un número al borde puede seguir en el próximo pedazo
+            self.pos = end
+            return v
+
+    def array(self):
+        self._expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self._expect(",]") == "]":
+                return
+
+    def keys(self):
+        """Claves de un objeto; quien recorre consume cada valor (value/array/skip)."""
+        self._expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def skip(self):
+        if self.peek() == "[":
+            for _ in self.array():
+                pass
+        elif self.peek() == "{":
+            for _ in self.keys():
+                self.skip()
+        else:
+            self.value()
+
+
+def _block(e):
+    if not isinstance(e, dict):
+        return None
+    k = _HIST_IDX.get(e.get("tipo")); exp = e.get("exp"); dano = e.get("dano")
+    if k is None or type(exp) is not int or type(dano) is not int:
+        return None
+    return k, exp, dano
+
+
+def _interval(e):
+    try:
+        start = int(datetime.fromisoformat(e["start"]).timestamp())
+        end = int(datetime.fromisoformat(e["end"]).timestamp())
+        kind = _SESSION_IDX[e["kind"]]
+    except (KeyError, TypeError, ValueError):
+        return None
+    return (start, end, kind) if end > start else None
+
+
+class _WebDays:
+    """Sesiones de la web (fecha y duración) -> intervalos de enfoque.
+
+    La web no guarda hora ni id y se queda con sus últimas 100 sesiones: al
+    correrse esa ventana, el día más viejo del archivo pierde sus primeras
+    sesiones. Así que las de cada día se juntan y se alinean con `seen` (día ->
+    duraciones ya importadas, en orden): el tramo final de lo visto que coincide
+    con el comienzo de lo leído ya está; lo que sigue es nuevo y se ubica a
+    continuación, desde WEB_DAY_START. Las no completadas también entran: la
+    web las cuenta en el tiempo del día y de la semana."""
+    def __init__(self, seen: dict):
+        self.seen = seen
+        self.days = {}   # día -> duraciones leídas de este archivo
+
+    def add(self, e) -> bool:
+        try:
+            t = time.strptime(e["date"], WEB_DATE)
+            sec = int(e["focus_time"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if sec <= 0:
+            return False
+        self.days.setdefault(f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}", []).append(sec)
+        return True
+
+    def rows(self):
+        """Intervalos de lo nuevo (y `seen` al día)."""
+        for day, got in self.days.items():
+            old = self.seen.get(day, [])
+            m = min(len(old), len(got))
+            while m and old[len(old) - m:] != got[:m]:
+                m -= 1
+            new = got[m:]
+            if not new:
+                continue
+            y, mo, d = map(int, day.split("-"))
+            start = int(time.mktime((y, mo, d, 0, 0, 0, 0, 0, -1))) + WEB_DAY_START + sum(old)
+            for sec in new:
+                yield start, start + sec, _SESSION_IDX["focus"]
+                start += sec
+            self.seen[day] = old + new
+        self.days.clear()
+
+
+def read_archive(path: str, on_read=None, web_seen: dict = None):
+    """("block", (tipo, exp, daño)) / ("interval", (inicio, fin, tipo)) / ("skip", None)
+    del archivo, en orden y sin cargarlo entero. Las sesiones de la web salen como
+    ("web", None) al leerlas y, al final, ("placed", intervalo) las nuevas
+    respecto de `web_seen` (que se actualiza). Las crónicas de un estado salen
+    como ("story", primeras STORY_ID_LINES líneas)."""
+    web = _WebDays({} if web_seen is None else web_seen)
+    yield from _read_entries(path, on_read, web)
+    for row in web.rows():
+        yield "placed", row
+
+
+def _read_entries(path, on_read, web):
+
+    def classify(e):
+        if not isinstance(e, dict):
+            return "skip", None
+        if "tipo" in e:
+            row = _block(e)
+            return ("block", row) if row else ("skip", None)
+        if "start" in e and "kind" in e:
+            row = _interval(e)
+            return ("interval", row) if row else ("skip", None)
+        if "focus_time" in e:
+            return ("web", None) if web.add(e) else ("skip", None)
+        return "skip", None
+
+    with open(path, "rb") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if on_read is not None:
+                    on_read(len(line))
+                if line.strip():
+                    try:
+                        yield classify(json.loads(line))
+                    except ValueError:
+                        yield "skip", None
+            return
+        s = _JsonStream(f, on_read)
+        if s.peek() == "[":
+            for e in s.array():
+                yield classify(e)
+            return
+        for key in s.keys():
+            if key in ("history", "session_history") and s.peek() == "[":
+                for e in s.array():
+                    yield classify(e)
+            elif key == "story" and s.peek() == "[":
+                lines = []
+                for e in s.array():
+                    if len(lines) < STORY_ID_LINES and isinstance(e, str):
+                        lines.append(e)
+                yield "story", lines
+            else:
+                s.skip()
+
+
+# ---------- Importación ----------
+def _story_keys(fp, lines) -> list:
+    """Huellas de la fuente: una por cada prefijo de sus crónicas (la última es
+    la actual; las anteriores, las que tenía cuando se importó más corta)."""
+    h = hashlib.sha1()
+    keys = []
+    for line in lines:
+        h.update(line.encode("utf-8") + b"\n")
+        keys.append(f"{fp}:{h.hexdigest()[:8]}")
+    return keys or [fp]
+
+
+def _same_story(a, b):
+    """¿Las crónicas de dos partidas coinciden en los niveles que tienen las dos?
+    None si no comparten ninguno (no hay con qué comparar)."""
+    la = {line.partition(": ")[0]: line for line in a if line.startswith("Nivel ")}
+    lb = {line.partition(": ")[0]: line for line in b if line.startswith("Nivel ")}
+    common = la.keys() & lb.keys()
+    if not common:
+        return None
+    return all(la[k] == lb[k] for k in common)
+
+
+def _runs_merge(paths):
+    def rows(path):
+        with open(path, "rb") as f:
+            while True:
+                raw = f.read(CHUNK_ROWS * SESSION_ROW.size)
+                if not raw:
+                    return
+                yield from SESSION_ROW.iter_unpack(raw)
+    return [rows(p) for p in paths]
+
+
+class Importer:
+    def __init__(self, paths, state: dict, sessions: SessionLog = None, dry_run: bool = False,
+                 progress=None, cancel=None, confirm=None):
+        self.paths = list(paths)
+        self.dry_run = dry_run
+        self.progress = progress    # progress(bytes leídos, bytes totales)
+        self.cancel = cancel        # threading.Event
+        self.confirm = confirm      # confirm(ruta, n, motivo) -> bool (ver QUESTIONS)
+        # Foto del estado (hilo del dueño): lo que sigue puede correr en otro hilo
+        hist = state["history"]
+        self._local = hist.reader()
+        self._local_len = len(hist)
+        self._ledger = dict(state.get(IMPORTS_KEY) or {})
+        self._web = dict(self._ledger.pop(WEB_KEY, None) or {})
+        self._story = [line for line in (state.get("story") or ())[:STORY_ID_LINES] if isinstance(line, str)]
+        self.sessions_path = None if sessions is None else sessions.path
+        self._sessions_n = 0 if sessions is None else len(sessions)
+        span = None if sessions is None else sessions.span()
+        self._sessions = (lambda: iter(())) if span is None else sessions.reader(span[0], span[1] + 1)
+        self._total = sum(os.path.getsize(p) for p in self.paths)
+        self._done = self._shown = 0
+        self.report = {"files": len(self.paths), "blocks_read": 0, "blocks_added": 0, "blocks_duplicate": 0,
+                       "intervals_read": 0, "intervals_added": 0, "skipped": 0}
+
+    def _on_read(self, n):
+        self._done += n
+        if self._done - self._shown < READ_BYTES and self._done < self._total:
+            return   # JSON Lines avisa por línea: se agrupa de a READ_BYTES
+        self._shown = self._done
+        if self.cancel is not None and self.cancel.is_set():
+            raise Cancelled()
+        if self.progress is not None:
+            self.progress(self._done, self._total)
+
+    def _poll(self, n):
+        if self.cancel is not None and self.cancel.is_set():
+            raise Cancelled()
+
+    def run(self, apply_blocks, replace_sessions):
+        """apply_blocks(filas, huella, tomadas): agregar bloques (ROW) y, si hay
+        huella, anotar en state["imports"] que de esa fuente ya se tomaron
+        `tomadas` (0: olvidar la huella).
+        replace_sessions(ruta, n, web): reemplazar el registro por el armado en
+        `ruta` con sus primeras `n` filas (las de después se vuelven a agregar)
+        y guardar `web` en state["imports"]["web"]; ruta None: el registro no
+        cambia, solo `web`."""
+        runs = []
+        try:
+            for path in self.paths:
+                self._import_file(path, apply_blocks, runs)
+            if runs and self.sessions_path is not None:
+                self._merge_sessions(runs, replace_sessions)
+        finally:
+            for p in runs:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+        return self.report
+
+    def _import_file(self, path, apply_blocks, runs):
+        rep = self.report
+        head = []          # primeros FP_ROWS bloques (huella)
+        fp = None
+        doubt = 0          # bloques [0, doubt) en duda: la primera pasada no los toma
+        same_rows = False
+        story = []
+        seen = 0
+        pending = bytearray()
+        spill = []
+
+        def decide():
+            nonlocal fp, doubt, same_rows
+            raw = b"".join(ROW.pack(*r) for r in head)
+            fp = hashlib.sha1(raw).hexdigest()[:16]
+            # Cualquier fuente con este comienzo (con o sin crónicas) deja en duda
+            doubt = max((n for k, n in self._ledger.items() if k.partition(":")[0] == fp), default=0)
+            n = min(len(head), self._local_len)
+            same_rows = n >= MIN_SAME_GAME and self._local(0, n) == raw[:n * ROW.size]
+            if same_rows:
+                doubt = max(doubt, self._local_len)
+            for i, r in enumerate(head):
+                take(i, r)
+
+        def take(i, r):
+            if i >= doubt:
+                pending.extend(ROW.pack(*r))
+                rep["blocks_added"] += 1
+            if len(pending) >= CHUNK_ROWS * ROW.size:
+                flush(i + 1)
+
+        def flush(upto):
+            if pending and not self.dry_run:
+                # Progreso bajo la huella de filas; con bloques en duda lo tomado
+                # no es un prefijo y se anota recién al final
+                apply_blocks(bytes(pending), "" if doubt else fp, upto)
+            pending.clear()
+
+        for what, row in read_archive(path, self._on_read, self._web):
+            if what == "block":
+                rep["blocks_read"] += 1
+                if fp is None:
+                    head.append(row)
+                    if len(head) == FP_ROWS:
+                        decide()
+                else:
+                    take(seen, row)
+                seen += 1
+            elif what in ("interval", "placed"):
+                if what == "interval":
+                    rep["intervals_read"] += 1   # las de la web se cuentan al leerlas ("web")
+                spill.append(row)
+                if len(spill) >= RUN_ROWS:
+                    runs.append(self._write_run(spill))
+            elif what == "web":
+                rep["intervals_read"] += 1
+            elif what == "story":
+                story = row
+            else:
+                rep["skipped"] += 1
+        if fp is None and head:
+            decide()
+        if fp is not None:
+            flush(seen)
+            keys = _story_keys(fp, story)
+            key = keys[-1]
+            if doubt:
+                hi = min(doubt, seen)
+                dup = self._duplicates(path, fp, keys, hi, same_rows, story)
+                rep["blocks_duplicate"] += dup
+                if dup < hi:
+                    self._retake(path, dup, hi, apply_blocks)
+            if not self.dry_run:
+                if key != fp and not doubt:
+                    apply_blocks(b"", fp, self._ledger.get(fp, 0))   # el progreso era provisorio
+                for old in keys[:-1]:
+                    if old in self._ledger:
+                        apply_blocks(b"", old, 0)   # la misma fuente, de cuando tenía menos crónicas
+                if doubt or key != fp or seen > self._ledger.get(fp, 0):
+                    apply_blocks(b"", key, seen)   # hasta dónde se leyó (aunque no haya nada nuevo)
+            for old in keys[:-1]:
+                self._ledger.pop(old, None)
+            self._ledger[key] = max(self._ledger.get(key, 0), seen)
+        if spill:
+            runs.append(self._write_run(spill))
+
+    def _duplicates(self, path, fp, keys, hi, same_rows, story) -> int:
+        """Cuántos de los primeros `hi` bloques ya están en el historial."""
+        # Misma fuente: mismas crónicas (o las de antes, si creció)
+        dup = min(max((self._ledger.get(k, 0) for k in keys if k != fp), default=0), hi)
+        plain = min(self._ledger.get(fp, 0), hi)    # fuente sin crónicas (o importación cortada)
+        if plain > dup and self._ask(path, plain, "source"):
+            dup = plain
+        if same_rows and hi > dup:
+            same = _same_story(story, self._story)
+            if same is None:
+                same = self._ask(path, hi, "game")
+            if same:
+                dup = hi
+        return dup
+
+    def _ask(self, path, n, why) -> bool:
+        return True if self.confirm is None else bool(self.confirm(path, n, why))
+
+    def _retake(self, path, lo, hi, apply_blocks):
+        """Segunda pasada: toma los bloques [lo, hi) que resultaron de otra partida."""
+        rep = self.report
+        pending = bytearray()
+        i = 0
+        for what, row in read_archive(path, self._poll, {}):
+            if what != "block":
+                continue
+            if i >= lo:
+                pending.extend(ROW.pack(*row))
+                rep["blocks_added"] += 1
+                if len(pending) >= CHUNK_ROWS * ROW.size or i + 1 == hi:
+                    if not self.dry_run:
+                        apply_blocks(bytes(pending), "", 0)
+                    pending.clear()
+            i += 1
+            if i >= hi:
+                break
+
+    def _write_run(self, rows):
+        rows.sort()
+        fd, path = tempfile.mkstemp(prefix="flowmodoro-import-", suffix=".run")
+        with os.fdopen(fd, "wb") as f:
+            for i in range(0, len(rows), CHUNK_ROWS):
+                f.write(b"".join(SESSION_ROW.pack(*r) for r in rows[i:i + CHUNK_ROWS]))
+        rows.clear()
+        return path
+
+    def _merge_sessions(self, runs, replace_sessions):
+        out = None if self.dry_run else self.sessions_path + ".import"
+        log = None
+        if out is not None:
+            for p in (out, out + ".idx"):
+                if os.path.exists(p):
+                    os.remove(p)
+            log = SessionLog(out)
+        added = 0
+        last = None
+        try:
+            tagged = [((r, 0) for r in self._sessions())] + [((r, 1) for r in it) for it in _runs_merge(runs)]
+            for i, (row, new) in enumerate(heapq.merge(*tagged)):
+                if i % CHUNK_ROWS == 0 and self.cancel is not None and self.cancel.is_set():
+                    raise Cancelled()
+                if row == last:
+                    continue
+                last = row
+                added += new
+                if log is not None:
+                    log.record(row[2], row[0], row[1])
+        except BaseException:
+            if log is not None:
+                log.close()
+                for p in (out, out + ".idx"):
+                    if os.path.exists(p):
+                        os.remove(p)
+            raise
+        self.report["intervals_added"] = added
+        if log is not None:
+            log.close()
+            if not added:
+                for p in (out, out + ".idx"):
+                    os.remove(p)
+                out = None   # todo estaba (p. ej. importado antes de llevar la cuenta de la web)
+            replace_sessions(out, self._sessions_n, self._web)
+
+
+def note_source(state, fp, upto):
+    """Anota en state["imports"] cuántos bloques se tomaron de la fuente `fp` (0: la olvida)."""
+    ledger = state.setdefault(IMPORTS_KEY, {})
+    if upto:
+        ledger[fp] = upto
+    else:
+        ledger.pop(fp, None)
+
+
+# ---------- Línea de comandos ----------
+def main(argv=None):
+    from .engine import GameEngine
+    from .export import saved_data
+    ap = argparse.ArgumentParser(prog="FlowmodoroRPG.py import", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("files", nargs="+", help="JSON (estado web o de escritorio) o JSON Lines")
+    ap.add_argument("--storage", choices=("journal", "sqlite", "binary", "json"), default=STATE_BACKEND)
+    ap.add_argument("--dry-run", action="store_true", help="solo contar: no cambia nada")
+    ap.add_argument("--same-game", choices=("ask", "yes", "no"), default="ask",
+                    help="si hay bloques en duda y no hay crónicas para comparar: preguntar "
+                         "(sin terminal se asume que ya están), o responder sí/no de antemano")
+    args = ap.parse_args(argv)
+
+    with saved_data(args.storage, save=not args.dry_run) as (state, sessions):
+        engine = GameEngine(state, sessions=sessions)
+
+        def apply_blocks(raw, fp, upto):
+            engine.import_blocks(raw)
+            if fp:
+                note_source(engine.state, fp, upto)
+
+        def replace_sessions(path, n, web):
+            if path is not None:
+                sessions.replace_with(path, n)
+            engine.state.setdefault(IMPORTS_KEY, {})[WEB_KEY] = web
+
+        def confirm(path, n, why):
+            if args.same_game != "ask":
+                return args.same_game == "yes"
+            if not sys.stdin.isatty():
+                return True
+            q = QUESTIONS[why].format(n=n, name=os.path.basename(path))
+            return input(f"\n{q} [S/n] ").strip().lower() not in ("n", "no")
+
+        shown = [-1]
+
+        def progress(done, total):
+            pct = done * 100 // max(1, total)
+            if pct != shown[0]:
+                shown[0] = pct
+                print(f"\r{pct:3d}%", end="", file=sys.stderr, flush=True)
+
+        try:
+            report = Importer(args.files, engine.state, sessions, args.dry_run, progress,
+                              confirm=confirm).run(apply_blocks, replace_sessions)
+        except (OSError, ValueError) as e:
+            print(f"\nimport: {e}", file=sys.stderr)
+            return 2
+        print(file=sys.stderr)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Journal de estado: snapshot JSON compactado + log binario de registros fijos.
+
+Cada save_state() solo agrega al log los campos que cambiaron desde el último
+commit (registros de 16 bytes), así que el costo por tick no depende del
+tamaño de `history` ni de `story`. Cada COMPACT_EVERY registros (o al salir)
+se reescribe el snapshot completo y se trunca el log.
+
+El snapshot es el JSON de siempre (más la clave `_journal_gen`), salvo el
+historial: si es un HistoryStore con archivo propio (history.py), no va ni al
+snapshot ni al log, se persiste solo al escribir cada bloque. Es un cambio de
+formato: una versión vieja del programa abre el snapshot pero ve el historial
+vacío (el resto del estado sí lo lee). Con un StateWriter (writer.py) el
+journal solo arma los bytes y la E/S va al hilo escritor.
+"""
+
+import os
+import json
+import copy
+import struct
+
+from .history import KINDS as HIST_KINDS, json_ready
+from .writer import atomic_write
+
+MAGIC = b"FRJ1"
+HEADER = struct.Struct("<4sQ")        # magic, generación del snapshot
+RECORD = struct.Struct("<BBxxiii")    # op, clave, a, b, c  (16 bytes)
+GEN_KEY = "_journal_gen"
+COMPACT_EVERY = 3600                  # ~30 min de ticks (2 registros/seg)
+
+OP_SET = 1     # clave=int_key, a=valor
+OP_NONE = 2    # clave=int_key, valor None
+OP_ENUM = 3    # clave=enum_key, a=índice del valor
+OP_HIST = 4    # clave=tipo, a=índice, b=exp, c=daño (append si índice == len)
+OP_STORY = 5   # a=nivel, b=índice de snippet
+
+INT_KEYS = (
+    "exp_total", "dano_total", "hp_total", "last_level", "tokens_spent",
+    "total_focus_sec", "total_break_sec", "session_focus_sec", "session_break_sec",
+    "auto_last_idx_focus",
+)
+INT32_MIN, INT32_MAX = -(2 ** 31), 2 ** 31 - 1
+
+
+class NeedSnapshot(Exception):
+    """El cambio no se puede expresar con registros fijos."""
+
+
+class StateJournal:
+    def __init__(self, path: str, story_snippets=(), enums=None, compact_every: int = COMPACT_EVERY,
+                 writer=None):
+        self.path = path
+        self.writer = writer      # StateWriter opcional: escrituras fuera del hilo de la GUI
+        self.log_path = path + ".log"
+        self.compact_every = max(1, int(compact_every))
+        self.story_snippets = list(story_snippets)
+        self._snippet_idx = {s: i for i, s in enumerate(self.story_snippets)}
+        # enums: {"difficulty": ("facil", ...), ...}
+        self.enum_keys = tuple((enums or {}).keys())
+        self.enum_values = [tuple(v) for v in (enums or {}).values()]
+        self._enum_idx = [{v: i for i, v in enumerate(vals)} for vals in self.enum_values]
+        self.gen = 0
+        self.pending = 0          # registros desde el último snapshot
+        self._log = None
+        self._log_ok = False      # el log corresponde al snapshot actual: se puede agregar
+        self._shadow = None       # último estado persistido (solo escalares)
+
+    # ---------- Carga ----------
+    def load(self):
+        """Devuelve snapshot + cola del log reaplicada, o None si no hay snapshot."""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.gen = int(data.pop(GEN_KEY, 0))
+        self.pending = self._replay(data)
+        self._remember(data)
+        self._open_log(truncate=False)
+        return data
+
+    def _replay(self, data) -> int:
+        try:
+            with open(self.log_path, "rb") as f:
+                buf = f.read()
+        except OSError:
+            return 0
+        if len(buf) < HEADER.size:
+            return 0
+        magic, gen = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or gen != self.gen:
+            return 0  # log de otro snapshot (p.ej. caída a mitad de compactar)
+        n = (len(buf) - HEADER.size) // RECORD.size  # registro parcial al final: se ignora
+        hist = data.setdefault("history", [])
+        story = data.setdefault("story", [])
+        for op, key, a, b, c in RECORD.iter_unpack(buf[HEADER.size:HEADER.size + n * RECORD.size]):
+            if op == OP_SET:
+                data[INT_KEYS[key]] = a
+            elif op == OP_NONE:
+                data[INT_KEYS[key]] = None
+            elif op == OP_ENUM:
+                data[self.enum_keys[key]] = self.enum_values[key][a]
+            elif op == OP_HIST:
+                entry = {"exp": b, "dano": c, "tipo": HIST_KINDS[key]}
+                if a == len(hist):
+                    hist.append(entry)
+                elif 0 <= a < len(hist):
+                    hist[a] = entry
+            elif op == OP_STORY:
+                story.append(f"Nivel {a}: {self.story_snippets[b]}")
+        return n
+
+    # ---------- Escritura ----------
+    def commit(self, state):
+        """Persiste las diferencias con el último commit (o compacta si hace falta)."""
+        hist = state.get("history")
+        if getattr(hist, "path", None) is not None:
+            hist.flush()   # con writer: sus filas van a la cola antes que estos registros
+        if self._shadow is None or not self._log_ok:
+            self.compact(state)
+            return
+        try:
+            recs = self._diff(state)
+        except NeedSnapshot:
+            self.compact(state)
+            return
+        if not recs:
+            return
+        if self.writer is not None:
+            self.writer.append(self.log_path, b"".join(recs))
+        else:
+            self._log.write(b"".join(recs))
+            self._log.flush()
+        self.pending += len(recs)
+        if self.pending >= self.compact_every:
+            self.compact(state)
+
+    def compact(self, state):
+        """Escribe un snapshot completo (atómico) y reinicia el log."""
+        gen = self.gen + 1
+        hist = state.get("history")
+        if getattr(hist, "path", None) is not None:
+            hist.flush()
+        data = dict(json_ready(state))
+        data[GEN_KEY] = gen
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        self.gen = gen
+        if self.writer is not None:
+            # En orden: snapshot nuevo y después el log vacío de su generación
+            self.writer.replace(self.path, raw)
+            self.writer.replace(self.log_path, HEADER.pack(MAGIC, gen))
+            self._log_ok = True
+        else:
+            atomic_write(self.path, raw)
+            self._open_log(truncate=True)
+        self.pending = 0
+        self._remember(state)
+
+    def close(self, state=None):
+        if state is not None:
+            self.compact(state)
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _open_log(self, truncate: bool):
+        if self._log is not None:
+            self._log.close()
+        if truncate or not os.path.exists(self.log_path):
+            self._log = open(self.log_path, "wb")
+            self._log.write(HEADER.pack(MAGIC, self.gen))
+            self._log.flush()
+            self._ready_log()
+            return
+        self._log = open(self.log_path, "r+b")
+        if self._log.read(HEADER.size) != HEADER.pack(MAGIC, self.gen):
+            self._log.close()
+            self._log = None
+            self._open_log(truncate=True)
+            return
+        # Descartar un registro parcial de una escritura interrumpida
+        size = self._log.seek(0, os.SEEK_END)
+        valid = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+        self._log.truncate(valid)
+        self._log.seek(valid)
+        self._ready_log()
+
+    def _ready_log(self):
+        self._log_ok = True
+        if self.writer is not None:
+            # Desde acá agrega el hilo escritor (con su propio archivo abierto)
+            self._log.close()
+            self._log = None
+
+    # ---------- Diferencias ----------
+    def _remember(self, state):
+        sh = {}
+        for k in INT_KEYS:
+            sh[k] = state.get(k)
+        for k in self.enum_keys:
+            sh[k] = state.get(k)
+        others = {}
+        for k, v in state.items():
+            if k in sh or k in ("history", "story"):
+                continue
+            others[k] = copy.deepcopy(v)
+        sh["_others"] = others
+        hist = state.get("history", [])
+        sh["_hist_len"] = len(hist)
+        sh["_story_len"] = len(state.get("story", []))
+        sh["_watch"] = self._watch_entry(state, hist)
+        self._shadow = sh
+
+    def _watch_entry(self, state, hist):
+        if getattr(hist, "path", None) is not None:
+            return None  # el store en disco se persiste solo
+        # La única entrada que se modifica in situ es la del auto-registro (mini -> deep)
+        idx = state.get("auto_last_idx_focus")
+        if isinstance(idx, int) and 0 <= idx < len(hist):
+            e = hist[idx]
+            return idx, (e.get("exp"), e.get("dano"), e.get("tipo"))
+        return None
+
+    def _diff(self, state):
+        sh = self._shadow
+        recs = []
+        for i, k in enumerate(INT_KEYS):
+            v = state.get(k)
+            if v == sh[k] and type(v) is type(sh[k]):
+                continue
+            if v is None:
+                recs.append(RECORD.pack(OP_NONE, i, 0, 0, 0))
+            elif isinstance(v, int) and not isinstance(v, bool) and INT32_MIN <= v <= INT32_MAX:
+                recs.append(RECORD.pack(OP_SET, i, v, 0, 0))
+            else:
+                raise NeedSnapshot(k)
+        for i, k in enumerate(self.enum_keys):
+            v = state.get(k)
+            if v != sh[k]:
+                j = self._enum_idx[i].get(v)
+                if j is None:
+                    raise NeedSnapshot(k)
+                recs.append(RECORD.pack(OP_ENUM, i, j, 0, 0))
+        others = sh["_others"]
+        for k, v in state.items():
+            if k in others:
+                if v != others[k]:
+                    raise NeedSnapshot(k)
+            elif k not in sh and k not in ("history", "story"):
+                raise NeedSnapshot(k)
+
+        hist = state.get("history", [])
+        old_len = sh["_hist_len"]
+        if len(hist) < old_len:
+            raise NeedSnapshot("history")
+        watch = sh["_watch"]
+        if watch is not None and watch[0] < old_len:
+            e = hist[watch[0]]
+            if (e.get("exp"), e.get("dano"), e.get("tipo")) != watch[1]:
+                recs.append(self._hist_record(watch[0], e))
+        if getattr(hist, "path", None) is None:
+            for idx in range(old_len, len(hist)):
+                recs.append(self._hist_record(idx, hist[idx]))
+
+        story = state.get("story", [])
+        old_story = sh["_story_len"]
+        if len(story) < old_story:
+            raise NeedSnapshot("story")
+        for line in story[old_story:]:
+            recs.append(self._story_record(line))
+
+        # Todo representable: actualizar la sombra en O(cambios)
+        for k in INT_KEYS:
+            sh[k] = state.get(k)
+        for k in self.enum_keys:
+            sh[k] = state.get(k)
+        sh["_hist_len"] = len(hist)
+        sh["_story_len"] = len(story)
+        sh["_watch"] = self._watch_entry(state, hist)
+        return recs
+
+    def _hist_record(self, idx, e):
+        tipo = e.get("tipo")
+        exp, dano = e.get("exp"), e.get("dano")
+        if tipo not in HIST_KINDS or not isinstance(exp, int) or not isinstance(dano, int):
+            raise NeedSnapshot("history")
+        return RECORD.pack(OP_HIST, HIST_KINDS.index(tipo), idx, exp, dano)
+
+    def _story_record(self, line):
+        head, sep, snippet = line.partition(": ")
+        j = self._snippet_idx.get(snippet)
+        if not sep or j is None or not head.startswith("Nivel "):
+            raise NeedSnapshot("story")
+        try:
+            lvl = int(head[len("Nivel "):])
+        except ValueError:
+            raise NeedSnapshot("story")
+        return RECORD.pack(OP_STORY, 0, lvl, j, 0)
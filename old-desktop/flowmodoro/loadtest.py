@@ -0,0 +1,114 @@
+"""
+Prueba de carga del servidor: N sesiones simultáneas en un solo proceso (un
+núcleo), servidor y clientes en el mismo loop.
+
+    python3 FlowmodoroRPG.py loadtest --sessions 10000 --connections 500 --duration 30 --speed 60
+
+Cada conexión WebSocket arranca el cronómetro de sus usuarios y después solo
+escucha eventos. Con --speed 60 un minuto simulado dura un segundo real, así
+que en 30 s cada sesión cruza los umbrales de 10 y 25 min. Se informa CPU,
+despertares del servidor, eventos y la demora máxima del loop.
+"""
+
+import sys
+import json
+import time
+import base64
+import asyncio
+import argparse
+
+from .server import start_server, ws_frame, ws_read
+
+LAG_SAMPLE_SEC = 0.05
+
+
+async def _client(host, port, users, counters, stop):
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(b"flowmodoro-load!").decode()
+    writer.write((f"GET /ws HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    await reader.readuntil(b"\r\n\r\n")
+    for u in users:
+        writer.write(ws_frame(json.dumps({"user": u, "cmd": "start"}).encode(), mask=True))
+    await writer.drain()
+    try:
+        while not stop.is_set():
+            _, payload = await ws_read(reader)
+            msg = json.loads(payload)
+            if "events" in msg and "state" not in msg:
+                counters["events"] += len(msg["events"])
+            else:
+                counters["replies"] += 1
+    except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _lag_probe(stop, out):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t = loop.time()
+        await asyncio.sleep(LAG_SAMPLE_SEC)
+        out["max_lag_ms"] = max(out["max_lag_ms"], (loop.time() - t - LAG_SAMPLE_SEC) * 1000)
+
+
+async def run(sessions, connections, duration, speed):
+    hub, srv, server = await start_server("127.0.0.1", 0, speed=speed)
+    host, port = server.sockets[0].getsockname()[:2]
+    stop = asyncio.Event()
+    counters = {"events": 0, "replies": 0}
+    lag = {"max_lag_ms": 0.0}
+    connections = max(1, min(connections, sessions))
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    tasks = [asyncio.create_task(_client(host, port, [f"u{j}" for j in range(i, sessions, connections)],
+                                         counters, stop))
+             for i in range(connections)]
+    while counters["replies"] < sessions and time.perf_counter() - wall0 < 60:
+        await asyncio.sleep(0.05)
+    setup_sec = time.perf_counter() - wall0
+    cpu1 = time.process_time()
+    wake0 = hub.wakeups
+    probe = asyncio.create_task(_lag_probe(stop, lag))
+    await asyncio.sleep(duration)
+    stop.set()
+    cpu2 = time.process_time()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, probe, return_exceptions=True)
+    server.close()
+    await server.wait_closed()
+    st = hub.stats()
+    return {
+        "sessions": sessions,
+        "connections": connections,
+        "running": st["running"],
+        "speed": speed,
+        "simulated_min": round(duration * speed / 60, 1),
+        "setup_sec": round(setup_sec, 2),
+        "setup_cpu_sec": round(cpu1 - cpu0, 2),
+        "steady_cpu_sec": round(cpu2 - cpu1, 2),
+        "steady_cpu_pct": round(100 * (cpu2 - cpu1) / duration, 1),
+        "server_wakeups": hub.wakeups - wake0,
+        "events_delivered": counters["events"],
+        "events_emitted": st["events"],
+        "max_loop_lag_ms": round(lag["max_lag_ms"], 1),
+        "wall_sec": round(time.perf_counter() - wall0, 2),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="FlowmodoroRPG.py loadtest", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=10000)
+    ap.add_argument("--connections", type=int, default=500, help="conexiones WebSocket (usuarios repartidos)")
+    ap.add_argument("--duration", type=float, default=30.0, help="segundos reales en régimen")
+    ap.add_argument("--speed", type=float, default=60.0, help="aceleración del reloj de los motores")
+    args = ap.parse_args(argv)
+    result = asyncio.run(run(args.sessions, args.connections, args.duration, args.speed))
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+Overlay animado de la barra de HP del jefe (shimmer + partículas).
+
+El QTimer corre solo mientras haya algo que animar: con la ventana inactiva,
+minimizada u oculta, o con HP=0, se detiene y queda el último cuadro. La
+cadencia se adapta a la carga (FrameScheduler) y cada cuadro repinta solo la
+unión de la banda de shimmer y las cajas de las partículas.
+"""
+
+import os
+import time
+import random
+from collections import deque
+
+from PyQt5.QtCore import Qt, QRect, QTimer, QPointF, QEvent
+from PyQt5.QtGui import QPainter, QLinearGradient, QColor, QBrush, QPen, QRegion
+from PyQt5.QtWidgets import QWidget, QProgressBar
+
+from .particles import ParticlePool, KIND_AMBIENT, KIND_BURST
+
+BASE_FRAME_MS = 33      # ~30 FPS, la cadencia de diseño del shimmer/partículas
+PHASE_PER_FRAME = 0.015
+
+
+class FrameScheduler:
+    """Elige el intervalo entre cuadros según la demora de los ticks y la carga."""
+    LEVELS_MS = (33, 50, 66, 100)   # 30, 20, 15, 10 FPS
+    LOAD_SAMPLE_SEC = 5.0
+
+    def __init__(self, history: int = 120):
+        self.level = 0
+        self.late_ema = 0.0         # ms de retraso de los ticks (event loop ocupado)
+        self.paint_ema = 0.0        # ms de paintEvent
+        self.paint_times = deque(maxlen=history)
+        self.frames = 0
+        self.ticks = 0
+        self._calm = 0
+        self._load_level = 0
+        self._load_at = 0.0
+
+    def pressure(self) -> int:
+        """0 (holgado) .. 3 (10 FPS): cuadros lentos o carga del sistema."""
+        return max(self.level, self._load_level)
+
+    def interval_ms(self) -> int:
+        return self.LEVELS_MS[self.pressure()]
+
+    def on_tick(self, dt_ms: float):
+        """dt_ms: tiempo real desde el tick anterior."""
+        self.ticks += 1
+        late = max(0.0, dt_ms - self.interval_ms())
+        self.late_ema += 0.1 * (late - self.late_ema)
+        budget = self.interval_ms() * 0.25
+        if self.late_ema > budget or self.paint_ema > budget:
+            if self.level < len(self.LEVELS_MS) - 1:
+                self.level += 1
+                self.late_ema = 0.0
+            self._calm = 0
+        elif self.late_ema < 2.0 and self.paint_ema < 4.0:
+            self._calm += 1
+            if self._calm >= 90 and self.level > 0:  # ~3 s tranquilos: volver a subir FPS
+                self.level -= 1
+                self._calm = 0
+        self._sample_load()
+
+    def on_paint(self, ms: float):
+        self.frames += 1
+        self.paint_times.append(ms)
+        self.paint_ema += 0.1 * (ms - self.paint_ema)
+
+    def _sample_load(self):
+        now = time.monotonic()
+        if now - self._load_at < self.LOAD_SAMPLE_SEC:
+            return
+        self._load_at = now
+        try:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (OSError, AttributeError):
+            return
+        self._load_level = 3 if load > 1.5 else 2 if load > 0.9 else 0
+
+    def stats(self) -> dict:
+        times = sorted(self.paint_times)
+        return {
+            "frames": self.frames,
+            "ticks": self.ticks,
+            "fps_target": round(1000 / self.interval_ms(), 1),
+            "paint_ms_avg": round(sum(times) / len(times), 3) if times else 0.0,
+            "paint_ms_p95": round(times[int(0.95 * (len(times) - 1))], 3) if times else 0.0,
+            "paint_ms_max": round(times[-1], 3) if times else 0.0,
+            "tick_late_ms": round(self.late_ema, 2),
+        }
+
+
+class BossHpOverlay(QWidget):
+    """Overlay que dibuja shimmer + partículas sobre el 'chunk' de la barra."""
+    def __init__(self, bar: QProgressBar, parent=None):
+        super().__init__(parent or bar)
+        self.bar = bar
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
+        self.setAttribute(Qt.WA_TranslucentBackground, True)
+        self.progress_value = 0
+        self.progress_max = 1
+        self.phase = 0.0  # shimmer
+        self.scheduler = FrameScheduler()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_tick)
+        self._last_tick = None
+        self._band_rect = QRect()
+        self._watched_window = None
+        self.particles = ParticlePool()  # slots fijos: sin asignaciones por cuadro
+        self._col = QColor(255, 255, 255)
+        self._col_burst = QColor(255, 196, 120)
+        self._install_filters()
+
+    def _install_filters(self):
+        # Ajustar geometría del overlay cuando la barra cambie de tamaño o se mueva
+        self.bar.installEventFilter(self)
+        self.update_geometry()
+
+    def _watch_window(self):
+        # Activación/minimizado de la ventana: despertar o dormir el timer
+        top = self.window()
+        if top is not self and top is not self._watched_window:
+            if self._watched_window is not None:
+                self._watched_window.removeEventFilter(self)
+            top.installEventFilter(self)
+            self._watched_window = top
+
+    def eventFilter(self, obj, ev):
+        t = ev.type()
+        if obj is self.bar and t in (QEvent.Resize, QEvent.Move, QEvent.Show, QEvent.Hide):
+            self.update_geometry()
+        elif obj is self._watched_window and t in (
+                QEvent.WindowActivate, QEvent.WindowDeactivate, QEvent.WindowStateChange,
+                QEvent.Show, QEvent.Hide):
+            self.wake()
+        return super().eventFilter(obj, ev)
+
+    def showEvent(self, ev):
+        super().showEvent(ev)
+        self._watch_window()
+        self.wake()
+
+    def update_geometry(self):
+        # Cubrir completamente la barra (incluyendo bordes redondeados)
+        self.setGeometry(self.bar.rect())
+        self.raise_()
+        self.update()
+        self.wake()
+
+    def setProgress(self, val: int, maximum: int):
+        # Evitar 0/0
+        maximum = max(1, int(maximum)); val = max(0, int(val))
+        if (val, maximum) == (self.progress_value, self.progress_max):
+            return
+        self.progress_max = maximum
+        self.progress_value = val
+        self.update()
+        self.wake()
+
+    # ---------- Planificación ----------
+    def _chunk_width(self) -> int:
+        return int(self.width() * self.progress_value / self.progress_max)
+
+    def should_animate(self) -> bool:
+        if self.progress_value <= 0 or self._chunk_width() <= 2 or not self.isVisible():
+            return False
+        top = self.window()
+        if top is not None and (not top.isActiveWindow() or top.isMinimized()):
+            return False
+        return not self.visibleRegion().isEmpty()
+
+    def wake(self):
+        """Arranca el timer si hay algo que animar; si no, lo detiene (cero wakeups)."""
+        if self.should_animate():
+            if not self.timer.isActive():
+                self._last_tick = None
+                self.timer.start(self.scheduler.interval_ms())
+        elif self.timer.isActive():
+            self.timer.stop()
+            self.update()  # pintar apagado (último cuadro)
+
+    def frame_stats(self) -> dict:
+        st = self.scheduler.stats()
+        st["active"] = self.timer.isActive()
+        st["particles"] = self.particles.count
+        return st
+
+    def _on_tick(self):
+        if not self.should_animate():
+            self.update()  # pintar apagado
+            return
+        now = time.perf_counter()
+        dt_ms = BASE_FRAME_MS if self._last_tick is None else (now - self._last_tick) * 1000.0
+        self._last_tick = now
+        self.scheduler.on_tick(dt_ms)
+        # Avance proporcional al tiempo real: se ve igual a 30 o a 10 FPS
+        k = min(4.0, dt_ms / BASE_FRAME_MS)
+
+        dirty = self._particles_region()
+
+        # Avanzar shimmer
+        self.phase = (self.phase + PHASE_PER_FRAME * k) % 1.0
+
+        # Gestionar partículas: pocas y discretas
+        self._maybe_spawn_particle()
+        self._step_particles(k)
+
+        dirty += self._particles_region()
+        band = self._shimmer_rect()
+        dirty += band
+        dirty += self._band_rect
+        self._band_rect = band
+        self.update(dirty)
+        self.timer.start(self.scheduler.interval_ms())
+
+    def _shimmer_rect(self) -> QRect:
+        # Extensión horizontal de la franja diagonal no transparente del gradiente
+        w, h = self.width(), self.height()
+        chunk_w = self._chunk_width()
+        band_w = max(20, w // 6)
+        x0 = int((self.phase) * (chunk_w + band_w*2)) - band_w
+        slant = (h * h) // band_w + 2
+        return QRect(x0 - slant, 0, band_w + 2 * slant, h)
+
+    def _particles_region(self) -> QRegion:
+        # Unión de las cajas de las partículas vivas (una caja para todo el estallido)
+        pool = self.particles
+        if pool.count == 0:
+            return QRegion()
+        x0 = y0 = 1e9; x1 = y1 = -1e9
+        xs, ys, rs, alive = pool.x, pool.y, pool.r, pool.alive
+        region = QRegion()
+        for i in range(pool.high):
+            if not alive[i]:
+                continue
+            r = int(rs[i]) + 2
+            if pool.kind[i] == KIND_AMBIENT:
+                region += QRect(int(xs[i]) - r, int(ys[i]) - r, 2 * r + 1, 2 * r + 1)
+            else:
+                x0 = min(x0, xs[i] - r); x1 = max(x1, xs[i] + r)
+                y0 = min(y0, ys[i] - r); y1 = max(y1, ys[i] + r)
+        if x1 >= x0:
+            region += QRect(int(x0), int(y0), int(x1 - x0) + 2, int(y1 - y0) + 2)
+        return region
+
+    def _maybe_spawn_particle(self):
+        # Mantener 2-4 partículas vivas
+        if self.particles.count_by_kind[KIND_AMBIENT] < 4 and random.random() < 0.25:
+            h = max(1, self.height() - 6)
+            # Spawn cerca de la mitad de altura
+            y = random.randint(3, h-3)
+            # Aparecen dentro del chunk (x en [4, chunk_w-6])
+            chunk_w = self._chunk_width()
+            if chunk_w > 12:
+                x = random.randint(4, chunk_w - 6)
+                self.particles.spawn(
+                    x, y, 0.0,
+                    -0.3 - random.random()*0.5,     # suben leve
+                    0.5 + random.random()*0.4,      # alpha
+                    1.0 + random.random()*1.2       # radio
+                )
+
+    def _step_particles(self, k: float = 1.0):
+        self.particles.step(k, min_y=2.0)
+
+    def burst(self, n: int = 14):
+        """Estallido de chispas en el borde del chunk (impacto de daño)."""
+        chunk_w = self._chunk_width()
+        if chunk_w <= 2 and self.progress_value > 0:
+            return
+        self.particles.burst(max(4.0, chunk_w - 3.0), self.height() / 2.0, n=n)
+        self.wake()
+
+    def paintEvent(self, ev):
+        if self.progress_value <= 0 or self.progress_max <= 0:
+            return
+
+        w = self.width()
+        h = self.height()
+        chunk_w = self._chunk_width()
+
+        if chunk_w <= 2 or h <= 2:
+            return
+
+        t0 = time.perf_counter()
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing, True)
+
+        # Clip al rect del chunk (ligero padding interior); Qt ya recorta a la región sucia
+        pad = 2
+        clip_rect = QRect(pad, pad, max(0, chunk_w - 2*pad), max(0, h - 2*pad))
+        p.setClipRect(clip_rect)
+
+        # -------- Shimmer (resplandor en diagonal) --------
+        # Gradiente diagonal que se mueve según 'phase'
+        # Base de colores muy sutil (no intrusivo). Ajuste por tema claro/oscuro.
+        is_dark = self.palette().color(self.backgroundRole()).value() < 128
+        c_lo = QColor(255, 255, 255, 28 if is_dark else 40)   # highlight suave
+        c_hi = QColor(255, 255, 255, 64 if is_dark else 80)   # highlight pico
+        # Mover la banda diagonal a través del ancho
+        band_w = max(20, w // 6)
+        x0 = int((self.phase) * (chunk_w + band_w*2)) - band_w
+        g = QLinearGradient(x0, 0, x0 + band_w, h)
+        g.setColorAt(0.0, QColor(0, 0, 0, 0))
+        g.setColorAt(0.45, c_lo)
+        g.setColorAt(0.5,  c_hi)
+        g.setColorAt(0.55, c_lo)
+        g.setColorAt(1.0, QColor(0, 0, 0, 0))
+        p.fillRect(clip_rect & ev.rect(), QBrush(g))
+
+        # -------- Partículas --------
+        pen = QPen(QColor(255, 255, 255, 140 if is_dark else 170))
+        pen.setWidthF(1.0)
+        p.setPen(pen)
+        pool = self.particles
+        for i in range(pool.high):
+            if not pool.alive[i]:
+                continue
+            col = self._col_burst if pool.kind[i] == KIND_BURST else self._col
+            col.setAlpha(int(255 * max(0.0, min(1.0, pool.alpha[i] * pool.life[i]))))
+            p.setBrush(col)
+            r = pool.r[i]
+            p.drawEllipse(QPointF(pool.x[i], pool.y[i]), r, r)
+
+        # (El texto lo dibuja el QProgressBar debajo; este overlay es transparente)
+        p.end()
+        self.scheduler.on_paint((time.perf_counter() - t0) * 1000.0)
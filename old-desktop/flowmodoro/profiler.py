@@ -0,0 +1,172 @@
+"""
+Perfil de los caminos calientes (--profile): contadores por función y muestreo.
+
+Sin --profile no se importa ni se envuelve nada: costo cero. Con --profile,
+`instrument()` reemplaza en la clase los métodos elegidos por un envoltorio
+que suma llamadas, tiempo total (inclusivo), máximo y llamadas lentas (más de
+un cuadro, SLOW_MS). Con --profile-sample, un hilo toma la pila del hilo de
+la GUI HZ veces por segundo y cuenta pilas colapsadas (formato flamegraph).
+
+El resumen (JSON, y las pilas en `<archivo>.stacks`) se escribe al salir y
+cada vez que llega SIGUSR1, sin cerrar la app:
+
+    kill -USR1 <pid>
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import signal
+import socket
+import threading
+import functools
+
+SLOW_MS = 16.0
+STACK_DEPTH = 48
+
+# Entradas instrumentadas: (módulo, clase, métodos)
+HOT_PATHS = (
+    ("flowmodoro.gui", "MainWindow", (
+        "on_stopwatch_tick", "on_deadline", "save_state", "flush_state", "load_state", "update_counts_only",
+        "handle_events", "apply_block", "toggle_mode", "toggle_start_pause", "forget_times",
+        "reset_all", "new_boss_scaled_hp", "claim_small_token", "claim_big_token",
+        "show_level_up", "show_onboarding_tips", "play_cue",
+    )),
+    ("flowmodoro.overlay", "BossHpOverlay", ("_on_tick", "paintEvent")),
+    ("flowmodoro.engine", "GameEngine", ("sync", "apply_block")),
+)
+
+
+class HotPathProfiler:
+    def __init__(self, path: str, sample_hz: int = 0):
+        self.path = path
+        self.sample_hz = sample_hz
+        self.counters = {}          # nombre -> [llamadas, ns totales, ns máx, lentas]
+        self.stacks = {}            # "a;b;c" -> muestras
+        self.samples = 0
+        self.t0 = time.perf_counter()
+        self._main_id = threading.main_thread().ident
+        self._sampler = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    # ---------- Contadores ----------
+    def wrap(self, name: str, fn):
+        cell = self.counters.setdefault(name, [0, 0, 0, 0])
+        code = getattr(fn, "__code__", None)
+        # Qt pasa todos los argumentos de la señal; como con el método original,
+        # se descartan los que sobran
+        nargs = None if code is None or code.co_flags & 0x04 else code.co_argcount
+        slow_ns = int(SLOW_MS * 1e6)
+        clock = time.perf_counter_ns
+
+        @functools.wraps(fn)
+        def timed(*args, **kw):
+            if nargs is not None and len(args) > nargs:
+                args = args[:nargs]
+            t = clock()
+            try:
+                return fn(*args, **kw)
+            finally:
+                dt = clock() - t
+                cell[0] += 1
+                cell[1] += dt
+                if dt > cell[2]:
+                    cell[2] = dt
+                if dt > slow_ns:
+                    cell[3] += 1
+        timed.__profiled__ = True
+        return timed
+
+    def instrument(self, targets=HOT_PATHS):
+        """Envuelve los métodos en las clases (antes de crear la ventana: Qt
+        conecta las señales a los métodos que encuentra en ese momento)."""
+        import importlib
+        for mod_name, cls_name, methods in targets:
+            cls = getattr(importlib.import_module(mod_name), cls_name, None)
+            if cls is None:
+                continue
+            for m in methods:
+                fn = cls.__dict__.get(m)
+                if fn is None or getattr(fn, "__profiled__", False):
+                    continue
+                setattr(cls, m, self.wrap(f"{cls_name}.{m}", fn))
+
+    # ---------- Muestreo ----------
+    def start_sampling(self):
+        if self.sample_hz <= 0 or self._sampler is not None:
+            return
+        self._sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+        self._sampler.start()
+
+    def _sample_loop(self):
+        period = 1.0 / self.sample_hz
+        while not self._stop.wait(period):
+            frame = sys._current_frames().get(self._main_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < STACK_DEPTH:
+                co = frame.f_code
+                if co.co_filename != __file__:  # sin los envoltorios de wrap()
+                    names.append(f"{os.path.basename(co.co_filename)}:{co.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(names))
+            with self._lock:
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    # ---------- Resumen ----------
+    def summary(self) -> dict:
+        rows = {}
+        for name, (calls, total, mx, slow) in self.counters.items():
+            if calls:
+                rows[name] = {"calls": calls, "total_ms": round(total / 1e6, 3),
+                              "mean_ms": round(total / calls / 1e6, 4), "max_ms": round(mx / 1e6, 3),
+                              f"over_{SLOW_MS:g}ms": slow}
+        with self._lock:
+            top = sorted(self.stacks.items(), key=lambda kv: -kv[1])[:20]
+            samples = self.samples
+        return {
+            "pid": os.getpid(),
+            "uptime_sec": round(time.perf_counter() - self.t0, 1),
+            "functions": dict(sorted(rows.items(), key=lambda kv: -kv[1]["total_ms"])),
+            "sampling": {"hz": self.sample_hz, "samples": samples,
+                         "top_stacks": [{"stack": k, "samples": v} for k, v in top]},
+        }
+
+    def dump(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        if self.sample_hz > 0:
+            with self._lock:
+                lines = [f"{k} {v}\n" for k, v in self.stacks.items()]
+            with open(self.path + ".stacks", "w", encoding="utf-8") as f:
+                f.writelines(lines)
+
+    def stop(self):
+        self._stop.set()
+        self.dump()
+
+    # ---------- Salida y señal ----------
+    def install(self, app):
+        """Resumen al salir (aboutToQuit / atexit) y con SIGUSR1."""
+        self.start_sampling()
+        app.aboutToQuit.connect(self.stop)
+        atexit.register(self.dump)
+        if not hasattr(signal, "SIGUSR1"):
+            return
+        signal.signal(signal.SIGUSR1, lambda *_: self.dump())
+        # El handler de Python corre recién cuando vuelve a ejecutarse Python:
+        # un socket de despertar hace que el loop de Qt lo atienda enseguida
+        from PyQt5.QtCore import QSocketNotifier
+        rsock, wsock = socket.socketpair()
+        rsock.setblocking(False); wsock.setblocking(False)
+        signal.set_wakeup_fd(wsock.fileno())
+        notifier = QSocketNotifier(rsock.fileno(), QSocketNotifier.Read, app)
+        notifier.activated.connect(lambda *_: rsock.recv(64))
+        self._wakeup = (rsock, wsock, notifier)
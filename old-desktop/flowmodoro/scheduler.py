@@ -0,0 +1,149 @@
+"""
+Rueda de tiempo jerárquica para vencimientos (sin Qt).
+
+Los umbrales de una sesión (bloque mini a los 10 min, deep a los 25, aviso de
+descanso excedido) se registran una vez, al arrancar o cambiar de modo, y la
+rueda dice cuándo vence el próximo: quien la usa arma un único timer del
+sistema para ese instante. Los despertares dependen de cuántos vencimientos
+hay, no de cuánto dura la sesión ni de cuántas sesiones corren.
+
+Cada nivel tiene 64 ranuras; el nivel k cubre ticks de 64**k resoluciones. Un
+vencimiento va al nivel del bit más alto en que difiere del tick actual, así
+que dentro de un nivel el orden de las ranuras es el orden temporal y al
+avanzar solo se bajan (en cascada) las ranuras que el reloj atravesó.
+Registrar y cancelar son O(1); `advance()` cuesta O(niveles + vencidos).
+
+`next_deadline()` es exacto cuando lo próximo está en el nivel 0; si está más
+arriba devuelve el comienzo de esa ranura (una cota inferior): despertar ahí
+solo baja la ranura y el siguiente pedido ya es exacto. Así nunca recorre una
+ranura grande de un nivel alto (miles de sesiones con umbrales parecidos).
+"""
+
+import itertools
+
+WHEEL_BITS = 6
+WHEEL_SLOTS = 1 << WHEEL_BITS
+WHEEL_MASK = WHEEL_SLOTS - 1
+_STALE = object()
+
+
+class Timer:
+    __slots__ = ("when", "payload", "tick", "seq", "_level", "_slot")
+
+    def __init__(self, when, payload, tick, seq):
+        self.when = when
+        self.payload = payload
+        self.tick = tick
+        self.seq = seq
+        self._level = self._slot = None   # None: fuera de la rueda
+
+
+class TimingWheel:
+    def __init__(self, resolution: float = 1.0, now: float = 0.0):
+        self.resolution = resolution
+        self._tick = int(now // resolution)
+        self._levels = []      # por nivel: 64 sets de Timer
+        self._bits = []        # por nivel: bitmap de ranuras no vacías
+        self._due = []         # ticks ya alcanzados (vencen dentro del tick actual)
+        self._seq = itertools.count()
+        self._next = None      # caché de next_deadline() (_STALE: recalcular)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # ---------- Registro ----------
+    def schedule(self, when: float, payload=None) -> Timer:
+        t = Timer(when, payload, int(when // self.resolution), next(self._seq))
+        self._place(t)
+        self.count += 1
+        if self._next is not _STALE and (self._next is None or when < self._next):
+            self._next = when
+        return t
+
+    def cancel(self, t: Timer):
+        if t._level is None:
+            return
+        if t._level < 0:
+            self._due.remove(t)
+        else:
+            slot = self._levels[t._level][t._slot]
+            slot.discard(t)
+            if not slot:
+                self._bits[t._level] &= ~(1 << t._slot)
+        t._level = t._slot = None
+        self.count -= 1
+        if not self.count:
+            self._next = None
+        elif self._next is not _STALE and self._next is not None and t.when <= self._next:
+            self._next = _STALE
+
+    def _place(self, t: Timer):
+        cur = self._tick
+        if t.tick <= cur:
+            self._due.append(t)
+            t._level, t._slot = -1, None
+            return
+        level = ((t.tick ^ cur).bit_length() - 1) // WHEEL_BITS
+        while len(self._levels) <= level:
+            self._levels.append([set() for _ in range(WHEEL_SLOTS)])
+            self._bits.append(0)
+        slot = (t.tick >> (WHEEL_BITS * level)) & WHEEL_MASK
+        self._levels[level][slot].add(t)
+        self._bits[level] |= 1 << slot
+        t._level, t._slot = level, slot
+
+    # ---------- Avance ----------
+    def advance(self, now: float):
+        """Mueve la rueda a `now` y devuelve los Timer vencidos, en orden."""
+        new = int(now // self.resolution)
+        cur = self._tick
+        if new > cur:
+            self._next = _STALE
+            moved = []
+            for k, slots in enumerate(self._levels):
+                shift = WHEEL_BITS * k
+                cd, nd = (cur >> shift) & WHEEL_MASK, (new >> shift) & WHEEL_MASK
+                same_above = (cur >> (shift + WHEEL_BITS)) == (new >> (shift + WHEEL_BITS))
+                if same_above and cd == nd:
+                    break   # este nivel y los de arriba no cambian
+                hi = nd if same_above else WHEEL_MASK
+                passed = self._bits[k] & ((1 << (hi + 1)) - 1) & ~((1 << (cd + 1)) - 1)
+                self._bits[k] &= ~passed
+                while passed:
+                    s = (passed & -passed).bit_length() - 1
+                    passed &= passed - 1
+                    moved.extend(slots[s])
+                    slots[s].clear()
+            self._tick = new
+            for t in moved:
+                self._place(t)
+        fired = [t for t in self._due if t.when <= now]
+        if not fired:
+            return []
+        self._due = [t for t in self._due if t.when > now]
+        fired.sort(key=lambda t: (t.when, t.seq))
+        for t in fired:
+            t._level = None
+        self.count -= len(fired)
+        self._next = _STALE
+        return fired
+
+    def next_deadline(self):
+        """Cuándo despertar: el próximo vencimiento o una cota inferior (None: nada)."""
+        if self._next is _STALE:
+            self._next = self._compute_next()
+        return self._next
+
+    def _compute_next(self):
+        if self._due:
+            return min(t.when for t in self._due)
+        for k, bits in enumerate(self._bits):
+            if bits:
+                # Los niveles bajos vencen antes que los altos; en un nivel, la ranura más baja
+                s = (bits & -bits).bit_length() - 1
+                if k == 0:
+                    return min(t.when for t in self._levels[0][s])
+                shift = WHEEL_BITS * k
+                return ((self._tick >> (shift + WHEEL_BITS) << (shift + WHEEL_BITS)) | (s << shift)) * self.resolution
+        return None
@@ -0,0 +1,408 @@
+"""
+Servidor multiusuario (asyncio, solo stdlib): las reglas del GameEngine como
+servicio compartido, con API HTTP y WebSocket en localhost.
+
+    python3 FlowmodoroRPG.py serve --port 8765 [--state-dir DIR]
+
+Con --state-dir cada usuario se guarda en `<usuario>.state` (binstate.py; se
+convierte con `FlowmodoroRPG.py state to-json`); un `<usuario>.json` viejo se
+lee una vez y el próximo guardado lo pasa a binario.
+
+Nadie tiene un timer de 1 Hz: el tiempo de cada usuario sale de anclas sobre
+el reloj del loop (`sync()` al consultar) y los únicos despertares son los
+umbrales del motor (auto-registro a los 10/25 min, descanso excedido),
+registrados una vez por tramo en una rueda de tiempo (scheduler.TimingWheel)
+con un solo `call_at` armado para el más próximo.
+
+HTTP (JSON):
+    GET  /health
+    GET  /api/<usuario>/state
+    POST /api/<usuario>/<start|pause|toggle|forget|difficulty|claim_small|claim_big>
+
+WebSocket (/ws o /ws/<usuario>): mensajes de texto JSON
+    {"user": "ana", "cmd": "start"}     -> {"user": ..., "ok": true, "state": {...}}
+    eventos del motor                   -> {"user": ..., "events": [[...], ...]}
+En /ws/<usuario> el campo "user" es opcional y la conexión queda suscripta.
+"""
+
+import os
+import re
+import sys
+import json
+import base64
+import struct
+import asyncio
+import hashlib
+import argparse
+
+from .common import TOKEN_COST_SMALL, TOKEN_COST_BIG
+from .engine import GameEngine, new_state
+from . import binstate
+from .scheduler import TimingWheel
+
+USER_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY = 64 * 1024
+FIRE_SLACK = 1e-3   # disparar apenas después del vencimiento (redondeo de sync)
+WHEEL_RESOLUTION = 0.01   # ranuras chicas: pocas sesiones por ranura del nivel 0
+
+
+# ---------- WebSocket (RFC 6455, lo justo) ----------
+def ws_accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest()).decode()
+
+
+def _mask(payload: bytes, key: bytes) -> bytes:
+    n = len(payload)
+    k = int.from_bytes((key * (n // 4 + 1))[:n], "little")
+    return (int.from_bytes(payload, "little") ^ k).to_bytes(n, "little")
+
+
+def ws_frame(payload: bytes, opcode: int = 1, mask: bool = False) -> bytes:
+    n = len(payload)
+    head = bytes([0x80 | opcode])
+    mbit = 0x80 if mask else 0
+    if n < 126:
+        head += bytes([mbit | n])
+    elif n < 65536:
+        head += bytes([mbit | 126]) + struct.pack("!H", n)
+    else:
+        head += bytes([mbit | 127]) + struct.pack("!Q", n)
+    if mask:
+        key = os.urandom(4)
+        return head + key + _mask(payload, key)
+    return head + payload
+
+
+async def ws_read(reader):
+    """(opcode, payload) del próximo frame; fragmentos no soportados."""
+    b0, b1 = await reader.readexactly(2)
+    opcode = b0 & 0x0F
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if n > MAX_BODY:
+        raise ValueError("frame demasiado grande")
+    key = await reader.readexactly(4) if b1 & 0x80 else None
+    payload = await reader.readexactly(n)
+    return opcode, (_mask(payload, key) if key else payload)
+
+
+# ---------- Usuarios ----------
+class Tenant:
+    __slots__ = ("name", "engine", "subscribers", "timers")
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.subscribers = set()
+        self.timers = {}        # umbral -> Timer registrado en la rueda
+
+    def snapshot(self) -> dict:
+        e = self.engine
+        st = e.state
+        return {
+            "mode": e.mode, "running": e.running, "elapsed": e.elapsed,
+            "level": e.level(), "exp_in_level": e.exp_in_level(), "exp_total": st["exp_total"],
+            "hp": e.hp_restante(), "hp_total": st["hp_total"], "boss": st["boss_name"],
+            "tokens": e.tokens_available(), "balance": e.balance_seconds(),
+            "difficulty": st.get("difficulty", "normal"), "blocks": len(st["history"]),
+        }
+
+
+class Hub:
+    """Usuarios + cola de vencimientos de todo el servidor (un solo loop)."""
+    def __init__(self, loop=None, speed: float = 1.0, state_dir: str = None):
+        self.loop = loop or asyncio.get_event_loop()
+        self.speed = speed
+        self.state_dir = state_dir
+        self._t0 = self.loop.time()
+        self.tenants = {}
+        self.wheel = TimingWheel(WHEEL_RESOLUTION, now=0.0)   # vencimientos en el reloj de los motores
+        self._handle = None
+        self._armed_at = None
+        self.wakeups = 0
+        self.events = 0
+
+    def clock(self) -> float:
+        """Reloj de los motores (acelerado `speed` veces para pruebas de carga)."""
+        return (self.loop.time() - self._t0) * self.speed
+
+    # ---------- Persistencia opcional ----------
+    def _path(self, name, ext=".state"):
+        return os.path.join(self.state_dir, name + ext)
+
+    def _load(self, name):
+        try:
+            if os.path.exists(self._path(name)):
+                with open(self._path(name), "rb") as f:
+                    return binstate.load(f)
+            if os.path.exists(self._path(name, ".json")):
+                with open(self._path(name, ".json"), "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except (OSError, ValueError, struct.error):
+            pass
+        return None
+
+    def tenant(self, name: str) -> Tenant:
+        t = self.tenants.get(name)
+        if t is None:
+            state = self._load(name) if self.state_dir else None
+            t = self.tenants[name] = Tenant(name, GameEngine(state or new_state(), clock=self.clock))
+        return t
+
+    def save(self, t: Tenant):
+        if not self.state_dir:
+            return
+        tmp = self._path(t.name) + ".tmp"
+        with open(tmp, "wb") as f:
+            binstate.dump(t.engine.state, f)
+        os.replace(tmp, self._path(t.name))
+
+    def save_all(self):
+        for t in self.tenants.values():
+            if t.engine.running:
+                t.engine.sync()
+            self.save(t)
+
+    # ---------- Comandos ----------
+    def command(self, name: str, cmd: str) -> dict:
+        t = self.tenant(name)
+        e = t.engine
+        events = self._apply(t, e.sync())
+        if cmd == "start":
+            e.start()
+        elif cmd == "pause":
+            e.pause()
+        elif cmd == "toggle":
+            e.toggle_mode()
+        elif cmd == "forget":
+            e.forget_times()
+        elif cmd == "difficulty":
+            e.cycle_difficulty()
+        elif cmd in ("claim_small", "claim_big"):
+            if not e.claim_tokens(TOKEN_COST_SMALL if cmd == "claim_small" else TOKEN_COST_BIG):
+                return {"ok": False, "error": "tokens insuficientes", "state": t.snapshot()}
+        elif cmd != "state":
+            return {"ok": False, "error": f"comando desconocido: {cmd}"}
+        if cmd != "state":
+            self.schedule(t)
+            self.save(t)
+        out = {"ok": True, "state": t.snapshot()}
+        if events:
+            out["events"] = events
+        return out
+
+    def _apply(self, t: Tenant, events):
+        """Efectos de servidor de los eventos (jefe nuevo al derrotar) y difusión."""
+        if not events:
+            return []
+        for ev in events:
+            if ev[0] == "boss_defeated":
+                t.engine.new_boss_scaled_hp()
+        self.events += len(events)
+        msg = json.dumps({"user": t.name, "events": events}, ensure_ascii=False).encode()
+        frame = ws_frame(msg)
+        for w in list(t.subscribers):
+            if w.is_closing():
+                t.subscribers.discard(w)
+            else:
+                w.write(frame)
+        return events
+
+    # ---------- Vencimientos ----------
+    def schedule(self, t: Tenant):
+        """Registra (de nuevo) los umbrales pendientes del usuario."""
+        for timer in t.timers.values():
+            self.wheel.cancel(timer)
+        t.timers = {name: self.wheel.schedule(due, (t, name)) for name, due in t.engine.deadlines().items()}
+        self._arm()
+
+    def _arm(self):
+        due = self.wheel.next_deadline()
+        if due is None:
+            return
+        if self._handle is not None and self._armed_at <= due:
+            return
+        if self._handle is not None:
+            self._handle.cancel()
+        when = self._t0 + due / self.speed + FIRE_SLACK
+        self._handle = self.loop.call_at(when, self._fire)
+        self._armed_at = due
+
+    def _fire(self):
+        self._handle = None
+        self._armed_at = None
+        self.wakeups += 1
+        for timer in self.wheel.advance(self.clock()):
+            t, name = timer.payload
+            t.timers.pop(name, None)
+            events = self._apply(t, t.engine.sync())
+            due = t.engine.deadlines().get(name)
+            if due is not None:
+                # Todavía no se cruzó (el ratio dinámico corrió el aviso)
+                t.timers[name] = self.wheel.schedule(due, (t, name))
+            if events:
+                self.save(t)
+        self._arm()
+
+    def stats(self) -> dict:
+        return {"sessions": len(self.tenants),
+                "running": sum(1 for t in self.tenants.values() if t.engine.running),
+                "pending": len(self.wheel), "wakeups": self.wakeups, "events": self.events}
+
+
+# ---------- HTTP ----------
+COMMANDS = ("start", "pause", "toggle", "forget", "difficulty", "claim_small", "claim_big")
+
+
+def _http_response(status: str, body: dict, keep_alive=True) -> bytes:
+    data = json.dumps(body, ensure_ascii=False).encode()
+    head = (f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + data
+
+
+class Server:
+    def __init__(self, hub: Hub):
+        self.hub = hub
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, _ = lines[0].split(" ", 2)
+                except ValueError:
+                    writer.write(_http_response("400 Bad Request", {"error": "pedido inválido"}, False))
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    k, sep, v = line.partition(":")
+                    if sep:
+                        headers[k.strip().lower()] = v.strip()
+                n = int(headers.get("content-length", 0) or 0)
+                if n > MAX_BODY:
+                    writer.write(_http_response("413 Payload Too Large", {"error": "cuerpo grande"}, False))
+                    return
+                if n:
+                    await reader.readexactly(n)
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self._websocket(reader, writer, target, headers)
+                    return
+                keep = headers.get("connection", "").lower() != "close"
+                writer.write(_http_response(*self._route(method, target), keep_alive=keep))
+                await writer.drain()
+                if not keep:
+                    return
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def _route(self, method, target):
+        parts = [p for p in target.split("?", 1)[0].split("/") if p]
+        if parts == ["health"]:
+            return "200 OK", self.hub.stats()
+        if len(parts) == 3 and parts[0] == "api" and USER_RE.match(parts[1]):
+            user, cmd = parts[1], parts[2]
+            if cmd == "state" and method == "GET":
+                return "200 OK", self.hub.command(user, "state")
+            if cmd in COMMANDS and method == "POST":
+                res = self.hub.command(user, cmd)
+                return ("200 OK" if res["ok"] else "409 Conflict"), res
+            if cmd in COMMANDS or cmd == "state":
+                return "405 Method Not Allowed", {"error": "método no permitido"}
+        return "404 Not Found", {"error": "ruta desconocida"}
+
+    async def _websocket(self, reader, writer, target, headers):
+        parts = [p for p in target.split("?", 1)[0].split("/") if p]
+        key = headers.get("sec-websocket-key")
+        if not parts or parts[0] != "ws" or len(parts) > 2 or not key or (
+                len(parts) == 2 and not USER_RE.match(parts[1])):
+            writer.write(_http_response("400 Bad Request", {"error": "websocket inválido"}, False))
+            return
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {ws_accept_key(key)}\r\n\r\n").encode())
+        default = parts[1] if len(parts) == 2 else None
+        subscribed = set()
+        if default:
+            self.hub.tenant(default).subscribers.add(writer); subscribed.add(default)
+        try:
+            while True:
+                opcode, payload = await ws_read(reader)
+                if opcode == 8:
+                    writer.write(ws_frame(b"", opcode=8))
+                    return
+                if opcode == 9:
+                    writer.write(ws_frame(payload, opcode=10))
+                    continue
+                if opcode != 1:
+                    continue
+                try:
+                    msg = json.loads(payload)
+                    user = msg.get("user", default)
+                    cmd = msg.get("cmd", "state")
+                except (ValueError, AttributeError):
+                    user = cmd = None
+                if not user or not USER_RE.match(str(user)):
+                    res = {"ok": False, "error": "usuario inválido"}
+                else:
+                    if user not in subscribed:
+                        self.hub.tenant(user).subscribers.add(writer); subscribed.add(user)
+                    res = self.hub.command(user, cmd)
+                    res["user"] = user
+                writer.write(ws_frame(json.dumps(res, ensure_ascii=False).encode()))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            return
+        finally:
+            for user in subscribed:
+                t = self.hub.tenants.get(user)
+                if t is not None:
+                    t.subscribers.discard(writer)
+
+
+async def start_server(host="127.0.0.1", port=8765, speed=1.0, state_dir=None):
+    hub = Hub(asyncio.get_running_loop(), speed=speed, state_dir=state_dir)
+    srv = Server(hub)
+    server = await asyncio.start_server(srv.handle, host, port, backlog=4096)
+    return hub, srv, server
+
+
+async def _serve(args):
+    hub, _, server = await start_server(args.host, args.port, args.speed, args.state_dir)
+    addr = server.sockets[0].getsockname()
+    print(f"Flowmodoro RPG: sirviendo en http://{addr[0]}:{addr[1]}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        hub.save_all()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="FlowmodoroRPG.py serve", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--state-dir", help="guardar el estado de cada usuario (binario, ver binstate.py) en este directorio")
+    ap.add_argument("--speed", type=float, default=1.0, help="acelerar el reloj (pruebas)")
+    args = ap.parse_args(argv)
+    if args.state_dir:
+        os.makedirs(args.state_dir, exist_ok=True)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""
+Registro de intervalos con hora de inicio y fin (sin Qt).
+
+Cada tramo corrido del cronómetro (de `start()` a `pause()` o al cambio de
+modo) queda como una fila fija (inicio, fin, tipo) en un archivo binario de
+solo-agregado que se lee con mmap. Al lado vive un índice por día con cubetas
+por hora (segundos y cantidad de enfoque/descanso): un día son 99 int32.
+
+Las consultas por rango ("minutos de enfoque esta semana", "descansos después
+de las 14 este mes") suman cubetas de los días del rango: el costo depende del
+rango, no del total guardado. `intervals()` recorre solo las filas de esos días.
+Las cubetas tienen precisión de una hora local.
+
+Con un StateWriter (writer.py), como el historial: `record()` solo toca la
+memoria y `flush()` pasa al hilo escritor las filas nuevas y después los
+registros del índice que cambiaron.
+"""
+
+import os
+import sys
+import time
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+
+MAGIC_ROWS = b"FRS1"
+MAGIC_IDX = b"FRI1"
+FILE_HEADER = struct.Struct("<4sI")    # magic, tamaño de registro
+ROW = struct.Struct("<qqi")            # inicio, fin (epoch s), tipo
+KIND_FOCUS = 0
+KIND_BREAK = 1
+KINDS = ("focus", "break")
+
+# Registro del índice (int32): día, primera fila, #filas y 4 × 24 cubetas
+F_DAY, F_FIRST, F_ROWS = 0, 1, 2
+B_FOCUS_SEC, B_BREAK_SEC, B_FOCUS_N, B_BREAK_N = 3, 27, 51, 75
+REC_INTS = 99
+REC_SIZE = REC_INTS * 4
+_NATIVE_LE = sys.byteorder == "little"
+
+
+def day_of(t: float) -> int:
+    """Número de día local (días desde el epoch en la zona horaria local)."""
+    return (int(t) + time.localtime(t).tm_gmtoff) // 86400
+
+
+def day_start(t: float) -> float:
+    lt = time.localtime(t)
+    return time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+def week_start(t: float) -> float:
+    """Lunes 00:00 local de la semana de `t`."""
+    return day_start(day_start(t) - time.localtime(t).tm_wday * 86400 + 43200)
+
+
+def month_start(t: float) -> float:
+    lt = time.localtime(t)
+    return time.mktime((lt.tm_year, lt.tm_mon, 1, 0, 0, 0, 0, 0, -1))
+
+
+class SessionLog:
+    REMAP_EVERY = 512
+
+    def __init__(self, path: str = None, writer=None):
+        self.path = path
+        self.idx_path = None if path is None else path + ".idx"
+        self.writer = None        # StateWriter opcional: E/S en su hilo, al llamar flush()
+        self._f = self._fi = None
+        self._mm = None
+        self._mapped = 0
+        self._start, self._end, self._kind = array("q"), array("q"), array("b")  # filas fuera del mapeo
+        self._idx = array("i")     # registros del índice, uno tras otro
+        self._days = array("i")    # columna de días (para bisect)
+        self.count = 0
+        self._synced = 0          # con writer: filas [0, _synced) ya pasadas al escritor
+        self._dirty = set()       # con writer: registros del índice sin pasar
+        self._cut = False         # con writer: vaciado (clear) sin pasar
+        if path is not None:
+            self._open()          # abrir y reparar, directo
+            self._synced = self.count
+            self.writer = writer
+
+    # ---------- Archivos ----------
+    def _open(self):
+        self._f = self._open_file(self.path, MAGIC_ROWS, ROW.size)
+        size = self._f.seek(0, os.SEEK_END)
+        self.count = (size - FILE_HEADER.size) // ROW.size
+        self._f.truncate(FILE_HEADER.size + self.count * ROW.size)
+        self._map()
+
+        self._fi = self._open_file(self.idx_path, MAGIC_IDX, REC_SIZE)
+        self._fi.seek(FILE_HEADER.size)
+        raw = self._fi.read()
+        n = len(raw) // REC_SIZE
+        self._idx.frombytes(raw[:n * REC_SIZE])
+        if not _NATIVE_LE:
+            self._idx.byteswap()
+        self._fi.truncate(FILE_HEADER.size + n * REC_SIZE)
+        self._days = array("i", self._idx[F_DAY::REC_INTS])
+
+        if not self._index_ok():
+            # Caída entre la fila y el índice (o índice ajeno): reconstruir. Una
+            # fila que cruza medianoche toca varios días, así que no alcanza con
+            # reaplicar solo las que faltan.
+            self._idx, self._days = array("i"), array("i")
+            self._fi.truncate(FILE_HEADER.size)
+            for i in range(self.count):
+                self._write_recs(self._index_row(i, *self._row(i)))
+
+    @staticmethod
+    def _open_file(path, magic, rec_size):
+        exists = os.path.exists(path)
+        f = open(path, "r+b" if exists else "w+b", buffering=0)
+        if f.read(FILE_HEADER.size) != FILE_HEADER.pack(magic, rec_size):
+            f.truncate(0)
+            f.seek(0)
+            f.write(FILE_HEADER.pack(magic, rec_size))
+        return f
+
+    def _index_ok(self) -> bool:
+        if not self._days:
+            return self.count == 0
+        base = (len(self._days) - 1) * REC_INTS
+        if self._idx[base + F_FIRST] + self._idx[base + F_ROWS] != self.count:
+            return False
+        return self.count == 0 or self._days[-1] >= day_of(self._row(self.count - 1)[1] - 1)
+
+    def _map(self):
+        if self.writer is not None:
+            self.flush()
+            self.writer.flush()   # el mapeo tiene que ver todas las filas
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._start, self._end, self._kind = array("q"), array("q"), array("b")
+        self._mapped = 0
+        if self.count:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped = self.count
+
+    def _write_recs(self, recs):
+        if self._fi is None:
+            return
+        if self.writer is not None:
+            self._dirty.update(recs)
+            return
+        for r in recs:
+            self._fi.seek(FILE_HEADER.size + r * REC_SIZE)
+            self._fi.write(self._rec_bytes(r))
+
+    def _rec_bytes(self, r) -> bytes:
+        chunk = self._idx[r * REC_INTS:(r + 1) * REC_INTS]
+        if not _NATIVE_LE:
+            chunk.byteswap()
+        return chunk.tobytes()
+
+    def flush(self):
+        """Con writer: pasa al hilo escritor lo pendiente (filas, después índice)."""
+        if self.writer is None or self._f is None:
+            return
+        w = self.writer
+        if self._cut:
+            w.patch(self.path, 0, FILE_HEADER.pack(MAGIC_ROWS, ROW.size), size=FILE_HEADER.size)
+            w.patch(self.idx_path, 0, FILE_HEADER.pack(MAGIC_IDX, REC_SIZE), size=FILE_HEADER.size)
+            self._cut = False
+        if self._synced < self.count:
+            t = self._synced - self._mapped
+            raw = b"".join(ROW.pack(self._start[j], self._end[j], self._kind[j]) for j in range(t, len(self._kind)))
+            w.patch(self.path, FILE_HEADER.size + self._synced * ROW.size, raw)
+            self._synced = self.count
+        for r in sorted(self._dirty):
+            w.patch(self.idx_path, FILE_HEADER.size + r * REC_SIZE, self._rec_bytes(r))
+        self._dirty.clear()
+
+    def close(self):
+        """Cierra los archivos; con writer, lo pendiente sale antes con flush()."""
+        for f in (self._f, self._fi):
+            if f is not None:
+                f.close()
+        self._f = self._fi = None
+
+    def clear(self):
+        """Vacía el registro y su índice (mismos archivos, solo el encabezado)."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self.writer is not None:
+            self._cut, self._synced, self._dirty = True, 0, set()
+        else:
+            for f in (self._f, self._fi):
+                if f is not None:
+                    f.truncate(FILE_HEADER.size)
+        self._start, self._end, self._kind = array("q"), array("q"), array("b")
+        self._idx, self._days = array("i"), array("i")
+        self._mapped = 0
+        self.count = 0
+
+    def replace_with(self, src: str, since: int):
+        """Pasa a usar el registro de `src` (y su índice), armado con las primeras
+        `since` filas de este; las filas agregadas después se vuelven a agregar."""
+        late = [self._row(i) for i in range(since, self.count)]
+        writer = self.writer
+        if writer is not None:
+            writer.flush()   # lo ya encolado va a los archivos viejos; lo demás se vuelve a agregar
+        self.close()
+        if self._mm is not None:
+            self._mm.close()
+        os.replace(src, self.path)
+        os.replace(src + ".idx", self.idx_path)
+        self.__init__(self.path, writer)
+        for start, end, kind in late:
+            self.record(kind, start, end)
+
+    # ---------- Escritura ----------
+    def record(self, kind: int, start: float, end: float):
+        """Agrega un intervalo [start, end) de tipo KIND_FOCUS / KIND_BREAK."""
+        start, end = int(start), int(end)
+        if end <= start:
+            return
+        i = self.count
+        self._start.append(start); self._end.append(end); self._kind.append(kind)
+        self.count += 1
+        if self._f is not None:
+            if self.writer is None:
+                self._f.seek(FILE_HEADER.size + i * ROW.size)
+                self._f.write(ROW.pack(start, end, kind))
+            if len(self._kind) >= self.REMAP_EVERY:
+                self._map()
+        self._write_recs(self._index_row(i, start, end, kind))
+
+    def _rec_for(self, day: int, first_row: int) -> int:
+        days = self._days
+        if days and days[-1] >= day:
+            # Mismo día (o reloj hacia atrás): usar el registro existente más cercano
+            return max(0, bisect_right(days, day) - 1)
+        self._idx.extend([day, first_row, 0] + [0] * (REC_INTS - 3))
+        days.append(day)
+        return len(days) - 1
+
+    def _index_row(self, i, start, end, kind):
+        """Suma la fila `i` a las cubetas; devuelve los registros tocados."""
+        idx = self._idx
+        lt = time.localtime(start)
+        r = self._rec_for((start + lt.tm_gmtoff) // 86400, i)
+        idx[r * REC_INTS + (B_FOCUS_N if kind == KIND_FOCUS else B_BREAK_N) + lt.tm_hour] += 1
+        # La fila cuenta en el último día: las filas de cada día quedan contiguas
+        last = len(self._days) - 1
+        idx[last * REC_INTS + F_ROWS] += 1
+        touched = {r, last}
+        sec_field = B_FOCUS_SEC if kind == KIND_FOCUS else B_BREAK_SEC
+        t = start
+        while t < end:
+            # Repartir los segundos entre las horas (y días) que cruza el intervalo
+            nxt = min(end, t - lt.tm_min * 60 - lt.tm_sec + 3600)
+            r = self._rec_for((t + lt.tm_gmtoff) // 86400, i + 1)
+            idx[r * REC_INTS + sec_field + lt.tm_hour] += nxt - t
+            touched.add(r)
+            t = nxt
+            lt = time.localtime(t)
+        return sorted(touched)
+
+    # ---------- Lectura ----------
+    def _row(self, i):
+        if i < self._mapped:
+            return ROW.unpack_from(self._mm, FILE_HEADER.size + i * ROW.size)
+        t = i - self._mapped
+        return self._start[t], self._end[t], self._kind[t]
+
+    def __len__(self):
+        return self.count
+
+    def _recs_in(self, t0: float, t1: float):
+        return bisect_left(self._days, day_of(t0)), bisect_right(self._days, day_of(t1 - 1))
+
+    def query(self, t0: float, t1: float, hours=None) -> dict:
+        """Totales de las cubetas horarias en [t0, t1) (opcional: solo `hours`)."""
+        r0, r1 = self._recs_in(t0, t1)
+        d0, d1 = day_of(t0), day_of(t1 - 1)
+        h0, h1 = time.localtime(t0).tm_hour, time.localtime(t1 - 1).tm_hour
+        allowed = range(24) if hours is None else sorted(set(hours))
+        out = {"focus_sec": 0, "break_sec": 0, "focus_n": 0, "break_n": 0}
+        idx = self._idx
+        for r in range(r0, r1):
+            base = r * REC_INTS
+            day = idx[base + F_DAY]
+            lo = h0 if day == d0 else 0
+            hi = h1 if day == d1 else 23
+            for h in allowed:
+                if lo <= h <= hi:
+                    out["focus_sec"] += idx[base + B_FOCUS_SEC + h]
+                    out["break_sec"] += idx[base + B_BREAK_SEC + h]
+                    out["focus_n"] += idx[base + B_FOCUS_N + h]
+                    out["break_n"] += idx[base + B_BREAK_N + h]
+        return out
+
+    def daily(self, t0: float, t1: float):
+        """(día, seg. de enfoque, seg. de descanso) por cada día de [t0, t1), con
+        ceros en los días sin registro. Cuenta días completos."""
+        r0, r1 = self._recs_in(t0, t1)
+        idx = self._idx
+        have = {}
+        for r in range(r0, r1):
+            base = r * REC_INTS
+            have[idx[base + F_DAY]] = (sum(idx[base + B_FOCUS_SEC:base + B_FOCUS_SEC + 24]),
+                                       sum(idx[base + B_BREAK_SEC:base + B_BREAK_SEC + 24]))
+        return [(d,) + have.get(d, (0, 0)) for d in range(day_of(t0), day_of(t1 - 1) + 1)]
+
+    def _rows_in(self, t0: float, t1: float):
+        """Filas [first, last) de los días del rango."""
+        r0, r1 = self._recs_in(t0, t1)
+        if r0 >= r1:
+            return 0, 0
+        idx = self._idx
+        return idx[r0 * REC_INTS + F_FIRST], idx[(r1 - 1) * REC_INTS + F_FIRST] + idx[(r1 - 1) * REC_INTS + F_ROWS]
+
+    def intervals(self, t0: float, t1: float, kind: int = None):
+        """Filas (inicio, fin, tipo) que empiezan en días del rango y se solapan con él."""
+        first, last = self._rows_in(t0, t1)
+        for i in range(first, last):
+            start, end, k = self._row(i)
+            if end > t0 and start < t1 and (kind is None or k == kind):
+                yield start, end, k
+
+    def reader(self, t0: float, t1: float, chunk_rows: int = 4096):
+        """Función que recorre las filas (inicio, fin, tipo) de los días del rango
+        con su propio archivo, para otro hilo. Solo ve las filas que había al
+        pedir el reader (con writer, espera a que estén en disco); filtrar por
+        solapamiento queda del lado de quien lee."""
+        if self.writer is not None and self._f is not None:
+            self.flush()
+            self.writer.flush()
+        first, last = self._rows_in(t0, t1)
+        if self.path is None or self._f is None:
+            rows = [self._row(i) for i in range(first, last)]
+            return lambda: iter(rows)
+        path = self.path
+
+        def read():
+            with open(path, "rb") as f:
+                f.seek(FILE_HEADER.size + first * ROW.size)
+                for lo in range(first, last, chunk_rows):
+                    yield from ROW.iter_unpack(f.read(min(chunk_rows, last - lo) * ROW.size))
+        return read
+
+    def span(self):
+        """(inicio de la primera fila, fin de la última), o None si no hay filas."""
+        if not self.count:
+            return None
+        return self._row(0)[0], self._row(self.count - 1)[1]
@@ -0,0 +1,164 @@
+"""
+Simulador acelerado: reproduce meses de sesiones de enfoque/descanso con el
+GameEngine, sin Qt, sin archivos y sin sonido. Sirve para ajustar constantes
+de balance (HP_PER_LEVEL_MIN/MAX, LEVEL_BONUS_DEEP, ...) contra uso realista.
+
+    python3 FlowmodoroRPG.py simulate --days 90 --users 200 --set HP_PER_LEVEL_MAX=14
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+from .engine import GameEngine, DEFAULT_RULES, MODE_FOCUS, new_state
+from .sessions import SessionLog, week_start
+
+# Perfiles de uso: sesiones por día, minutos de enfoque por ciclo, ratio de
+# descanso real (enfoque/descanso) y probabilidad de saltear el día.
+USAGE_PROFILES = {
+    "casual":  {"cycles": (1, 4),  "focus_min": (8, 35),  "ratio": 3.0, "skip_day": 0.30},
+    "regular": {"cycles": (3, 6),  "focus_min": (15, 50), "ratio": 3.0, "skip_day": 0.15},
+    "intenso": {"cycles": (5, 10), "focus_min": (25, 90), "ratio": 4.0, "skip_day": 0.05},
+}
+FORGET_POLICIES = ("cycle", "day", "never")
+DAY = 24 * 3600
+
+
+class SimClock:
+    """Reloj manual: `clock()` devuelve el tiempo simulado en segundos."""
+    def __init__(self, t: float = 0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, seconds: float):
+        self.t += seconds
+
+
+def _run_interval(eng, clock, seconds, step, result):
+    """Deja correr el cronómetro `seconds` segundos simulados."""
+    eng.start()
+    left = seconds
+    while left > 0:
+        if step > 0:
+            dt = min(step, left)
+        else:
+            # Saltar directo al próximo umbral: los eventos se atienden en orden
+            due = eng.seconds_until_auto()
+            dt = left if due is None else min(due, left)
+        clock.sleep(dt)
+        left -= dt
+        for ev in eng.sync():
+            if ev[0] == "boss_defeated":
+                result["bosses"] += 1
+                eng.new_boss_scaled_hp()
+            elif ev[0] == "block":
+                result["blocks_" + ev[1]] += 1
+            elif ev[0] == "upgrade":
+                result["upgrades"] += 1
+            elif ev[0] == "break_overrun":
+                result["break_overruns"] += 1
+    result["ticks"] += seconds
+
+
+def simulate_user(days: int, profile: dict, rules=None, seed=0, step=0, forget="cycle") -> dict:
+    rng = random.Random(seed)
+    clock = SimClock()
+    log = SessionLog()  # en memoria: consultas por rango como en la app
+    eng = GameEngine(new_state(rng), clock=clock, rng=rng, rules=rules, wall=clock, sessions=log)
+    result = {"ticks": 0, "bosses": 0, "blocks_deep": 0, "blocks_mini": 0, "upgrades": 0, "break_overruns": 0,
+              "level_by_day": []}
+    for day in range(days):
+        clock.t = day * DAY + 9 * 3600
+        if rng.random() >= profile["skip_day"]:
+            for _ in range(rng.randint(*profile["cycles"])):
+                focus = int(rng.uniform(*profile["focus_min"]) * 60)
+                if eng.mode != MODE_FOCUS:
+                    eng.toggle_mode()
+                _run_interval(eng, clock, focus, step, result)
+                eng.toggle_mode()  # -> Descanso
+                pause = int(focus / profile["ratio"] * rng.uniform(0.6, 1.4))
+                _run_interval(eng, clock, pause, step, result)
+                eng.pause()
+                if forget == "cycle":
+                    eng.forget_times()
+            if forget == "day":
+                eng.forget_times()
+        result["level_by_day"].append(eng.level())
+    result["level"] = eng.level()
+    result["exp_total"] = eng.state["exp_total"]
+    result["focus_min_last_week"] = log.query(week_start(clock.t) - 7 * DAY, week_start(clock.t))["focus_sec"] // 60
+    return result
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(runs, days, wall) -> dict:
+    ticks = sum(r["ticks"] for r in runs)
+    levels = [r["level"] for r in runs]
+    bosses = [r["bosses"] for r in runs]
+    out = {
+        "users": len(runs),
+        "days": days,
+        "simulated_ticks": ticks,
+        "wall_sec": round(wall, 3),
+        "ticks_per_sec": int(ticks / wall) if wall > 0 else None,
+        "level": {"median": statistics.median(levels), "p10": _pct(levels, 0.1), "p90": _pct(levels, 0.9)},
+        "bosses": {"median": statistics.median(bosses), "p10": _pct(bosses, 0.1), "p90": _pct(bosses, 0.9)},
+        "blocks_per_boss": round(
+            sum(r["blocks_deep"] + r["blocks_mini"] for r in runs) / max(1, sum(bosses)), 2),
+        "break_overruns_per_user": round(sum(r["break_overruns"] for r in runs) / max(1, len(runs)), 1),
+        "median_level_at_day": {},
+        "median_focus_min_last_week": statistics.median(r["focus_min_last_week"] for r in runs),
+    }
+    for d in (7, 30, 90, 180, 365):
+        if d <= days:
+            out["median_level_at_day"][d] = statistics.median(r["level_by_day"][d - 1] for r in runs)
+    return out
+
+
+def parse_rules(pairs):
+    rules = {}
+    for pair in pairs or ():
+        key, sep, val = pair.partition("=")
+        if not sep or key not in DEFAULT_RULES:
+            raise SystemExit(f"--set inválido: {pair!r} (claves: {', '.join(DEFAULT_RULES)})")
+        rules[key] = int(val)
+    return rules
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="FlowmodoroRPG.py simulate", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--users", type=int, default=1, help="usuarios independientes (semillas distintas)")
+    ap.add_argument("--profile", choices=sorted(USAGE_PROFILES), default="regular")
+    ap.add_argument("--forget", choices=FORGET_POLICIES, default="cycle",
+                    help="cuándo se pulsa 'Olvidar' (reinicia sesión y auto-registro)")
+    ap.add_argument("--step", type=int, default=0,
+                    help="segundos por paso del reloj (0 = cada intervalo de una vez, 1 = como el QTimer)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--set", action="append", metavar="CLAVE=VALOR", help="sobreescribe una constante de balance")
+    args = ap.parse_args(argv)
+
+    rules = parse_rules(args.set)
+    profile = USAGE_PROFILES[args.profile]
+    t0 = time.perf_counter()
+    runs = [simulate_user(args.days, profile, rules, seed=args.seed + i, step=args.step, forget=args.forget)
+            for i in range(args.users)]
+    summary = summarize(runs, args.days, time.perf_counter() - t0)
+    summary["profile"] = args.profile
+    summary["rules"] = rules
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
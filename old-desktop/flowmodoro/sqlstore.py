@@ -0,0 +1,381 @@
+"""
+Backend SQLite (WAL) para el estado: tablas separadas para los escalares, el
+historial de bloques y las crónicas.
+
+Misma interfaz que StateJournal (load / commit / close). Cada commit() escribe
+solo lo que cambió desde el anterior dentro de una transacción abierta. Si solo
+cambiaron contadores del cronómetro (TICK_KEYS) la transacción queda abierta y
+se confirma a los BATCH_SEC segundos: los ticks se agrupan en transacciones
+chicas. Cualquier otro cambio (bloque, dificultad, fichas, reset...) se
+confirma en el acto. Como nada garantiza otro commit() (con el cronómetro en
+pausa no hay ticks), `on_begin` avisa al abrir cada transacción para que el
+dueño arme un timer de `batch_sec` que llame a flush().
+
+Con un StateWriter (writer.py) las sentencias de cada transacción se juntan
+en memoria y flush() la manda entera al hilo escritor, que la confirma con su
+propia conexión (synchronous=FULL: fsync al confirmar), en orden con el resto
+de la cola. La conexión de este hilo queda para leer: antes de leer lo que
+puede no estar confirmado, sync() espera al escritor (los bloques recién
+escritos se leen de memoria, sin esperar). Sin writer (línea de comandos)
+todo corre en el hilo que llama. El historial no se carga en memoria, se lee
+y escribe por fila y los totales viajan en la tabla de estado.
+
+La primera vez, si la base está vacía, `import_state()` migra el JSON viejo.
+`prune()` borra bloques y crónicas viejos sin tocar el resto:
+
+    python3 FlowmodoroRPG.py state prune --keep-blocks 10000 --keep-story 500
+"""
+
+import copy
+import json
+import time
+import sqlite3
+from array import array
+from itertools import chain
+
+from .history import HistoryStore, KINDS, ROW, _NATIVE_LE
+
+BATCH_SEC = 5.0
+TICK_KEYS = frozenset(("session_focus_sec", "total_focus_sec", "session_break_sec", "total_break_sec"))
+TOTALS_KEY = "_history_totals"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state   (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS history (idx INTEGER PRIMARY KEY, tipo TEXT NOT NULL,
+                                    exp INTEGER NOT NULL, dano INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS story   (idx INTEGER PRIMARY KEY, line TEXT NOT NULL);
+"""
+
+_MISSING = object()
+
+
+def _pack_rows(db, lo: int, hi: int) -> bytes:
+    """Filas del historial con índice en [lo, hi) como ROW empaquetadas (formato de HistoryStore)."""
+    cur = db.execute("SELECT CASE tipo WHEN ? THEN 0 ELSE 1 END, exp, dano FROM history "
+                     "WHERE idx >= ? AND idx < ? ORDER BY idx", (KINDS[0], lo, hi))
+    return array("i", chain.from_iterable(cur)).tobytes() if _NATIVE_LE else b"".join(ROW.pack(*r) for r in cur)
+
+
+class SqlHistory(HistoryStore):
+    """HistoryStore sobre la tabla `history` (índices lógicos estables aunque se pode)."""
+    def __init__(self, store: "SqliteStore"):
+        super().__init__(None)
+        self.path = store.path
+        self._store = store
+        self._db = store.db       # para leer; se escribe con store.execute()
+        self._recent = store.recent
+        t = store.get_meta(TOTALS_KEY)
+        if isinstance(t, dict):
+            self.count = t.get("blocks", 0)
+            self.exp_sum = t.get("exp", 0)
+            self.dano_sum = t.get("dano", 0)
+            self.by_kind = [t.get("deep", 0), t.get("mini", 0)]
+
+    def _save_totals(self):
+        self._store.set_meta(TOTALS_KEY, self.totals())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.count)
+            return [e for j, e in self.rows(start, stop) if (j - start) % step == 0]
+        i = self._index(i)
+        if i in self._recent:
+            return dict(self._recent[i])
+        self._store.sync()
+        row = self._db.execute("SELECT tipo, exp, dano FROM history WHERE idx = ?", (i,)).fetchone()
+        if row is None:
+            raise IndexError("bloque podado")
+        return {"exp": row[1], "dano": row[2], "tipo": row[0]}
+
+    def __iter__(self):
+        for _, e in self.rows(0, self.count):
+            yield e
+
+    def rows(self, start: int, stop: int):
+        """(índice, entrada) de [start, stop) que sigan en la base."""
+        self._store.sync()
+        cur = self._db.execute(
+            "SELECT idx, tipo, exp, dano FROM history WHERE idx >= ? AND idx < ? ORDER BY idx", (start, stop))
+        for idx, tipo, exp, dano in cur:
+            yield idx, {"exp": exp, "dano": dano, "tipo": tipo}
+
+    def rows_bytes(self) -> bytes:
+        self._store.sync()
+        return _pack_rows(self._db, 0, self.count)
+
+    def reader(self):
+        """Como HistoryStore.reader(), con su propia conexión de solo lectura.
+        Confirma antes lo pendiente. Los bloques podados faltan (siempre los
+        más viejos del rango)."""
+        self._store.sync()
+        path = self.path
+        count = self.count
+
+        def read(lo=0, hi=None) -> bytes:
+            db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                return _pack_rows(db, lo, count if hi is None else min(hi, count))
+            finally:
+                db.close()
+        return read
+
+    def add(self, tipo: str, exp: int, dano: int) -> int:
+        k = KINDS.index(tipo)
+        i = self.count
+        self._store.execute("INSERT INTO history (idx, tipo, exp, dano) VALUES (?, ?, ?, ?)", (i, tipo, exp, dano))
+        if self._store.writer is not None:
+            self._recent[i] = {"exp": exp, "dano": dano, "tipo": tipo}
+        self.count += 1
+        self.exp_sum += exp; self.dano_sum += dano; self.by_kind[k] += 1
+        self._save_totals()
+        return i
+
+    def extend(self, entries):
+        rows = []
+        for entry in entries:
+            tipo = entry.get("tipo"); exp = entry.get("exp"); dano = entry.get("dano")
+            if tipo not in KINDS or not isinstance(exp, int) or not isinstance(dano, int):
+                continue
+            rows.append((self.count, tipo, exp, dano))
+            self.count += 1
+            self.exp_sum += exp; self.dano_sum += dano; self.by_kind[KINDS.index(tipo)] += 1
+        self._store.execute("INSERT INTO history (idx, tipo, exp, dano) VALUES (?, ?, ?, ?)", rows, many=True)
+        self._save_totals()
+
+    def extend_rows(self, raw: bytes):
+        """Filas ROW ya validadas (importador): sin pasar por dicts."""
+        base = self.count
+        rows = [(base + i, KINDS[k], e, d) for i, (k, e, d) in enumerate(ROW.iter_unpack(raw))]
+        if not rows:
+            return
+        self.count += len(rows)
+        for k, e, d in ROW.iter_unpack(raw):
+            self.exp_sum += e; self.dano_sum += d; self.by_kind[k] += 1
+        self._store.execute("INSERT INTO history (idx, tipo, exp, dano) VALUES (?, ?, ?, ?)", rows, many=True)
+        self._save_totals()
+
+    def __setitem__(self, i, entry: dict):
+        old = self[i]
+        i = self._index(i)
+        self.exp_sum += entry["exp"] - old["exp"]; self.dano_sum += entry["dano"] - old["dano"]
+        self.by_kind[KINDS.index(old["tipo"])] -= 1; self.by_kind[KINDS.index(entry["tipo"])] += 1
+        self._store.execute("UPDATE history SET tipo = ?, exp = ?, dano = ? WHERE idx = ?",
+                            (entry["tipo"], entry["exp"], entry["dano"], i))
+        if i in self._recent:
+            self._recent[i] = {"exp": entry["exp"], "dano": entry["dano"], "tipo": entry["tipo"]}
+        self._save_totals()
+
+    def clear(self):
+        self._store.execute("DELETE FROM history")
+        self._recent.clear()
+        self.count = self.exp_sum = self.dano_sum = 0
+        self.by_kind = [0, 0]
+        self._save_totals()
+
+    def prune(self, keep_last: int) -> int:
+        """Borra los bloques viejos; índices y totales no cambian. Devuelve filas borradas."""
+        cut = self.count - max(0, keep_last)
+        self._store.sync()
+        n = self._db.execute("SELECT COUNT(*) FROM history WHERE idx < ?", (cut,)).fetchone()[0]
+        self._store.execute("DELETE FROM history WHERE idx < ?", (cut,))
+        for i in [i for i in self._recent if i < cut]:
+            del self._recent[i]
+        return n
+
+    def flush(self):
+        self._store.flush()
+
+    def close(self):
+        pass  # la conexión es del SqliteStore
+
+
+class SqliteStore:
+    def __init__(self, path: str, batch_sec: float = BATCH_SEC, writer=None):
+        self.path = path
+        self.batch_sec = batch_sec
+        self.writer = writer      # StateWriter opcional: las transacciones se confirman en su hilo
+        self.db = sqlite3.connect(path, isolation_level=None)  # transacciones manuales
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._txn_at = None
+        self.on_begin = None      # on_begin(): se abrió una transacción (flush() en batch_sec)
+        self._shadow = None       # escalares del último commit
+        self._story_len = 0
+        self._ops = []            # con writer: sentencias de la transacción abierta
+        self._queued = False      # con writer: hay transacciones sin confirmar en su hilo
+        self._wdb = None          # con writer: conexión del hilo escritor
+        self.recent = {}          # con writer: bloques escritos desde el último sync() (SqlHistory)
+
+    # ---------- Transacciones ----------
+    def begin(self):
+        if self._txn_at is None:
+            if self.writer is None:
+                self.db.execute("BEGIN")
+            self._txn_at = time.monotonic()
+            if self.on_begin is not None:
+                self.on_begin()
+
+    def execute(self, sql: str, args=(), many: bool = False):
+        """Una escritura dentro de la transacción abierta (la abre si hace falta)."""
+        self.begin()
+        if self.writer is not None:
+            self._ops.append((sql, args, many))
+        elif many:
+            self.db.executemany(sql, args)
+        else:
+            self.db.execute(sql, args)
+
+    def flush(self):
+        if self._txn_at is None:
+            return
+        self._txn_at = None
+        if self.writer is None:
+            self.db.execute("COMMIT")
+            return
+        ops, self._ops = self._ops, []
+        self.writer.call(self.path, lambda: self._apply(ops))
+        self._queued = True
+
+    def sync(self):
+        """Con writer: flush() y esperar a que lo confirme (para leer con self.db).
+        Sin writer la misma conexión ya ve lo no confirmado."""
+        if self.writer is None:
+            return
+        self.flush()
+        if self._queued:
+            self.writer.flush()
+            self._queued = False
+            self.recent.clear()
+
+    def _apply(self, ops):
+        """Hilo escritor: una transacción con las sentencias juntadas."""
+        if self._wdb is None:
+            self._wdb = sqlite3.connect(self.path, isolation_level=None)
+            self._wdb.execute("PRAGMA synchronous=FULL")
+        db = self._wdb
+        db.execute("BEGIN")
+        try:
+            for sql, args, many in ops:
+                if many:
+                    db.executemany(sql, args)
+                else:
+                    db.execute(sql, args)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _close_wdb(self):
+        if self._wdb is not None:
+            self._wdb.close()
+            self._wdb = None
+
+    def get_meta(self, key: str):
+        row = self.db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set_meta(self, key: str, value):
+        self.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                     (key, json.dumps(value, ensure_ascii=False)))
+
+    # ---------- Carga ----------
+    def load(self):
+        """Estado completo (historial como SqlHistory) o None si la base está vacía."""
+        self.sync()
+        rows = self.db.execute("SELECT key, value FROM state WHERE key NOT LIKE '\\_%' ESCAPE '\\'").fetchall()
+        if not rows:
+            return None
+        data = {k: json.loads(v) for k, v in rows}
+        data["story"] = [line for (line,) in self.db.execute("SELECT line FROM story ORDER BY idx")]
+        data["history"] = SqlHistory(self)
+        self._remember(data)
+        return data
+
+    def import_state(self, state) -> SqlHistory:
+        """Migración: copia un estado (JSON viejo + historial) en una sola
+        transacción. Devuelve el historial ya pasado a la tabla."""
+        entries = state.get("history") or ()
+        if isinstance(entries, SqlHistory):
+            entries = list(entries)  # se va a vaciar la misma tabla
+        self.execute("DELETE FROM state")
+        self.execute("DELETE FROM story")
+        hist = SqlHistory(self)
+        hist.clear()
+        hist.extend(entries)
+        for k, v in state.items():
+            if k not in ("history", "story"):
+                self.set_meta(k, v)
+        self.execute("INSERT INTO story (line) VALUES (?)", [(line,) for line in state.get("story") or ()], many=True)
+        self.flush()
+        return hist
+
+    # ---------- Escritura ----------
+    def _remember(self, state):
+        self._shadow = {k: copy.deepcopy(v) for k, v in state.items() if k not in ("history", "story")}
+        self._story_len = len(state.get("story", []))
+
+    def commit(self, state):
+        if self._shadow is None:
+            state["history"] = self.import_state(state)
+            self._remember(state)
+            return
+        hist = state.get("history")
+        if not isinstance(hist, SqlHistory):
+            # Historial reemplazado por una lista (p.ej. estado nuevo): pasa a la tabla
+            sql_hist = SqlHistory(self)
+            sql_hist.clear()
+            sql_hist.extend(hist or ())
+            state["history"] = sql_hist
+        sh = self._shadow
+        urgent = False   # algo más que contadores del cronómetro
+        for k, v in state.items():
+            if k in ("history", "story"):
+                continue
+            if sh.get(k, _MISSING) != v:
+                self.set_meta(k, v)
+                sh[k] = copy.deepcopy(v)
+                urgent = urgent or k not in TICK_KEYS
+        for k in [k for k in sh if k not in state]:
+            self.execute("DELETE FROM state WHERE key = ?", (k,))
+            del sh[k]
+            urgent = True
+        story = state.get("story", [])
+        if len(story) < self._story_len:
+            self.execute("DELETE FROM story")
+            self._story_len = 0
+            urgent = True
+        if len(story) > self._story_len:
+            self.execute("INSERT INTO story (line) VALUES (?)",
+                         [(line,) for line in story[self._story_len:]], many=True)
+            self._story_len = len(story)
+            urgent = True
+        if self._txn_at is not None and (urgent or time.monotonic() - self._txn_at >= self.batch_sec):
+            self.flush()
+
+    def prune(self, state, keep_blocks: int = None, keep_story: int = None) -> tuple:
+        """Poda bloques y crónicas viejos sin reescribir nada más; la lista de
+        crónicas en memoria se recorta igual. Devuelve (bloques, crónicas) borrados."""
+        blocks = lines = 0
+        hist = state.get("history")
+        if keep_blocks is not None and isinstance(hist, SqlHistory):
+            blocks = hist.prune(keep_blocks)
+        story = state.get("story")
+        if keep_story is not None and isinstance(story, list) and len(story) > keep_story:
+            self.execute("DELETE FROM story WHERE idx NOT IN "
+                         "(SELECT idx FROM story ORDER BY idx DESC LIMIT ?)", (keep_story,))
+            lines = len(story) - keep_story
+            del story[:lines]
+            self._story_len = len(story)
+        self.flush()
+        return blocks, lines
+
+    def close(self, state=None):
+        """Con writer, la conexión del hilo escritor se cierra en su turno; el
+        dueño cierra el writer después."""
+        if state is not None:
+            self.commit(state)
+        self.flush()
+        if self.writer is not None:
+            self.writer.call(self.path, self._close_wdb)
+        self.db.close()
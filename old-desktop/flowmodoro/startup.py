@@ -0,0 +1,60 @@
+"""Perfil de arranque (--startup-profile): tiempo por fase y memoria al primer paint."""
+
+import sys
+import json
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class StartupProfile:
+    def __init__(self, t0: float = None, enabled: bool = True):
+        self.enabled = enabled
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._last = self.t0
+        self.phases = []  # [(nombre, segundos)]
+
+    def mark(self, name: str):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self) -> float:
+        return self._last - self.t0
+
+    def max_rss_mb(self):
+        if resource is None:
+            return None
+        # ru_maxrss: KiB en Linux, bytes en macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+    def as_dict(self) -> dict:
+        return {
+            "phases": {name: round(sec * 1000, 2) for name, sec in self.phases},
+            "total_ms": round(self.total() * 1000, 2),
+            "max_rss_mb": self.max_rss_mb(),
+            "modules": len(sys.modules),
+        }
+
+    def report(self, stream=None, fmt: str = "text"):
+        if not self.enabled:
+            return
+        stream = stream or sys.stderr
+        if fmt == "json":
+            print(json.dumps(self.as_dict()), file=stream)
+            stream.flush()
+            return
+        print("[startup] fase                       ms", file=stream)
+        for name, sec in self.phases:
+            print(f"[startup] {name:<24} {sec*1000:8.1f}", file=stream)
+        print(f"[startup] {'total':<24} {self.total()*1000:8.1f}", file=stream)
+        rss = self.max_rss_mb()
+        if rss is not None:
+            print(f"[startup] RSS máx: {rss:.1f} MB, módulos cargados: {len(sys.modules)}", file=stream)
+        stream.flush()
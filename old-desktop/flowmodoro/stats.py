@@ -0,0 +1,136 @@
+"""
+Estadísticas de sesiones en streaming (sin Qt).
+
+Cada intervalo de enfoque o descanso que termina actualiza contadores fijos
+(sumas, rachas, 24 cubetas por hora) en O(1); nada recorre el historial. El
+ratio dinámico (dynamic_ratio_algorithm.md) se calcula con esos acumulados,
+así que `balance_seconds()` lo puede leer en cada tick sin costo. El factor
+de la hora del día sale del promedio de enfoque de esa hora frente al general
+cuando hay datos; si no, de los rangos fijos del documento.
+
+Los acumulados viven en `state["stats"]`, un dict chico de tamaño fijo.
+"""
+
+RATIO_BASE = 3.0
+RATIO_MIN, RATIO_MAX = 1.5, 5.0
+HOUR_MIN_N = 5          # intervalos en una hora para usar su promedio propio
+HOUR_SLUMP, HOUR_PEAK = 0.75, 1.25   # promedio de la hora / promedio general
+
+
+def new_stats() -> dict:
+    return {
+        "focus_n": 0, "focus_sum": 0,      # intervalos de enfoque terminados
+        "break_n": 0, "break_sum": 0,
+        "streak": 0, "best_streak": 0,     # intervalos seguidos que llegaron a un bloque
+        "hour_n": [0] * 24, "hour_focus": [0] * 24,
+    }
+
+
+def _valid(data) -> bool:
+    if not isinstance(data, dict):
+        return False
+    ref = new_stats()
+    for k, v in ref.items():
+        if isinstance(v, list):
+            if not isinstance(data.get(k), list) or len(data[k]) != len(v):
+                return False
+        elif not isinstance(data.get(k), int):
+            return False
+    return True
+
+
+class SessionStats:
+    def __init__(self, data: dict = None):
+        self.data = data if _valid(data) else new_stats()
+
+    @classmethod
+    def attach(cls, state: dict) -> "SessionStats":
+        """Usa (o crea) `state["stats"]`."""
+        st = cls(state.get("stats"))
+        state["stats"] = st.data
+        return st
+
+    # ---------- Actualización ----------
+    def record_focus(self, seconds: int, hour: int, block_sec: int):
+        """Cierra un intervalo de enfoque; `block_sec`: mínimo para sumar a la racha."""
+        if seconds <= 0:
+            return
+        d = self.data
+        d["focus_n"] += 1
+        d["focus_sum"] += seconds
+        d["hour_n"][hour] += 1
+        d["hour_focus"][hour] += seconds
+        if seconds >= block_sec:
+            d["streak"] += 1
+            if d["streak"] > d["best_streak"]:
+                d["best_streak"] = d["streak"]
+        else:
+            d["streak"] = 0
+
+    def record_break(self, seconds: int):
+        if seconds <= 0:
+            return
+        self.data["break_n"] += 1
+        self.data["break_sum"] += seconds
+
+    # ---------- Consultas ----------
+    def mean_focus(self) -> float:
+        d = self.data
+        return d["focus_sum"] / d["focus_n"] if d["focus_n"] else 0.0
+
+    def mean_break(self) -> float:
+        d = self.data
+        return d["break_sum"] / d["break_n"] if d["break_n"] else 0.0
+
+    def mean_focus_at(self, hour: int) -> float:
+        n = self.data["hour_n"][hour]
+        return self.data["hour_focus"][hour] / n if n else 0.0
+
+    def hour_factor(self, hour: int) -> float:
+        if self.data["hour_n"][hour] >= HOUR_MIN_N:
+            rel = self.mean_focus_at(hour) / self.mean_focus()
+            if rel < HOUR_SLUMP:
+                return 0.2     # a esta hora rinde menos: más descanso
+            if rel > HOUR_PEAK:
+                return -0.2
+            return 0.0
+        if 14 <= hour <= 16:
+            return 0.2
+        if 9 <= hour <= 11:
+            return -0.2
+        return 0.0
+
+    def dynamic_ratio(self, total_focus: int, total_break: int, hour: int) -> float:
+        ratio = RATIO_BASE
+        # Factor 1: balance actual
+        balance = total_focus - total_break * RATIO_BASE
+        if balance > 3600:
+            ratio += 0.5
+        elif balance < -1800:
+            ratio -= 0.5
+        # Factor 2: duración promedio de los intervalos de enfoque
+        if self.data["focus_n"]:
+            avg = self.mean_focus()
+            if avg > 1800:
+                ratio += 0.3
+            elif avg < 600:
+                ratio -= 0.3
+        # Factor 3: hora del día. Con datos suficientes, las cubetas del propio
+        # usuario dicen si es su bajón o su pico; si no, los rangos del documento.
+        ratio += self.hour_factor(hour)
+        # Factor 4: racha
+        streak = self.data["streak"]
+        if streak > 3:
+            ratio += 0.1 * min(streak - 3, 2)
+        return max(RATIO_MIN, min(RATIO_MAX, ratio))
+
+    def summary(self) -> dict:
+        d = self.data
+        return {
+            "focus_intervals": d["focus_n"],
+            "break_intervals": d["break_n"],
+            "mean_focus_sec": round(self.mean_focus(), 1),
+            "mean_break_sec": round(self.mean_break(), 1),
+            "streak": d["streak"],
+            "best_streak": d["best_streak"],
+        }
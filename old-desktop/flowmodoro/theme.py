@@ -0,0 +1,233 @@
+"""Temas (claro/oscuro: hoja, paleta y tonos de estado) y detección del tema del escritorio."""
+
+import os
+import json
+import string
+import time
+import shutil
+import subprocess
+
+# ---- Temas ----
+# Cada tema es un juego de colores con nombre; de ahí salen una sola vez la hoja
+# QSS y la paleta (ThemeEngine). El color del texto común va por la paleta
+# (WindowText) y no por la hoja, así que los colores de estado ("tonos": balance
+# positivo, negativo o neutro) se cambian reemplazando la paleta del widget:
+# sin texto QSS nuevo, sin re-parsear ni re-pulir.
+THEME_COLORS = {
+    "light": {
+        "bg": "#f7f8fb", "fg": "#1f2430", "label": "#111827", "muted": "#64748b", "disabled": "#94a3b8",
+        "group_border": "#e2e8f0", "group_title": "#475569",
+        "bar_bg": "#e5e7eb", "bar_border": "#d1d5db", "bar_chunk": "#10b981",
+        "btn_bg": "#ffffff", "btn_fg": "#1f2430", "btn_border": "#cbd5e1", "btn_hover": "#f1f5f9", "btn_pressed": "#e2e8f0",
+        "primary_bg": "#0ea5e9", "primary_fg": "#ffffff", "primary_border": "#0284c7", "primary_hover": "#0284c7",
+        "danger_bg": "#fee2e2", "danger_fg": "#7f1d1d", "danger_border": "#fecaca", "danger_hover": "#fecaca",
+        "hp_bg": "#1e1e1e", "hp_border": "#660000", "hp_chunk": "#b22222", "boss": "#334155",
+        "pos": "#10b981", "neg": "#f59e0b", "neutral": "#64748b",
+    },
+    "dark": {
+        "bg": "#0b1220", "fg": "#e5e7eb", "label": "#e5e7eb", "muted": "#94a3b8", "disabled": "#475569",
+        "group_border": "#1f2a44", "group_title": "#9aa4c2",
+        "bar_bg": "#1e293b", "bar_border": "#293548", "bar_chunk": "#0ea5e9",
+        "btn_bg": "#0f172a", "btn_fg": "#e5e7eb", "btn_border": "#334155", "btn_hover": "#111827", "btn_pressed": "#0b1324",
+        "primary_bg": "#1d4ed8", "primary_fg": "#ffffff", "primary_border": "#1e40af", "primary_hover": "#1e40af",
+        "danger_bg": "#7f1d1d", "danger_fg": "#fee2e2", "danger_border": "#991b1b", "danger_hover": "#991b1b",
+        "hp_bg": "#1e1e1e", "hp_border": "#660000", "hp_chunk": "#b22222", "boss": "#e5e5e5",
+        "pos": "#10b981", "neg": "#f59e0b", "neutral": "#94a3b8",
+    },
+}
+TONES = ("pos", "neg", "neutral")
+
+_QSS = string.Template("""
+* { font-family: 'Inter', 'Segoe UI', 'Noto Sans', 'Ubuntu', sans-serif; font-size: 13pt; }
+QMainWindow, QWidget { background: $bg; }
+QGroupBox { border: 1px solid $group_border; border-radius: 10px; margin-top: 8px; padding: 8px; }
+QGroupBox::title { subcontrol-origin: margin; left: 10px; padding: 0 4px; color: $group_title; font-weight: 600; }
+QLabel#timeLabel { font-size: 35pt; font-weight: 600; letter-spacing: 0.3px; }
+QLabel#subtitle { font-size: 14pt; font-weight: 600; }
+QLabel#muted { color: $muted; font-size: 13pt; }
+QProgressBar { background: $bar_bg; border: 1px solid $bar_border; border-radius: 10px; text-align: center; height: 24px; color: $fg; }
+QProgressBar::chunk { border-radius: 8px; background-color: $bar_chunk; }
+QPushButton { background: $btn_bg; border: 1px solid $btn_border; border-radius: 10px; padding: 10px 14px; font-weight: 600; color: $btn_fg; }
+QPushButton:hover { background: $btn_hover; }
+QPushButton:pressed { background: $btn_pressed; }
+QPushButton:disabled { color: $disabled; }
+QPushButton#primary { background: $primary_bg; color: $primary_fg; border: 1px solid $primary_border; }
+QPushButton#primary:hover { background: $primary_hover; }
+QPushButton#danger { background: $danger_bg; color: $danger_fg; border: 1px solid $danger_border; }
+QPushButton#danger:hover { background: $danger_hover; }
+QProgressBar#bossHp {
+    background: $hp_bg;
+    border: 1px solid $hp_border;
+    border-radius: 10px;
+    text-align: center;
+    height: 24px;
+}
+QProgressBar#bossHp::chunk {
+    border-radius: 8px;
+    background-color: $hp_chunk;
+}
+QLabel#bossName {
+    font-family: 'Times New Roman', 'Georgia', serif;
+    font-style: italic;
+    font-size: 16pt;
+    color: $boss;
+}
+""")
+
+def compile_qss(colors: dict) -> str:
+    return _QSS.substitute(colors)
+
+QSS_LIGHT = compile_qss(THEME_COLORS["light"])
+QSS_DARK = compile_qss(THEME_COLORS["dark"])
+
+# Roles de la paleta de la app (activa/inactiva) y los del grupo deshabilitado
+PALETTE_ROLES = (
+    ("Window", "bg"), ("WindowText", "label"), ("Base", "bg"), ("AlternateBase", "btn_hover"),
+    ("Text", "fg"), ("Button", "btn_bg"), ("ButtonText", "btn_fg"), ("PlaceholderText", "muted"),
+    ("Highlight", "primary_bg"), ("HighlightedText", "primary_fg"),
+    ("ToolTipBase", "btn_bg"), ("ToolTipText", "fg"),
+)
+DISABLED_ROLES = ("WindowText", "Text", "ButtonText")
+
+class ThemeEngine:
+    """Tema de la app en tiempo de ejecución: cada tema se compila una vez (hoja,
+    paleta y una paleta por tono); `apply()` cambia claro/oscuro sin reiniciar y
+    `set_tone()` solo reemplaza la paleta del widget si el tono cambió."""
+    def __init__(self, app, dark: bool):
+        self.app = app
+        self.dark = None
+        self._compiled = {}   # "light"/"dark" -> (qss, paleta, {tono: paleta})
+        self._tone_pals = {}
+        self._tones = {}      # widget -> tono actual
+        self.apply(dark)
+
+    def _compile(self, name: str):
+        from PyQt5.QtGui import QColor, QPalette
+        c = THEME_COLORS[name]
+        pal = QPalette(self.app.style().standardPalette())
+        for group in (QPalette.Active, QPalette.Inactive):
+            for role, key in PALETTE_ROLES:
+                pal.setColor(group, getattr(QPalette, role), QColor(c[key]))
+        for role in DISABLED_ROLES:
+            pal.setColor(QPalette.Disabled, getattr(QPalette, role), QColor(c["disabled"]))
+        tones = {}
+        for tone in TONES:
+            # Solo WindowText: el resto de los roles se hereda de la app
+            p = QPalette()
+            for group in (QPalette.Active, QPalette.Inactive):
+                p.setColor(group, QPalette.WindowText, QColor(c[tone]))
+            tones[tone] = p
+        return compile_qss(c), pal, tones
+
+    def apply(self, dark: bool):
+        dark = bool(dark)
+        if dark == self.dark:
+            return
+        self.dark = dark
+        name = "dark" if dark else "light"
+        if name not in self._compiled:
+            self._compiled[name] = self._compile(name)
+        qss, pal, self._tone_pals = self._compiled[name]
+        self.app.setPalette(pal)
+        self.app.setStyleSheet(qss)
+        # El cambio de hoja re-pule todo: los tonos se vuelven a poner encima
+        for w, tone in self._tones.items():
+            w.setPalette(self._tone_pals[tone])
+
+    def set_tone(self, widget, tone: str):
+        if self._tones.get(widget) == tone:
+            return
+        if widget not in self._tones:
+            widget.destroyed.connect(lambda *_: self._tones.pop(widget, None))
+        self._tones[widget] = tone
+        widget.setPalette(self._tone_pals[tone])
+
+# ---- Detección del tema ----
+# Todas las sondas corren en paralelo; basta con que una diga "dark".
+THEME_PROBES = (
+    ("gsettings", "get", "org.gnome.desktop.interface", "color-scheme"),
+    ("gsettings", "get", "org.gnome.desktop.interface", "gtk-theme"),
+    ("kreadconfig5", "--file", "kdeglobals", "--group", "General", "--key", "ColorScheme"),
+)
+THEME_ENV_KEYS = ("GTK_THEME", "QT_STYLE_OVERRIDE", "QT_QPA_PLATFORMTHEME")
+THEME_SESSION_KEYS = ("XDG_CURRENT_DESKTOP", "DESKTOP_SESSION", "XDG_SESSION_TYPE", "XDG_SESSION_ID") + THEME_ENV_KEYS
+THEME_PROBE_TIMEOUT = 0.4  # segundos, para todas las sondas juntas
+
+def theme_cache_path() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "flowmodoro-rpg", "theme.json")
+
+def theme_session_key() -> str:
+    """Clave de caché: sesión de escritorio + variables que afectan el tema."""
+    return "|".join(f"{k}={os.environ.get(k, '')}" for k in THEME_SESSION_KEYS)
+
+def _env_says_dark() -> bool:
+    return any("dark" in os.environ.get(k, "").lower() for k in THEME_ENV_KEYS)
+
+def _run_probe(cmd, timeout) -> bool:
+    try:
+        out = subprocess.run(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, timeout=timeout
+        ).stdout.strip().lower()
+    except Exception:
+        return False
+    return "dark" in out
+
+def probe_dark_mode(timeout: float = THEME_PROBE_TIMEOUT) -> bool:
+    """Consulta gsettings/kreadconfig5 en paralelo (sin caché)."""
+    if _env_says_dark():
+        return True
+    cmds = [c for c in THEME_PROBES if shutil.which(c[0])]
+    if not cmds:
+        return False
+    # Import diferido: con la caché caliente el arranque no lo necesita
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    pool = ThreadPoolExecutor(max_workers=len(cmds), thread_name_prefix="theme-probe")
+    try:
+        pending = {pool.submit(_run_probe, c, timeout) for c in cmds}
+        deadline = time.monotonic() + timeout
+        while pending:
+            left = deadline - time.monotonic()
+            done, pending = wait(pending, timeout=max(0.0, left), return_when=FIRST_COMPLETED)
+            if not done:
+                break  # se agotó el tiempo: lo que falte cuenta como "claro"
+            if any(f.result() for f in done):
+                return True
+        return False
+    finally:
+        # No esperar a las sondas lentas (subprocess.run las mata al vencer su timeout)
+        pool.shutdown(wait=False)
+
+def load_cached_theme():
+    """Devuelve el tema cacheado para esta sesión, o None."""
+    try:
+        with open(theme_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    if data.get("key") != theme_session_key():
+        return None
+    dark = data.get("dark")
+    return dark if isinstance(dark, bool) else None
+
+def store_cached_theme(dark: bool):
+    path = theme_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": theme_session_key(), "dark": bool(dark)}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def detect_dark_mode_linux(use_cache: bool = True) -> bool:
+    """Tema oscuro del escritorio: caché por sesión o sondas en paralelo."""
+    if use_cache:
+        cached = load_cached_theme()
+        if cached is not None:
+            return cached
+    dark = probe_dark_mode()
+    store_cached_theme(dark)
+    return dark
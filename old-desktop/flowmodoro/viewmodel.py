@@ -0,0 +1,80 @@
+"""
+View model de la ventana principal (sin Qt).
+
+`derive_view()` calcula una sola vez por cuadro todos los valores que muestra
+la GUI; `ViewModel.push()` los compara con el cuadro anterior y llama solo a
+los setters de las propiedades que cambiaron. En un tick típico solo cambia
+el texto del balance, así que se toca un único widget.
+"""
+
+from .common import LEVEL_SIZE, TOKEN_COST_SMALL, TOKEN_COST_BIG, DIFF_LABEL, fmt_hms_signed
+
+_MISSING = object()
+
+
+def balance_tone(seconds: int) -> str:
+    """Tono del balance (el color lo pone el tema, ver theme.ThemeEngine)."""
+    if seconds > 0:
+        return "pos"
+    if seconds < 0:
+        return "neg"
+    return "neutral"
+
+
+def diff_label(engine) -> str:
+    diff = engine.state.get("difficulty", "normal")
+    if diff == "dinamico":
+        return f"{DIFF_LABEL[diff]} 1:{engine.current_ratio():.1f}"
+    return DIFF_LABEL.get(diff, DIFF_LABEL["normal"])
+
+
+def derive_view(engine) -> dict:
+    st = engine.state
+    lvl = engine.level(); exp_n = engine.exp_in_level()
+    hp_total = st["hp_total"]
+    t_avail = engine.tokens_available()
+    bal = engine.balance_seconds()
+    return {
+        "exp_format": f"Nivel {lvl} — {exp_n}/{LEVEL_SIZE}",
+        "hp_max": hp_total,
+        "hp_info": f"Daño total: {st['dano_total']}  |  Total jefe: {hp_total}",
+        "boss": f"🐉 — {st['boss_name']}",
+        "hp_progress": (engine.hp_restante(), max(1, hp_total)),
+        "tokens": f"Gemas: {t_avail}",
+        "token_small_enabled": t_avail >= TOKEN_COST_SMALL,
+        "token_big_enabled": t_avail >= TOKEN_COST_BIG,
+        "balance": f"Balance: {fmt_hms_signed(bal)}",
+        "balance_tone": balance_tone(bal),
+        "diff_label": diff_label(engine),
+    }
+
+
+class ViewModel:
+    def __init__(self):
+        self._bindings = {}   # clave -> [setter]
+        self._last = {}
+        self.pushes = 0       # setters llamados (para perfiles/benchmarks)
+
+    def bind(self, key: str, setter):
+        self._bindings.setdefault(key, []).append(setter)
+
+    def invalidate(self, key: str = None):
+        """Olvida el último valor (de una clave o de todas): el próximo push lo reaplica."""
+        if key is None:
+            self._last.clear()
+        else:
+            self._last.pop(key, None)
+
+    def push(self, values: dict) -> int:
+        """Aplica solo los valores que cambiaron; devuelve cuántas claves cambiaron."""
+        last = self._last
+        changed = 0
+        for key, val in values.items():
+            if last.get(key, _MISSING) == val:
+                continue
+            last[key] = val
+            changed += 1
+            for setter in self._bindings.get(key, ()):
+                setter(val)
+                self.pushes += 1
+        return changed
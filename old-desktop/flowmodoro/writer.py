@@ -0,0 +1,165 @@
+"""
+Escritor de archivos en segundo plano (sin Qt).
+
+El hilo de la GUI arma los bytes (snapshot JSON, registros del journal, filas
+del historial y de intervalos) y los encola; este hilo hace la E/S. Operaciones:
+
+    replace(path, data)              reemplazo atómico: temporal + fsync + rename (+ fsync del dir)
+    append(path, data)               agregar al final + fsync (logs de solo-agregado)
+    patch(path, offset, data, size)  escribir en `offset` (y truncar a `size`) + fsync
+    call(path, fn)                   correr fn() en este hilo (transacciones de SQLite)
+
+La cola se escribe en orden de llegada (el snapshot del journal siempre antes
+que el log que lo sigue; las filas del historial antes que el estado que las
+cuenta). Lo que llega para el mismo archivo que la última operación pendiente
+se junta con ella: un replace la reemplaza, un append se suma a sus bytes y un
+patch a sus tramos, así que con el disco lento las escrituras chicas se
+agrupan. `flush()` espera a que la cola se vacíe y `close()` además termina el hilo.
+"""
+
+import os
+import threading
+from collections import deque
+
+OP_REPLACE = 1
+OP_APPEND = 2
+OP_PATCH = 3
+OP_CALL = 4
+
+
+def atomic_write(path: str, data: bytes):
+    """Escribe `data` en `path` sin dejarlo nunca a medio escribir."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # Que el rename también sobreviva a un corte de luz
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class StateWriter:
+    def __init__(self, on_error=None, name: str = "state-writer"):
+        self.on_error = on_error          # se llama desde el hilo escritor
+        self._pending = deque()           # [path, op, datos], en orden de llegada
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._appends = {}                # path -> archivo abierto para agregar
+        self.writes = 0
+        self.coalesced = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ---------- Desde la GUI ----------
+    def _last(self, path, ops):
+        """Última operación pendiente, si es sobre `path` y de uno de los tipos `ops`."""
+        last = self._pending[-1] if self._pending else None
+        if last is not None and last[0] == path and last[1] in ops:
+            self.coalesced += 1
+            return last
+        return None
+
+    def replace(self, path: str, data: bytes):
+        with self._cond:
+            last = self._last(path, (OP_REPLACE, OP_APPEND, OP_PATCH))
+            if last is not None:
+                last[1], last[2] = OP_REPLACE, bytearray(data)
+            else:
+                self._pending.append([path, OP_REPLACE, bytearray(data)])
+            self._cond.notify()
+
+    def append(self, path: str, data: bytes):
+        with self._cond:
+            last = self._last(path, (OP_REPLACE, OP_APPEND))
+            if last is not None:
+                last[2] += data        # replace + append = replace con todo
+            else:
+                self._pending.append([path, OP_APPEND, bytearray(data)])
+            self._cond.notify()
+
+    def patch(self, path: str, offset: int, data: bytes, size: int = None):
+        """Escribe `data` en `offset` de un archivo que ya existe; con `size`,
+        después lo trunca a ese tamaño."""
+        with self._cond:
+            last = self._last(path, (OP_PATCH,))
+            if last is not None:
+                last[2].append((offset, bytes(data), size))
+            else:
+                self._pending.append([path, OP_PATCH, [(offset, bytes(data), size)]])
+            self._cond.notify()
+
+    def call(self, path: str, fn):
+        """Corre fn() en el hilo escritor, en su turno; si falla se avisa con `path`."""
+        with self._cond:
+            self._pending.append([path, OP_CALL, fn])
+            self._cond.notify()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Espera a que todo lo encolado esté en disco."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout: float = 10.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    # ---------- Hilo escritor ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    break   # cerrado y sin nada pendiente
+                path, op, data = self._pending.popleft()
+                self._busy = True
+            try:
+                self._write(path, op, data)
+                self.writes += 1
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(path, e)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+        for f in self._appends.values():
+            f.close()
+        self._appends.clear()
+
+    def _write(self, path, op, data):
+        if op == OP_CALL:
+            data()
+            return
+        if op == OP_REPLACE:
+            f = self._appends.pop(path, None)
+            if f is not None:
+                f.close()
+            atomic_write(path, bytes(data))
+            return
+        if op == OP_PATCH:
+            # Sin archivo abierto entre tandas: el dueño puede reemplazarlo (os.replace)
+            with open(path, "r+b") as f:
+                for offset, raw, size in data:
+                    f.seek(offset)
+                    f.write(raw)
+                    if size is not None:
+                        f.truncate(size)
+                f.flush()
+                os.fsync(f.fileno())
+            return
+        f = self._appends.get(path)
+        if f is None:
+            f = self._appends[path] = open(path, "ab")
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
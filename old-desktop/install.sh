@@ -8,6 +8,7 @@ APPNAME="Flowmodoro RPG"              # nombre visible
 ENTRYPOINT="FlowmodoroRPG.py"         # script Python principal
 ICON_SRC="flowmodoro-rpg.png"        # icono fuente (png preferido)
 EXTRA_FILES=()                        # archivos extra a copiar (array bash), ej: ("flowmodoro-rpg.conf")
+EXTRA_DIRS=("flowmodoro")             # paquetes/directorios a copiar junto al entrypoint
 
 # --- Directorios destino ---
 APPDIR="$HOME/.local/share/$APPID"
@@ -80,6 +81,9 @@ cp "$ENTRYPOINT" "$APPDIR/"
 for f in "${EXTRA_FILES[@]}"; do
     [[ -f "$f" ]] && cp "$f" "$APPDIR/" || warn "Archivo extra '$f' no encontrado, omitido."
 done
+for d in "${EXTRA_DIRS[@]}"; do
+    [[ -d "$d" ]] && cp -r "$d" "$APPDIR/" || warn "Directorio extra '$d' no encontrado, omitido."
+done
 
 # --- Copiar requirements.txt si existe en repo raíz ---
 if [[ -f "requirements.txt" ]]; then
@@ -0,0 +1,18 @@
+import pytest
+
+from flowmodoro.audio import SAMPLE_RATE, render, tone
+
+
+@pytest.mark.parametrize("dur", (0, 0.5 / SAMPLE_RATE, -1))
+def test_tone_shorter_than_a_sample_is_empty(dur):
+    assert len(tone(440, dur)) == 0
+
+
+@pytest.mark.parametrize("freq,dur", ((440, 0.18), (1047, 0.24), (600, 2 / SAMPLE_RATE)))
+def test_tone_length(freq, dur):
+    assert len(tone(freq, dur)) == int(SAMPLE_RATE * dur)
+
+
+def test_render_concatenates():
+    notes = [(523, 0.08), (659, 0.0), (784, 0.08)]
+    assert len(render(notes)) == sum(int(SAMPLE_RATE * d) for _, d in notes)
@@ -0,0 +1,68 @@
+import io
+import json
+
+import pytest
+
+from flowmodoro import binstate
+from flowmodoro.common import DIFF_CYCLE, default_state
+from flowmodoro.history import HistoryStore
+from flowmodoro.sessions import SessionLog
+
+
+def _states():
+    plain = default_state()
+    rich = default_state()
+    rich.update({
+        "exp_total": 123456, "dano_total": 2 ** 40, "difficulty": DIFF_CYCLE[-1],
+        "boss_name": "Ñandú del Abismo 🐉", "auto_last_idx_focus": None,
+        "story": ["Nivel 2: texto libre", "sin formato de nivel", "Nivel -3: raro"],
+        "history": [{"exp": 10, "dano": 7, "tipo": "deep"}, {"exp": 3, "dano": 2, "tipo": "mini"}],
+        "clave_nueva": {"a": [1, 2, None]}, "imports": {"abc": 10, "web": {"2024-03-01": [1500]}},
+    })
+    odd = default_state()
+    odd.update({
+        "tokens_spent": 2 ** 70,              # no entra en int64: a extras
+        "difficulty": "inventada",            # fuera del enum
+        "hp_total": True,                     # bool no es int
+        "history": [{"exp": 1, "dano": 1, "tipo": "deep"}, {"exp": 1.5, "dano": 1, "tipo": "mini"},
+                    {"tipo": "deep"}, "basura"],
+        "stats": {"focus_n": 3, "algo": "más"},
+    })
+    return {"plain": plain, "rich": rich, "odd": odd}
+
+
+@pytest.mark.parametrize("name", ["plain", "rich", "odd"])
+def test_round_trip_is_lossless(name):
+    state = _states()[name]
+    ref = json.loads(json.dumps(binstate.to_json(state)))
+    raw = binstate.dumps(state)
+    assert raw[:4] == binstate.MAGIC
+    assert binstate.to_json(binstate.loads(raw)) == ref
+    # Segunda vuelta: el binario es estable
+    assert binstate.dumps(binstate.loads(raw)) == raw
+
+
+def test_history_store_streams_into_given_store():
+    state = _states()["rich"]
+    state["history"] = HistoryStore.from_entries({"exp": i % 30, "dano": i % 7, "tipo": ("deep", "mini")[i % 2]}
+                                                 for i in range(binstate.CHUNK_ROWS + 10))
+    target = HistoryStore()
+    data = binstate.load(io.BytesIO(binstate.dumps(state)), history=target)
+    assert data["history"] is target
+    assert list(target) == list(state["history"])
+
+
+def test_sessions_log_is_rejected(tmp_path):
+    log = SessionLog(str(tmp_path / "s.bin"))
+    log.record(0, 1000, 1600)
+    log.close()
+    with pytest.raises(ValueError):
+        binstate.read_file(str(tmp_path / "s.bin"))
+    assert binstate.main(["to-json", str(tmp_path / "s.bin")]) == 2
+
+
+def test_truncated_file_raises(tmp_path):
+    raw = binstate.dumps(_states()["rich"])
+    for cut in (3, 10, len(raw) // 2, len(raw) - 1):
+        with pytest.raises(ValueError):
+            binstate.loads(raw[:cut])
@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from flowmodoro.common import AUTO_DEEP_SEC, AUTO_MINI_SEC, DIFF_RATIO
+from flowmodoro.engine import MODE_BREAK, MODE_FOCUS, GameEngine, new_state
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+def _engine(seed=1, **kw):
+    clock = FakeClock()
+    state = new_state(random.Random(seed))
+    state["hp_total"] = 10 ** 6   # que ningún jefe caiga en medio de la prueba
+    eng = GameEngine(state, clock=clock, rng=random.Random(seed), wall=lambda: 0.0, **kw)
+    return eng, clock
+
+
+def _kinds(events):
+    return [e[0] for e in events]
+
+
+def test_mini_then_upgrade_to_deep():
+    eng, clock = _engine()
+    eng.start()
+    clock.t += AUTO_MINI_SEC - 1
+    assert eng.sync() == []
+    assert len(eng.state["history"]) == 0
+
+    clock.t += 1
+    assert _kinds(eng.sync()) == ["block"]
+    hist = eng.state["history"]
+    assert [e["tipo"] for e in hist] == ["mini"]
+    assert eng.state["auto_registered_focus"] == "brief"
+    assert eng.state["auto_last_idx_focus"] == 0
+    exp_mini = eng.state["exp_total"]
+
+    clock.t += AUTO_DEEP_SEC - AUTO_MINI_SEC
+    events = eng.sync()
+    assert events[0][:2] == ("upgrade", 0)
+    assert [e["tipo"] for e in hist] == ["deep"]      # el mismo bloque, promovido
+    assert eng.state["auto_registered_focus"] == "deep"
+    assert eng.state["exp_total"] - exp_mini == events[0][2]
+    assert hist.totals()["exp"] == eng.state["exp_total"]
+
+    clock.t += 3600
+    assert eng.sync() == []                           # nada más en la misma sesión
+    assert len(hist) == 1
+
+
+def test_one_jump_over_both_thresholds_matches_ticks():
+    bulk, clock = _engine(seed=4)
+    bulk.start()
+    clock.t += AUTO_DEEP_SEC + 30
+    ev_bulk = bulk.sync()
+
+    ticked, _ = _engine(seed=4)
+    ticked.start()
+    ev_ticks = []
+    for _ in range(AUTO_DEEP_SEC + 30):
+        ev_ticks += ticked.tick()
+    assert ev_bulk == ev_ticks
+    assert _kinds(ev_bulk)[:2] == ["block", "upgrade"]
+    for k in ("exp_total", "dano_total", "session_focus_sec", "total_focus_sec", "auto_registered_focus", "story"):
+        assert bulk.state[k] == ticked.state[k]
+    assert list(bulk.state["history"]) == list(ticked.state["history"])
+
+
+def test_toggle_keeps_each_mode_session():
+    eng, clock = _engine()
+    eng.start()
+    clock.t += AUTO_MINI_SEC + 5
+    eng.sync()
+    assert eng.toggle_mode() == MODE_BREAK
+    assert eng.running and eng.elapsed == 0
+    assert eng.state["session_focus_sec"] == AUTO_MINI_SEC + 5
+    assert eng.stats.data["focus_n"] == 1
+
+    clock.t += 120
+    eng.sync()
+    assert eng.state["total_break_sec"] == 120
+    assert eng.toggle_mode() == MODE_FOCUS
+    assert eng.stats.data["break_n"] == 1
+    # Vuelve a la sesión de enfoque: el mini ya estaba, a los 25 min se promueve
+    assert eng.elapsed == AUTO_MINI_SEC + 5
+    assert eng.auto_registered == "brief"
+    clock.t += AUTO_DEEP_SEC - eng.elapsed
+    assert _kinds(eng.sync())[0] == "upgrade"
+    assert [e["tipo"] for e in eng.state["history"]] == ["deep"]
+
+
+def test_break_overrun_fires_once_when_balance_runs_out():
+    eng, clock = _engine()
+    eng.start()
+    clock.t += 600
+    eng.sync()
+    eng.toggle_mode()
+    allowed = 600 // DIFF_RATIO["normal"]
+    assert eng.seconds_until_overrun() == allowed
+    assert eng.deadlines() == {"break_overrun": clock.t + allowed}
+    clock.t += allowed - 1
+    assert eng.sync() == []
+    clock.t += 1
+    assert eng.sync() == [("break_overrun", 0)]
+    clock.t += 60
+    assert eng.sync() == []
+
+
+def test_deadlines_follow_thresholds():
+    eng, clock = _engine()
+    assert eng.deadlines() == {}
+    eng.start()
+    t0 = clock.t
+    assert eng.deadlines() == {"auto_mini": t0 + AUTO_MINI_SEC, "auto_deep": t0 + AUTO_DEEP_SEC}
+    clock.t += AUTO_MINI_SEC
+    eng.sync()
+    assert eng.deadlines() == {"auto_deep": t0 + AUTO_DEEP_SEC}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_history_totals_stay_in_step(seed):
+    eng, clock = _engine(seed=seed)
+    rng = random.Random(seed)
+    eng.start()
+    for _ in range(40):
+        clock.t += rng.choice((rng.randint(1, 300), rng.randint(600, 2000)))
+        eng.sync()
+        if rng.random() < 0.3:
+            eng.toggle_mode()
+    t = eng.state["history"].totals()
+    assert t["exp"] == eng.state["exp_total"]
+    assert eng.level() == 1 + eng.state["exp_total"] // eng.rules["LEVEL_SIZE"]
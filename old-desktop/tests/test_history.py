@@ -0,0 +1,99 @@
+import random
+
+from flowmodoro.history import HEADER, REMAP_EVERY, ROW, HistoryStore, json_ready, open_history
+
+
+def _entries(n, seed=1):
+    rng = random.Random(seed)
+    return [{"exp": rng.randint(1, 40), "dano": rng.randint(0, 30), "tipo": rng.choice(("deep", "mini"))}
+            for _ in range(n)]
+
+
+def _totals(entries):
+    return {"blocks": len(entries), "deep": sum(e["tipo"] == "deep" for e in entries),
+            "mini": sum(e["tipo"] == "mini" for e in entries),
+            "exp": sum(e["exp"] for e in entries), "dano": sum(e["dano"] for e in entries)}
+
+
+def test_reopen_round_trip(tmp_path):
+    path = str(tmp_path / "h.bin")
+    entries = _entries(REMAP_EVERY + 2000)   # cola en arrays y remapeo
+    h = HistoryStore(path)
+    h.extend(entries[:5000])
+    for e in entries[5000:]:
+        h.append(e)
+    h[17] = {"exp": 1, "dano": 1, "tipo": "mini"}
+    entries[17] = {"exp": 1, "dano": 1, "tipo": "mini"}
+    h.close()
+
+    h2 = HistoryStore(path)
+    assert list(h2) == entries
+    assert {k: v for k, v in h2.totals().items() if k in ("blocks", "deep", "mini", "exp", "dano")} == _totals(entries)
+    assert h2.reader()(10, 20) == b"".join(ROW.pack(("deep", "mini").index(e["tipo"]), e["exp"], e["dano"])
+                                          for e in entries[10:20])
+    h2.close()
+
+
+def test_partial_row_and_stale_header_are_recovered(tmp_path):
+    path = str(tmp_path / "h.bin")
+    entries = _entries(50)
+    h = HistoryStore.from_entries(entries, path)
+    h.close()
+    with open(path, "r+b") as f:
+        f.seek(0, 2)
+        f.write(ROW.pack(0, 5, 5) + b"\x01\x02")   # una fila sin encabezado + una parcial
+    h2 = HistoryStore(path)
+    assert list(h2) == entries + [{"exp": 5, "dano": 5, "tipo": "deep"}]
+    assert h2.exp_sum == sum(e["exp"] for e in entries) + 5
+    h2.close()
+    with open(path, "rb") as f:
+        assert HEADER.unpack(f.read(HEADER.size))[2] == 51
+
+
+def test_legacy_list_is_migrated_once(tmp_path):
+    path = str(tmp_path / "h.bin")
+    legacy = _entries(20) + [{"exp": "x", "tipo": "deep"}]   # la entrada rota se descarta
+    h = open_history(path, legacy)
+    assert list(h) == legacy[:20]
+    h.close()
+    h2 = open_history(path, _entries(5, seed=2))   # con archivo, la lista vieja se ignora
+    assert list(h2) == legacy[:20]
+    assert "history" not in json_ready({"history": h2, "exp_total": 0})
+    h2.close()
+
+
+def test_writer_mode_writes_on_flush_only(tmp_path, monkeypatch):
+    from flowmodoro import history
+    from flowmodoro.writer import StateWriter
+    monkeypatch.setattr(history, "REMAP_EVERY", 64)
+    direct, queued = str(tmp_path / "a.bin"), str(tmp_path / "b.bin")
+    entries = _entries(300)
+    HistoryStore.from_entries(entries[:100], direct).close()
+    HistoryStore.from_entries(entries[:100], queued).close()
+    w = StateWriter()
+    a, b = HistoryStore(direct), HistoryStore(queued, w)
+    before = open(queued, "rb").read()
+    for h in (a, b):
+        h.append(entries[100])
+    assert open(queued, "rb").read() == before   # nada sale hasta flush()
+    for h in (a, b):
+        for e in entries[101:]:            # pasa por un remapeo (espera al escritor)
+            h.append(e)
+        h[5] = {"exp": 1, "dano": 2, "tipo": "mini"}   # fila mapeada
+        h[-1] = {"exp": 3, "dano": 4, "tipo": "deep"}  # fila en la cola
+    assert b[5] == {"exp": 1, "dano": 2, "tipo": "mini"} and list(b) == list(a)
+    assert b.rows_bytes() == a.rows_bytes()
+    b.flush()
+    w.flush()
+    assert open(queued, "rb").read() == open(direct, "rb").read()
+
+    for h in (a, b):
+        h.clear()
+        h.extend(entries[:3])
+    b.flush()
+    w.close()
+    a.close(); b.close()
+    assert open(queued, "rb").read() == open(direct, "rb").read()
+    again = HistoryStore(queued)
+    assert list(again) == entries[:3]
+    again.close()
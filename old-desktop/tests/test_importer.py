@@ -0,0 +1,180 @@
+import json
+import random
+import time
+
+import pytest
+
+from flowmodoro import importer
+from flowmodoro.common import DATA_DIR_ENV, SESSIONS_FILENAME, STORY_SNIPPETS
+from flowmodoro.export import saved_data
+from flowmodoro.sessions import KIND_BREAK, KIND_FOCUS, SessionLog
+
+STORAGES = ("journal", "sqlite", "binary", "json")
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    d = tmp_path / "data"
+    d.mkdir()
+    monkeypatch.setenv(DATA_DIR_ENV, str(d))
+    return d
+
+
+def _import(capsys, storage, *args):
+    assert importer.main([*map(str, args), "--storage", storage]) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def _saved(storage):
+    with saved_data(storage) as (state, sessions):
+        rows = [] if sessions is None else list(sessions.intervals(0, 2 ** 40))
+        return list(state["history"]), state["exp_total"], rows
+
+
+def _blocks(n, seed=0):
+    rng = random.Random(seed)
+    return [{"exp": 10, "dano": rng.randint(1, 30), "tipo": rng.choice(("deep", "mini"))} for _ in range(n)]
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_blocks_are_taken_once_per_source(tmp_path, data_dir, capsys, storage):
+    blocks = _blocks(700)
+    src = tmp_path / "web.json"
+    src.write_text(json.dumps({"exp_total": 1, "history": blocks[:500], "zen_mode": False}))
+    assert _import(capsys, storage, src, "--dry-run")["blocks_added"] == 500
+    assert _saved(storage)[0] == []
+    assert _import(capsys, storage, src)["blocks_added"] == 500
+    assert _import(capsys, storage, src)["blocks_added"] == 0
+    src.write_text(json.dumps({"history": blocks}))   # la fuente creció
+    assert _import(capsys, storage, src)["blocks_added"] == 200
+    hist, exp_total, _ = _saved(storage)
+    assert hist == blocks
+    assert exp_total == sum(b["exp"] for b in blocks)
+
+
+@pytest.mark.parametrize("storage", ("journal", "sqlite"))
+def test_same_game_prefix_is_not_duplicated(tmp_path, data_dir, capsys, storage):
+    blocks = _blocks(300, seed=4)
+    web = tmp_path / "web.json"
+    web.write_text(json.dumps({"history": blocks[:200]}))
+    _import(capsys, storage, web)
+    older_copy = tmp_path / "desktop.json"   # otra copia de la misma partida, más larga
+    older_copy.write_text(json.dumps({"history": blocks}))
+    rep = _import(capsys, storage, older_copy)   # sin crónicas ni terminal: se asume la misma
+    assert (rep["blocks_added"], rep["blocks_duplicate"]) == (100, 200)
+    assert _saved(storage)[0] == blocks
+
+
+def _story(seed, n=4):
+    rng = random.Random(seed)
+    return [f"Nivel {i + 2}: {rng.choice(STORY_SNIPPETS)}" for i in range(n)]
+
+
+def _local_game(storage, blocks, story):
+    with saved_data(storage, save=True) as (state, _):
+        state["history"].extend(blocks)
+        state["exp_total"] = sum(b["exp"] for b in blocks)
+        state["story"][:] = story
+
+
+def _deep_only(n):
+    # Un jugador que solo hace bloques deep: filas iguales en cualquier partida
+    return [{"exp": 10, "dano": 10 + i // 10, "tipo": "deep"} for i in range(n)]
+
+
+@pytest.mark.parametrize("storage", ("journal", "sqlite"))
+def test_same_rows_are_told_apart_by_the_chronicles(tmp_path, data_dir, capsys, storage):
+    blocks = _deep_only(300)
+    _local_game(storage, blocks[:200], _story(1))
+    same = tmp_path / "copia.json"
+    same.write_text(json.dumps({"history": blocks, "story": _story(1, 6)}))
+    other = tmp_path / "otra.json"
+    other.write_text(json.dumps({"history": blocks[:250], "story": _story(2)}))
+
+    rep = _import(capsys, storage, same, "--dry-run")
+    assert (rep["blocks_added"], rep["blocks_duplicate"]) == (100, 200)
+    rep = _import(capsys, storage, other)            # otra partida con las mismas filas
+    assert (rep["blocks_added"], rep["blocks_duplicate"]) == (250, 0)
+    assert len(_saved(storage)[0]) == 450
+    assert _import(capsys, storage, other)["blocks_added"] == 0   # misma huella e identidad
+
+
+def test_same_rows_from_another_source_are_not_skipped(tmp_path, data_dir, capsys):
+    blocks = _deep_only(300)
+    a = tmp_path / "a.json"
+    a.write_text(json.dumps({"history": blocks, "story": _story(5)}))
+    b = tmp_path / "b.json"
+    b.write_text(json.dumps({"history": blocks[:280], "story": _story(6)}))
+    _local_game("journal", [{"exp": 4, "dano": 4, "tipo": "mini"}] * 40, _story(9))
+    assert _import(capsys, "journal", a)["blocks_added"] == 300
+    # Misma huella de filas, otras crónicas: no es el archivo ya importado
+    rep = _import(capsys, "journal", b)
+    assert (rep["blocks_added"], rep["blocks_duplicate"]) == (280, 0)
+    assert len(_saved("journal")[0]) == 620
+    # La fuente ya importada que creció: solo lo nuevo
+    a.write_text(json.dumps({"history": blocks + _deep_only(20), "story": _story(5, 6)}))
+    rep = _import(capsys, "journal", a)
+    assert (rep["blocks_added"], rep["blocks_duplicate"]) == (20, 300)
+
+
+@pytest.mark.parametrize("answer,added", (("yes", 100), ("no", 300)))
+def test_same_game_answer_without_chronicles(tmp_path, data_dir, capsys, answer, added):
+    blocks = _deep_only(300)
+    _local_game("journal", blocks[:200], [])
+    src = tmp_path / "historial.jsonl"
+    src.write_text("".join(json.dumps(b) + "\n" for b in blocks))
+    rep = _import(capsys, "journal", src, "--same-game", answer)
+    assert (rep["blocks_added"], rep["blocks_duplicate"]) == (added, 300 - added)
+    assert len(_saved("journal")[0]) == 200 + added
+
+
+def test_confirm_is_asked_with_the_doubtful_blocks(tmp_path):
+    from flowmodoro.engine import new_state
+    from flowmodoro.history import HistoryStore
+    blocks = _deep_only(120)
+    state = new_state(random.Random(0))
+    state["history"] = HistoryStore.from_entries(blocks[:80])
+    src = tmp_path / "h.json"
+    src.write_text(json.dumps({"history": blocks}))
+    asked = []
+    rep = importer.Importer([str(src)], state, dry_run=True,
+                            confirm=lambda path, n, why: asked.append((n, why)) or False).run(None, None)
+    assert asked == [(80, "game")]
+    assert (rep["blocks_added"], rep["blocks_duplicate"]) == (120, 0)
+
+
+@pytest.mark.parametrize("storage", ("journal", "binary"))
+def test_intervals_merge_sorted_without_duplicates(tmp_path, data_dir, capsys, storage):
+    local = [(1_700_000_000 + i * 3600, 1_700_000_000 + i * 3600 + 1500, i % 2) for i in range(0, 40, 2)]
+    log = SessionLog(str(data_dir / SESSIONS_FILENAME))
+    for start, end, kind in local:
+        log.record(kind, start, end)
+    log.close()
+    incoming = [(1_700_000_000 + i * 3600, 1_700_000_000 + i * 3600 + 1500, i % 2) for i in range(40)]
+    random.Random(1).shuffle(incoming)
+    src = tmp_path / "intervalos.jsonl"
+    kinds = {KIND_FOCUS: "focus", KIND_BREAK: "break"}
+    iso = lambda t: time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t))
+    src.write_text("".join(json.dumps({"start": iso(s), "end": iso(e), "kind": kinds[k]}) + "\n"
+                           for s, e, k in incoming))
+    rep = _import(capsys, storage, src)
+    assert (rep["intervals_read"], rep["intervals_added"]) == (40, 20)
+    assert _saved(storage)[2] == sorted(incoming)
+    assert _import(capsys, storage, src)["intervals_added"] == 0
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_web_sessions_survive_the_sliding_window(tmp_path, data_dir, capsys, storage):
+    # La web se queda con las últimas 100 sesiones: la ventana se corre a mitad de un día
+    day = lambda k: time.strftime(importer.WEB_DATE, time.localtime(time.time() - k * 86400))
+    full = [{"date": day(k), "focus_time": (1500, 900, 600)[j], "completed": j != 2}
+            for k in range(50, 0, -1) for j in range(3)]
+    src = tmp_path / "web.json"
+    for hi in (101, 101, 102, 150):
+        src.write_text(json.dumps({"history": [], "session_history": full[:hi][-100:]}))
+        _import(capsys, storage, src)
+    rows = _saved(storage)[2]
+    seen = full[1:]   # la primera nunca estuvo en una ventana
+    assert len(rows) == len(seen)
+    assert sum(e - s for s, e, _ in rows) == sum(x["focus_time"] for x in seen)
+    assert all(k == KIND_FOCUS for _, _, k in rows)
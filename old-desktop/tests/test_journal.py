@@ -0,0 +1,130 @@
+import copy
+import json
+import os
+import shutil
+
+from flowmodoro.common import AUTO_FOCUS_VALUES, DIFF_CYCLE, STORY_SNIPPETS, default_state
+from flowmodoro.journal import GEN_KEY, HEADER, RECORD, StateJournal
+
+
+def _journal(path):
+    return StateJournal(str(path), story_snippets=STORY_SNIPPETS,
+                        enums={"difficulty": DIFF_CYCLE, "auto_registered_focus": AUTO_FOCUS_VALUES})
+
+
+def _plain(state):
+    data = json.loads(json.dumps(state))
+    data.pop(GEN_KEY, None)
+    return data
+
+
+def _one_change_per_commit(j, state):
+    """Commits de un solo registro cada uno; devuelve el estado tras cada registro."""
+    seen = [_plain(state)]
+    steps = []
+    for i in range(12):
+        steps.append(lambda s, i=i: s.__setitem__("total_focus_sec", s["total_focus_sec"] + 60 + i))
+    steps.append(lambda s: s.__setitem__("difficulty", DIFF_CYCLE[2]))
+    steps.append(lambda s: s["history"].append({"exp": 10, "dano": 7, "tipo": "deep"}))
+    steps.append(lambda s: s["history"].append({"exp": 3, "dano": 2, "tipo": "mini"}))
+    steps.append(lambda s: s.__setitem__("auto_last_idx_focus", 1))
+    # La única entrada que cambia in situ es la del auto-registro (mini -> deep)
+    steps.append(lambda s: s["history"].__setitem__(1, {"exp": 10, "dano": 9, "tipo": "deep"}))
+    steps.append(lambda s: s["story"].append(f"Nivel 2: {STORY_SNIPPETS[3]}"))
+    steps.append(lambda s: s.__setitem__("auto_last_idx_focus", None))
+    for step in steps:
+        before = os.path.getsize(j.log_path)
+        step(state)
+        j.commit(state)
+        assert os.path.getsize(j.log_path) == before + RECORD.size
+        seen.append(_plain(state))
+    return seen
+
+
+def test_replay_after_every_truncation(tmp_path):
+    path = tmp_path / "state.json"
+    state = default_state()
+    j = _journal(path)
+    j.commit(state)   # primer commit: snapshot + log vacío
+    seen = _one_change_per_commit(j, state)
+    j._log.close()
+    full = open(j.log_path, "rb").read()
+
+    for cut in range(HEADER.size, len(full) + 1):
+        d = tmp_path / f"cut{cut}"
+        d.mkdir()
+        shutil.copy(path, d / "state.json")
+        with open(d / "state.json.log", "wb") as f:
+            f.write(full[:cut])
+        j2 = _journal(d / "state.json")
+        data = j2.load()
+        assert _plain(data) == seen[(cut - HEADER.size) // RECORD.size]
+        j2.close()
+
+
+def test_partial_record_is_dropped_before_appending(tmp_path):
+    path = tmp_path / "state.json"
+    state = default_state()
+    j = _journal(path)
+    j.commit(state)
+    seen = _one_change_per_commit(j, state)
+    j._log.close()
+    with open(j.log_path, "r+b") as f:
+        f.truncate(HEADER.size + 5 * RECORD.size + 7)   # corte a mitad del sexto registro
+
+    j2 = _journal(path)
+    data = j2.load()
+    assert _plain(data) == seen[5]
+    data["tokens_spent"] = 42
+    j2.commit(data)
+    j2.close()
+    expected = copy.deepcopy(seen[5])
+    expected["tokens_spent"] = 42
+    assert _plain(_journal(path).load()) == expected
+
+
+def test_log_from_another_generation_is_ignored(tmp_path):
+    # Caída a mitad de compactar: snapshot nuevo, log todavía de la generación anterior
+    path = tmp_path / "state.json"
+    state = default_state()
+    j = _journal(path)
+    j.commit(state)
+    _one_change_per_commit(j, state)
+    j._log.close()
+    stale = open(j.log_path, "rb").read()
+    j2 = _journal(path)
+    data = j2.load()
+    j2.compact(data)
+    j2.close()
+    with open(j.log_path, "wb") as f:
+        f.write(stale)
+    assert _plain(_journal(path).load()) == _plain(data)
+
+
+def test_history_rows_are_queued_before_the_state(tmp_path):
+    from flowmodoro.history import HistoryStore
+    from flowmodoro.writer import StateWriter
+
+    class Recorder(StateWriter):
+        def _write(self, path, op, data):
+            done.append(os.path.basename(path))
+            super()._write(path, op, data)
+
+    done = []
+    w = Recorder()
+    state = default_state()
+    state["history"] = HistoryStore(str(tmp_path / "h.bin"), w)
+    j = StateJournal(str(tmp_path / "state.json"), story_snippets=STORY_SNIPPETS,
+                     enums={"difficulty": DIFF_CYCLE, "auto_registered_focus": AUTO_FOCUS_VALUES}, writer=w)
+    j.commit(state)
+    state["history"].add("deep", 10, 7)
+    state["exp_total"] = 10
+    j.commit(state)
+    w.flush()
+    assert done[-2:] == ["h.bin", "state.json.log"]
+    j.compact(state)
+    state["history"].close()
+    w.close()
+    again = HistoryStore(str(tmp_path / "h.bin"))
+    assert list(again) == [{"exp": 10, "dano": 7, "tipo": "deep"}]
+    again.close()
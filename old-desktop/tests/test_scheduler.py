@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from flowmodoro.scheduler import TimingWheel
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_wheel_matches_sorted_list(seed):
+    rng = random.Random(seed)
+    res = rng.choice((1.0, 0.25))
+    now = rng.uniform(0, 1e6)
+    wheel = TimingWheel(resolution=res, now=now)
+    pending = {}   # Timer -> (when, seq)
+    seq = 0
+    for _ in range(3000):
+        op = rng.random()
+        if op < 0.5:
+            # Cerca, lejos (niveles altos) y a veces ya vencido
+            when = now + rng.choice((rng.uniform(-2, 5), rng.uniform(0, 300), rng.uniform(0, 5e6)))
+            pending[wheel.schedule(when, seq)] = (when, seq)
+            seq += 1
+        elif op < 0.65 and pending:
+            t = rng.choice(list(pending))
+            wheel.cancel(t)
+            del pending[t]
+        else:
+            now += rng.choice((rng.uniform(0, 3), rng.uniform(0, 500), rng.uniform(0, 1e5)))
+            fired = wheel.advance(now)
+            expected = sorted(v for v in pending.values() if v[0] <= now)
+            assert [(t.when, t.payload) for t in fired] == expected
+            for t in fired:
+                del pending[t]
+        assert len(wheel) == len(pending)
+        nxt = wheel.next_deadline()
+        if not pending:
+            assert nxt is None
+        else:
+            assert nxt <= min(w for w, _ in pending.values())   # exacto o cota inferior
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_waking_at_next_deadline_fires_everything_in_order(seed):
+    rng = random.Random(seed)
+    wheel = TimingWheel(now=0.0)
+    whens = sorted(rng.uniform(0, 1e6) for _ in range(500))
+    for i, w in enumerate(rng.sample(whens, len(whens))):
+        wheel.schedule(w, i)
+    fired, wakeups = [], 0
+    while len(wheel):
+        nxt = wheel.next_deadline()
+        fired += [t.when for t in wheel.advance(nxt)]
+        wakeups += 1
+        assert wakeups <= 4 * len(whens)   # cada despertar vence algo o baja una ranura
+    assert fired == whens
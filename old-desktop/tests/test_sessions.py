@@ -0,0 +1,168 @@
+import random
+import time
+
+import pytest
+
+from flowmodoro.sessions import KIND_BREAK, KIND_FOCUS, SessionLog, day_of
+
+# Madrid pasa a horario de verano el 31/03/2024: un día de 23 horas en el medio
+ZONES = ("UTC", "Europe/Madrid", "America/Santiago")
+
+
+def _local(y, mo, d, h=0):
+    return int(time.mktime((y, mo, d, h, 0, 0, 0, 0, -1)))
+
+
+def _rows(seed, t0, days):
+    """Intervalos en orden, sin solaparse, en minutos enteros; algunos cruzan medianoche."""
+    rng = random.Random(seed)
+    rows, t = [], t0
+    while t < t0 + days * 86400:
+        t += rng.choice((rng.randint(1, 90), rng.randint(300, 900))) * 60
+        length = rng.choice((rng.randint(1, 50), rng.randint(60, 200))) * 60
+        rows.append((t, t + length, rng.choice((KIND_FOCUS, KIND_BREAK))))
+        t += length
+    return rows
+
+
+def _minutes(rows):
+    for start, end, kind in rows:
+        for m in range(start, end, 60):
+            yield m, kind
+
+
+def _brute_query(rows, t0, t1, hours=None):
+    ok = lambda t: t0 <= t < t1 and (hours is None or time.localtime(t).tm_hour in hours)
+    out = {"focus_sec": 0, "break_sec": 0, "focus_n": 0, "break_n": 0}
+    for m, kind in _minutes(rows):
+        if ok(m):
+            out["focus_sec" if kind == KIND_FOCUS else "break_sec"] += 60
+    for start, _, kind in rows:
+        if ok(start):
+            out["focus_n" if kind == KIND_FOCUS else "break_n"] += 1
+    return out
+
+
+def _ranges(rng, t0, days, n):
+    """Rangos alineados a horas locales (la precisión de las cubetas)."""
+    lt = time.localtime(t0)
+    for _ in range(n):
+        a = rng.randint(0, days * 24)
+        b = rng.randint(a + 1, days * 24 + 2)
+        yield (_local(lt.tm_year, lt.tm_mon, lt.tm_mday + a // 24, a % 24),
+               _local(lt.tm_year, lt.tm_mon, lt.tm_mday + b // 24, b % 24))
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_query_and_daily_match_brute_force(tmp_path, tz, zone):
+    tz(zone)
+    t0 = _local(2024, 3, 27)
+    rows = _rows(7, t0, 8)
+    log = SessionLog(str(tmp_path / "s.bin"))
+    for start, end, kind in rows:
+        log.record(kind, start, end)
+    reopened = SessionLog(str(tmp_path / "s.bin"))
+    rng = random.Random(3)
+    for a, b in _ranges(rng, t0, 8, 60):
+        hours = None if rng.random() < 0.5 else set(rng.sample(range(24), 6))
+        expected = _brute_query(rows, a, b, hours)
+        assert log.query(a, b, hours) == expected
+        assert reopened.query(a, b, hours) == expected
+
+    days = {}
+    for m, kind in _minutes(rows):
+        f, br = days.get(day_of(m), (0, 0))
+        days[day_of(m)] = (f + 60, br) if kind == KIND_FOCUS else (f, br + 60)
+    a, b = t0, _local(2024, 4, 5)
+    assert log.daily(a, b) == [(d,) + days.get(d, (0, 0)) for d in range(day_of(a), day_of(b - 1) + 1)]
+    log.close(); reopened.close()
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_intervals_match_brute_force(tmp_path, tz, zone):
+    tz(zone)
+    t0 = _local(2024, 3, 27)
+    rows = _rows(11, t0, 8)
+    log = SessionLog(str(tmp_path / "s.bin"))
+    for start, end, kind in rows:
+        log.record(kind, start, end)
+    rng = random.Random(5)
+    for a, b in _ranges(rng, t0, 8, 60):
+        d0, d1 = day_of(a), day_of(b - 1)
+        expected = [r for r in rows if r[1] > a and r[0] < b and d0 <= day_of(r[0]) <= d1]
+        assert list(log.intervals(a, b)) == expected
+        seen = list(log.reader(a, b)())
+        assert [r for r in seen if r[1] > a and r[0] < b] == expected
+    log.close()
+
+
+def test_index_is_rebuilt_after_a_crash(tmp_path, tz):
+    tz("Europe/Madrid")
+    t0 = _local(2024, 3, 27)
+    rows = _rows(13, t0, 6)
+    path = str(tmp_path / "s.bin")
+    log = SessionLog(path)
+    for start, end, kind in rows:
+        log.record(kind, start, end)
+    expected = log.query(t0, t0 + 7 * 86400)
+    log.close()
+    with open(path + ".idx", "r+b") as f:   # la fila llegó al disco, el índice no
+        f.truncate(f.seek(0, 2) - 10)
+    again = SessionLog(path)
+    assert len(again) == len(rows)
+    assert again.query(t0, t0 + 7 * 86400) == expected
+    assert list(again.intervals(t0, t0 + 7 * 86400)) == rows
+    again.close()
+
+
+def test_engine_reset_clears_the_log(tmp_path, tz):
+    from flowmodoro.engine import GameEngine, new_state
+    tz("UTC")
+    t0 = _local(2024, 3, 27, 9)
+    path = str(tmp_path / "s.bin")
+    clock = [0.0]
+    log = SessionLog(path)
+    eng = GameEngine(new_state(random.Random(1)), clock=lambda: clock[0], wall=lambda: t0 + clock[0], sessions=log)
+    eng.start()
+    clock[0] = 600.0
+    eng.sync()
+    eng.pause()
+    assert len(log) == 1
+    eng.start()
+    clock[0] = 900.0
+    eng.sync()
+    eng.reset()
+    assert len(log) == 0
+    assert log.query(t0, t0 + 86400) == {"focus_sec": 0, "break_sec": 0, "focus_n": 0, "break_n": 0}
+    log.record(KIND_BREAK, t0 + 3600, t0 + 3900)
+    log.close()
+    again = SessionLog(path)
+    assert list(again.intervals(t0, t0 + 86400)) == [(t0 + 3600, t0 + 3900, KIND_BREAK)]
+    again.close()
+
+
+def test_writer_mode_matches_direct_writes(tmp_path, tz):
+    from flowmodoro.writer import StateWriter
+    tz("Europe/Madrid")
+    t0 = _local(2024, 3, 27)
+    rows = _rows(17, t0, 6)
+    direct, queued = str(tmp_path / "a.bin"), str(tmp_path / "b.bin")
+    w = StateWriter()
+    a, b = SessionLog(direct), SessionLog(queued, w)
+    for log in (a, b):
+        log.REMAP_EVERY = 16
+        for start, end, kind in rows[:40]:
+            log.record(kind, start, end)
+    b.flush()
+    w.flush()
+    for log in (a, b):
+        log.clear()
+        for start, end, kind in rows:
+            log.record(kind, start, end)
+    assert b.query(t0, t0 + 7 * 86400) == a.query(t0, t0 + 7 * 86400)
+    assert list(b.reader(t0, t0 + 7 * 86400)()) == rows   # el reader espera al disco
+    b.flush()
+    w.close()
+    a.close(); b.close()
+    for suffix in ("", ".idx"):
+        assert open(queued + suffix, "rb").read() == open(direct + suffix, "rb").read()
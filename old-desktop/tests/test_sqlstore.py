@@ -0,0 +1,163 @@
+import json
+import random
+import sqlite3
+
+import pytest
+
+from flowmodoro import binstate
+from flowmodoro.common import DATA_DIR_ENV, STATE_DB_FILENAME, STATE_FILENAME, STORY_SNIPPETS
+from flowmodoro.engine import GameEngine, new_state
+from flowmodoro.export import saved_data
+from flowmodoro.sqlstore import SqlHistory, SqliteStore
+
+
+def _legacy(n_blocks=300, n_story=40, seed=0):
+    rng = random.Random(seed)
+    state = new_state(rng)
+    state["history"] = [{"exp": 10, "dano": rng.randint(1, 30), "tipo": rng.choice(("deep", "mini"))}
+                        for _ in range(n_blocks)]
+    state["story"] = [f"Nivel {i + 2}: {rng.choice(STORY_SNIPPETS)}" for i in range(n_story)]
+    state["exp_total"] = 10 * n_blocks
+    state["difficulty"] = "avanzado"
+    state["stats"] = {"focus_n": 3, "focus_sum": 3600, "break_n": 0, "break_sum": 0, "streak": 1,
+                      "best_streak": 2, "hour_n": [0] * 24, "hour_focus": [0] * 24}
+    return state
+
+
+def _scalars(state):
+    return {k: v for k, v in state.items() if k not in ("history", "story")}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    d = tmp_path / "data"
+    d.mkdir()
+    monkeypatch.setenv(DATA_DIR_ENV, str(d))
+    return d
+
+
+def test_first_commit_migrates_and_reopens(tmp_path):
+    legacy = _legacy()
+    path = str(tmp_path / "s.sqlite3")
+    store = SqliteStore(path)
+    assert store.load() is None
+    state = json.loads(json.dumps(legacy))
+    store.commit(state)                      # base vacía: migra todo en una transacción
+    assert isinstance(state["history"], SqlHistory)
+    store.close()
+
+    again = SqliteStore(path)
+    data = again.load()
+    assert _scalars(data) == _scalars(legacy)
+    assert data["story"] == legacy["story"]
+    assert list(data["history"]) == legacy["history"]
+    t = data["history"].totals()
+    assert (t["blocks"], t["exp"], t["dano"]) == (300, 3000, sum(e["dano"] for e in legacy["history"]))
+    again.close()
+
+
+def test_cli_migrates_json_on_first_load(data_dir):
+    legacy = _legacy(seed=3)
+    (data_dir / STATE_FILENAME).write_text(json.dumps(legacy), encoding="utf-8")
+    with saved_data("sqlite", save=True) as (state, _):
+        assert state["exp_total"] == legacy["exp_total"]
+    store = SqliteStore(str(data_dir / STATE_DB_FILENAME))
+    data = store.load()
+    assert _scalars(data) == _scalars(legacy)
+    assert list(data["history"]) == legacy["history"]
+    assert data["story"] == legacy["story"]
+    store.close()
+
+
+def test_engine_changes_survive_reopen(tmp_path):
+    path = str(tmp_path / "s.sqlite3")
+    store = SqliteStore(path, batch_sec=3600)
+    store.commit(_legacy(n_blocks=5, n_story=2))
+    state = store.load()
+    clock = [0.0]
+    eng = GameEngine(state, clock=lambda: clock[0], rng=random.Random(1), wall=lambda: 0.0)
+    eng.start()
+    clock[0] = 30 * 60.0
+    eng.sync()                               # mini a los 10 min, promovido a deep a los 25
+    store.commit(eng.state)
+    other = sqlite3.connect(path)            # lo urgente ya está confirmado
+    assert other.execute("SELECT count(*) FROM history").fetchone()[0] == 6
+    other.close()
+    clock[0] += 5
+    eng.sync()
+    store.commit(eng.state)                  # solo ticks: queda en la transacción
+    expected = _scalars(eng.state), list(eng.state["history"]), list(eng.state["story"])
+    store.close(eng.state)
+
+    again = SqliteStore(path)
+    data = again.load()
+    assert (_scalars(data), list(data["history"]), data["story"]) == expected
+    assert data["history"][-1]["tipo"] == "deep"
+    again.close()
+
+
+def test_prune_keeps_indices_totals_and_memory_in_step(tmp_path):
+    path = str(tmp_path / "s.sqlite3")
+    store = SqliteStore(path)
+    legacy = _legacy()
+    store.commit(json.loads(json.dumps(legacy)))
+    state = store.load()
+    totals = state["history"].totals()
+    assert store.prune(state, keep_blocks=50, keep_story=10) == (250, 30)
+    assert state["story"] == legacy["story"][-10:]
+    hist = state["history"]
+    assert hist.totals() == totals and len(hist) == 300
+    assert [j for j, _ in hist.rows(0, 300)] == list(range(250, 300))
+    with pytest.raises(IndexError):
+        hist[0]
+    state["story"].append(f"Nivel 99: {STORY_SNIPPETS[0]}")
+    store.commit(state)                      # no vuelve a escribir las podadas
+    store.close(state)
+
+    data = SqliteStore(path).load()
+    assert data["story"] == legacy["story"][-10:] + [f"Nivel 99: {STORY_SNIPPETS[0]}"]
+    assert list(data["history"]) == legacy["history"][-50:]
+
+
+def test_state_prune_subcommand(data_dir, capsys):
+    assert binstate.main(["prune", "--keep-story", "5"]) == 2
+    store = SqliteStore(str(data_dir / STATE_DB_FILENAME))
+    store.commit(_legacy())
+    store.close()
+    assert binstate.main(["prune", "--keep-blocks", "100", "--keep-story", "5"]) == 0
+    assert "200 bloques y 35 crónicas" in capsys.readouterr().out
+    with saved_data("sqlite") as (state, _):
+        assert len(state["story"]) == 5
+        assert len(list(state["history"])) == 100
+    with pytest.raises(SystemExit):
+        binstate.main(["prune"])
+
+
+def test_writer_commits_on_its_own_thread(tmp_path):
+    from flowmodoro.writer import StateWriter
+    path = str(tmp_path / "s.sqlite3")
+    w = StateWriter()
+    store = SqliteStore(path, batch_sec=3600, writer=w)
+    store.commit(_legacy(n_blocks=5, n_story=2))
+    state = store.load()                     # espera al escritor y lee con la conexión de la GUI
+    hist = state["history"]
+    i = hist.add("mini", 4, 2)
+    hist[i] = {"exp": 10, "dano": 3, "tipo": "deep"}   # se lee de memoria, sin esperar
+    assert hist[i] == {"exp": 10, "dano": 3, "tipo": "deep"} and store._ops
+    store.flush()                            # lo que hace el timer de batch_sec
+    assert not store._ops and not store.db.in_transaction
+    w.flush()
+    with pytest.raises(sqlite3.ProgrammingError):
+        store._wdb.execute("SELECT 1")       # la conexión es del hilo escritor
+    other = sqlite3.connect(path)
+    assert other.execute("SELECT tipo, exp FROM history WHERE idx = ?", (i,)).fetchone() == ("deep", 10)
+    other.close()
+    assert list(hist)[-1] == {"exp": 10, "dano": 3, "tipo": "deep"}
+    store.close(state)
+    w.close()
+    assert store._wdb is None
+
+    again = SqliteStore(path)
+    data = again.load()
+    assert len(data["history"]) == 6 and data["history"].totals()["exp"] == 60
+    again.close()
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from flowmodoro.engine import GameEngine, new_state
+from flowmodoro.stats import HOUR_MIN_N, RATIO_BASE, RATIO_MAX, RATIO_MIN, SessionStats
+
+
+def _stats(intervals, block_sec=600):
+    st = SessionStats()
+    for seconds, hour in intervals:
+        st.record_focus(seconds, hour, block_sec)
+    return st
+
+
+def test_streaming_means_and_streak():
+    st = _stats([(1200, 9), (300, 9), (900, 10), (1500, 10), (700, 11)])
+    st.record_break(300); st.record_break(0); st.record_break(500)
+    assert st.mean_focus() == pytest.approx(4600 / 5)
+    assert st.mean_break() == 400
+    assert st.mean_focus_at(10) == 1200
+    assert st.mean_focus_at(3) == 0.0
+    assert (st.data["streak"], st.data["best_streak"]) == (3, 3)
+
+
+@pytest.mark.parametrize("hour,expected", ((15, RATIO_BASE + 0.2), (10, RATIO_BASE - 0.2), (20, RATIO_BASE)))
+def test_fixed_hour_ranges_without_data(hour, expected):
+    assert SessionStats().dynamic_ratio(0, 0, hour) == pytest.approx(expected)
+
+
+def test_own_hour_means_override_fixed_ranges():
+    # A las 15 (bajón según el documento) este usuario rinde más; a las 10, menos
+    day = [(2400, 15)] * HOUR_MIN_N + [(600, 10)] * HOUR_MIN_N + [(1200, 20)] * (4 * HOUR_MIN_N)
+    st = _stats(day)
+    assert st.hour_factor(15) == -0.2
+    assert st.hour_factor(10) == 0.2
+    assert st.hour_factor(20) == 0.0
+    assert st.hour_factor(14) == 0.2          # sin datos propios: rango fijo
+    base = st.dynamic_ratio(0, 0, 20)
+    assert st.dynamic_ratio(0, 0, 15) == pytest.approx(base - 0.2)
+    assert st.dynamic_ratio(0, 0, 10) == pytest.approx(base + 0.2)
+
+
+def test_too_few_samples_keep_fixed_range():
+    st = _stats([(3000, 15)] * (HOUR_MIN_N - 1) + [(600, 20)] * 10)
+    assert st.hour_factor(15) == 0.2
+
+
+@pytest.mark.parametrize("focus,brk,expected", ((7200, 0, RATIO_BASE + 0.5), (0, 1000, RATIO_BASE - 0.5)))
+def test_balance_factor(focus, brk, expected):
+    assert SessionStats().dynamic_ratio(focus, brk, 20) == pytest.approx(expected)
+
+
+def test_ratio_is_clamped():
+    hi = _stats([(3600, 15)] * 10)
+    assert hi.dynamic_ratio(10 ** 6, 0, 15) <= RATIO_MAX
+    lo = _stats([(120, 10)] * 10, block_sec=600)
+    assert lo.dynamic_ratio(0, 10 ** 6, 10) >= RATIO_MIN
+
+
+def test_engine_reads_dynamic_ratio():
+    state = new_state(random.Random(2))
+    state["difficulty"] = "dinamico"
+    state["total_focus_sec"] = 7200
+    eng = GameEngine(state, clock=lambda: 0.0, wall=lambda: 0.0)
+    ratio = eng.stats.dynamic_ratio(7200, 0, eng.hour())
+    assert eng.balance_seconds() == int(7200 / ratio)